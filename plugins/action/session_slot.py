@@ -0,0 +1,90 @@
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+import os
+
+from ansible import constants as C
+from ansible.plugins.action import ActionBase
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.session_slots import (
+    SlotTimeout,
+    acquire,
+    release,
+)
+
+
+ARGUMENT_SPEC = {
+    "state": {"type": "str", "choices": ["acquired", "released"], "default": "acquired"},
+    "site": {"type": "str"},
+    "limit": {"type": "int"},
+    "timeout": {"type": "int"},
+    "lease": {"type": "int"},
+    "path": {"type": "path"},
+}
+
+# Inventory variables the options default to
+VARIABLES = {
+    "site": ("healthchecks_site", "all"),
+    "limit": ("healthchecks_site_limit", 0),
+    "timeout": ("healthchecks_site_wait", 300),
+    "lease": ("healthchecks_site_lease", 900),
+    "path": ("healthchecks_site_slot_dir", ""),
+}
+
+
+# Strategies running a task on every host before the next task
+LOCKSTEP_STRATEGIES = ("linear", "debug")
+
+
+class ActionModule(ActionBase):
+    """Take or give back a session slot of the site of the device"""
+
+    _requires_connection = False
+    _supports_check_mode = True
+
+    def _play_strategy(self):
+        play = self._task.get_play() if hasattr(self._task, "get_play") else None
+        strategy = getattr(play, "strategy", None) or C.DEFAULT_STRATEGY
+        return strategy.split(".")[-1]
+
+    def run(self, tmp=None, task_vars=None):
+        task_vars = task_vars or {}
+        result = super(ActionModule, self).run(tmp, task_vars)
+        _validation, args = self.validate_argument_spec(ARGUMENT_SPEC)
+
+        for option, (variable, default) in VARIABLES.items():
+            if args.get(option) is None:
+                args[option] = self._templar.template(task_vars.get(variable, default))
+        limit = int(args["limit"] or 0)
+        site = str(args["site"])
+        path = args["path"] or os.path.join(C.DEFAULT_LOCAL_TMP, "healthchecks_slots")
+        owner = task_vars.get("inventory_hostname", "localhost")
+
+        result.update(site=site, limit=limit, changed=False)
+        if limit <= 0:
+            result["skipped"] = True
+            result["msg"] = "No session limit set for site %s" % site
+            return result
+
+        if self._play_strategy() in LOCKSTEP_STRATEGIES:
+            # every host has to finish a task before any starts the next one,
+            # a host waiting for a slot would wait for the hosts holding them
+            result["skipped"] = True
+            result["msg"] = "Session limits need the free or host_pinned strategy, not enforced"
+            if args["state"] == "acquired":
+                self._display.warning("%s for site %s" % (result["msg"], site))
+            return result
+
+        if args["state"] == "released":
+            result["changed"] = release(path, site, owner)
+            return result
+
+        try:
+            waited, in_flight = acquire(path, site, owner, limit, int(args["timeout"]), int(args["lease"]))
+        except SlotTimeout as exc:
+            result.update(failed=True, msg=str(exc))
+            return result
+        result.update(changed=True, waited=round(waited, 3), in_flight=in_flight)
+        return result
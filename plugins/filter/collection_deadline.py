@@ -0,0 +1,125 @@
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+    name: collection_deadline
+    author: Ansible Network Content Team
+    version_added: "1.1.0"
+    short_description: Add the collection deadline stats of a device to its health check result.
+    description:
+        - Add a C(collection) entry with the status, the timeout and the elapsed time of the
+          command collection to a health check result.
+        - When some collection commands did not finish, only their checks are reported as C(TIMEOUT),
+          the checks already collected keep their status and the result becomes C(PARTIAL), or
+          C(FAIL) when one of them failed. Nothing collected makes the result C(TIMEOUT).
+        - When collection was skipped, e.g. after a critical failure in fail fast mode, the result
+          is C(SKIPPED) with the reason and no check.
+        - When collection was not due (C(CACHED)), the result saved by the previous run is returned
+          with its C(ran_at) time and C(age) in seconds.
+    options:
+      health_checks:
+        description: Health check result of the device.
+        type: dict
+        required: true
+      status:
+        description: Collection status, C(OK), C(TIMEOUT), C(SKIPPED) or C(CACHED).
+        type: str
+        required: true
+      started_at:
+        description: Epoch time collection started at.
+        type: float
+        required: true
+      timeout:
+        description: Per command timeout in seconds, 0 when disabled.
+        type: int
+      facts:
+        description: Facts collected, used to tell a partial collection from a timeout.
+        type: raw
+      commands:
+        description:
+          - Collection commands of the role, each telling whether its facts were C(collected), not
+            when it did not finish, and the C(checks) graded from them, every check when left out.
+          - A command not C(collected) makes the collection C(TIMEOUT).
+        type: list
+        elements: dict
+      task:
+        description: Name of the task that timed out.
+        type: str
+      reason:
+        description: Why collection was skipped, kept when O(status) is C(SKIPPED).
+        type: str
+      previous:
+        description: State saved by the previous run (C(ran_at) and C(health_checks)), returned when O(status) is C(CACHED).
+        type: dict
+      collected_at:
+        description:
+          - Epoch time the commands were collected and parsed at, splitting the elapsed time into
+            the C(collect) and C(evaluate) phases kept under C(collection.phases).
+        type: float
+"""
+
+EXAMPLES = r"""
+- name: Add collection deadline stats
+  ansible.builtin.set_fact:
+    health_checks: >-
+      {{
+        health_checks | network.healthchecks.collection_deadline(
+          healthchecks_collection_status, healthchecks_collection_started, cpu_command_timeout,
+          commands=[{'collected': cpu_health is defined}]
+        )
+      }}
+"""
+
+RETURN = """
+  health_checks:
+    description:
+      - The health check result with a C(collection) entry (C(status), C(timeout), C(elapsed), C(task),
+        C(missing) checks and C(phases)).
+    type: dict
+"""
+
+from ansible.errors import AnsibleFilterError
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.deadlines import (
+    COLLECTION_STATUSES,
+    apply_deadline,
+)
+
+
+def collection_deadline(*args, **kwargs):
+    params = ["health_checks", "status", "started_at", "timeout"]
+    data = dict(zip(params, args))
+    data.update(kwargs)
+    if len(data) < 3:
+        raise AnsibleFilterError(
+            "Missing either 'health_checks', 'status' or 'started_at' in filter input, "
+            "refer 'network.healthchecks.collection_deadline' filter plugin documentation for details"
+        )
+    if data["status"] not in COLLECTION_STATUSES:
+        raise AnsibleFilterError(
+            "Invalid collection status '%s', expected one of %s" % (data["status"], ", ".join(COLLECTION_STATUSES))
+        )
+
+    return apply_deadline(
+        data["health_checks"],
+        data["status"],
+        data["started_at"],
+        data.get("timeout"),
+        facts=data.get("facts"),
+        task=data.get("task"),
+        finished_at=data.get("finished_at"),
+        reason=data.get("reason"),
+        previous=data.get("previous"),
+        collected_at=data.get("collected_at"),
+        commands=data.get("commands"),
+    )
+
+
+class FilterModule(object):
+    """collection_deadline"""
+
+    def filters(self):
+        """a mapping of filter names to functions"""
+        return {"collection_deadline": collection_deadline}
@@ -0,0 +1,70 @@
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+    name: collection_due
+    author: Ansible Network Content Team
+    version_added: "1.1.0"
+    short_description: Tell whether the collection of a health check role is due.
+    description:
+        - Compare the time a role last collected from a device, as saved in its state, with the
+          polling interval of the role.
+        - A run coming up to 10% of the interval early still collects, so cron runs firing a little
+          early do not skip a whole interval.
+        - The roles collect only when due and otherwise return the previous result, with its age,
+          as a C(CACHED) collection.
+    options:
+      state:
+        description: State saved by the previous run, C(ran_at) epoch time and C(health_checks) result.
+        type: dict
+        required: true
+      interval:
+        description: Polling interval as seconds or a duration string such as C(5m) or C(24h), C(0) collecting on every run.
+        type: raw
+        required: true
+      now:
+        description: Epoch time of the run, the current time by default.
+        type: float
+"""
+
+EXAMPLES = r"""
+- name: Start the collection deadline
+  ansible.builtin.set_fact:
+    healthchecks_collection_status: >-
+      {{ 'OK' if healthchecks_schedule_state | network.healthchecks.collection_due(uptime_interval) else 'CACHED' }}
+"""
+
+RETURN = """
+  due:
+    description: Whether the role has to collect from the device on this run.
+    type: bool
+"""
+
+from ansible.errors import AnsibleFilterError
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.duration import duration_seconds
+from ansible_collections.network.healthchecks.plugins.plugin_utils.schedule import is_due
+
+
+def collection_due(*args, **kwargs):
+    params = ["state", "interval", "now"]
+    data = dict(zip(params, args))
+    data.update(kwargs)
+    if "interval" not in data:
+        raise AnsibleFilterError(
+            "Missing either 'state' or 'interval' in filter input, "
+            "refer 'network.healthchecks.collection_due' filter plugin documentation for details"
+        )
+    if data["interval"] not in (None, "") and duration_seconds(data["interval"]) is None:
+        raise AnsibleFilterError("Invalid polling interval '%s'" % data["interval"])
+    return is_due(data.get("state"), data["interval"], data.get("now"))
+
+
+class FilterModule(object):
+    """collection_due"""
+
+    def filters(self):
+        """a mapping of filter names to functions"""
+        return {"collection_due": collection_due}
@@ -0,0 +1,103 @@
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+    name: cpu_sample_ring
+    author: Ansible Network Content Team
+    version_added: "1.1.0"
+    short_description: Add CPU utilization samples to a fixed size ring buffer.
+    description:
+        - Add the CPU utilization of every parsed C(show processes cpu) output to a ring buffer of O(size)
+          samples, overwriting the oldest samples once it is full.
+        - A sample is the utilization over the shortest window reported by the device, the five second
+          value on IOS, the one second busy time on NX-OS and EOS and the one minute average on IOS-XR.
+        - A warning is raised when none of the outputs holds a sample, the ring being returned unchanged.
+        - The ring is given to P(network.healthchecks.health_check_view#filter) as C(samples), which grades the CPU
+          on a statistic of the samples and reports only their summary.
+    options:
+      ring:
+        description: Ring returned by a previous call, an empty ring being started when not set.
+        type: dict
+        required: true
+      parsed:
+        description: Parsed outputs of the samples, oldest first.
+        type: list
+        elements: dict
+        required: true
+      network_os:
+        description:
+          - Platform of the outputs, short or fully qualified, selecting the parsed field of the samples.
+          - When not set, the first field found among those of every platform is read.
+        type: str
+      size:
+        description: Samples kept, a ring of another size being started over.
+        type: int
+        default: 60
+      interval:
+        description: Seconds between two samples, the last sample being taken now.
+        type: float
+        default: 0
+"""
+
+EXAMPLES = r"""
+- name: Keep the CPU samples
+  ansible.builtin.set_fact:
+    cpu_sample_ring: >-
+      {{
+        cpu_sample_ring | default({}) | network.healthchecks.cpu_sample_ring(
+          cpu_sampled.results | map(attribute='parsed') | list,
+          network_os=ansible_network_os, size=60, interval=5
+        )
+      }}
+
+# "cpu_sample_ring": {
+#     "size": 60,
+#     "next": 0,
+#     "samples": [[1700000000.0, 12.0], [1700000005.0, 71.0], [1700000010.0, 15.0]]
+# }
+"""
+
+RETURN = """
+  ring:
+    description: The ring, C(samples) being C([time, utilization]) pairs and C(next) the slot overwritten next once full.
+    type: dict
+"""
+
+from ansible.errors import AnsibleFilterError
+from ansible.utils.display import Display
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.cpu_samples import RING_SIZE, push, sample_value
+
+
+display = Display()
+
+
+def cpu_sample_ring(*args, **kwargs):
+    params = ["ring", "parsed", "size", "interval", "network_os"]
+    data = dict(zip(params, args))
+    data.update(kwargs)
+    if "parsed" not in data:
+        raise AnsibleFilterError(
+            "Missing either 'ring' or 'parsed' in filter input, "
+            "refer 'network.healthchecks.cpu_sample_ring' filter plugin documentation for details"
+        )
+    try:
+        values = [sample_value(parsed, data.get("network_os")) for parsed in data["parsed"] or []]
+        if data["parsed"] and all(value is None for value in values):
+            display.warning(
+                "None of the %d CPU outputs holds a utilization sample for %s, the ring is unchanged"
+                % (len(data["parsed"]), data.get("network_os") or "any platform")
+            )
+        return push(data.get("ring"), values, data.get("size", RING_SIZE), data.get("interval", 0))
+    except (TypeError, ValueError) as exc:
+        raise AnsibleFilterError("Unable to add the CPU samples: %s" % exc)
+
+
+class FilterModule(object):
+    """cpu_sample_ring"""
+
+    def filters(self):
+        """a mapping of filter names to functions"""
+        return {"cpu_sample_ring": cpu_sample_ring}
@@ -0,0 +1,76 @@
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+    name: crash_files_seen
+    author: Ansible Network Content Team
+    version_added: "1.1.0"
+    short_description: List the keys of the crash files found on a device.
+    description:
+        - Return the identity of every crash entry parsed from the device (process/pid/datetime
+          for cores, the file name with its size and date when listed otherwise) so it can be
+          stored between runs and passed to P(network.healthchecks.health_check_view#filter)
+          as C(seen_crash_files).
+        - The keys of the previous runs are kept, so a crash missing from one listing is not
+          reported as new again.
+    options:
+      health_facts:
+        description: Crash health facts parsed with the crashfiles templates.
+        type: dict
+        required: true
+      seen:
+        description: Keys returned by the previous run.
+        type: list
+        elements: str
+      limit:
+        description: Number of most recent keys kept, 0 keeps them all.
+        type: int
+        default: 0
+"""
+
+EXAMPLES = r"""
+- name: Save the crash files seen on this run
+  ansible.builtin.copy:
+    content: "{{ crash_health | network.healthchecks.crash_files_seen(seen=crash_files_previously_seen, limit=1000) | to_json }}"
+    dest: "{{ crash_files_state_dir }}/{{ inventory_hostname }}.json"
+  delegate_to: localhost
+"""
+
+RETURN = """
+  seen:
+    description: Crash entry keys, in the order they were first seen.
+    type: list
+    elements: str
+"""
+
+from ansible.errors import AnsibleFilterError
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.crash_files import (
+    crash_entries,
+    crash_key,
+    merge_seen,
+)
+
+
+def crash_files_seen(*args, **kwargs):
+    params = ["health_facts"]
+    data = dict(zip(params, args))
+    data.update(kwargs)
+    if len(data) < 1:
+        raise AnsibleFilterError(
+            "Missing 'health facts' in filter input, "
+            "refer 'network.healthchecks.crash_files_seen' filter plugin documentation for details"
+        )
+
+    keys = sorted(set(crash_key(entry) for entry in crash_entries(data["health_facts"])) - set([None]))
+    return merge_seen(data.get("seen"), keys, data.get("limit"))
+
+
+class FilterModule(object):
+    """crash_files_seen"""
+
+    def filters(self):
+        """a mapping of filter names to functions"""
+        return {"crash_files_seen": crash_files_seen}
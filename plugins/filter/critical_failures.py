@@ -0,0 +1,74 @@
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+    name: critical_failures
+    author: Ansible Network Content Team
+    version_added: "1.1.0"
+    short_description: List the critical checks that failed in a health check result.
+    description:
+        - Return the names of the checks of O(critical_checks) whose status is C(FAIL), added by the
+          roles to C(healthchecks_critical_failures) in fail fast mode so the roles run after them
+          skip their collection.
+    options:
+      health_checks:
+        description: Health check result of a role.
+        type: dict
+        required: true
+      critical_checks:
+        description: Check names whose failure is critical.
+        type: list
+        elements: str
+        default: [environment_minimum_threshold, crash_files]
+"""
+
+EXAMPLES = r"""
+- name: Record the critical failures of a health check result
+  ansible.builtin.set_fact:
+    healthchecks_critical_failures: >-
+      {{ healthchecks_critical_failures | default([]) + health_checks | network.healthchecks.critical_failures }}
+"""
+
+RETURN = """
+  failed:
+    description: Names of the failed critical checks.
+    type: list
+    elements: str
+"""
+
+import os
+
+from ansible.errors import AnsibleFilterError
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.bundle import load_yaml
+from ansible_collections.network.healthchecks.plugins.plugin_utils.fail_fast import failed_checks
+
+
+# Load default values from defaults/main.yml, through the precompiled bundle
+DEFAULTS_FILE = os.path.join(os.path.dirname(__file__), 'defaults', 'main.yml')
+DEFAULT_VALUES = load_yaml(DEFAULTS_FILE)
+
+
+def critical_failures(*args, **kwargs):
+    params = ["health_checks", "critical_checks"]
+    data = dict(zip(params, args))
+    data.update(kwargs)
+    if not isinstance(data.get("health_checks"), dict):
+        raise AnsibleFilterError(
+            "Missing 'health_checks' in filter input, "
+            "refer 'network.healthchecks.critical_failures' filter plugin documentation for details"
+        )
+    critical = data.get("critical_checks")
+    if critical is None:
+        critical = DEFAULT_VALUES.get("fail_fast_critical_checks", [])
+    return failed_checks(data["health_checks"], critical)
+
+
+class FilterModule(object):
+    """critical_failures"""
+
+    def filters(self):
+        """a mapping of filter names to functions"""
+        return {"critical_failures": critical_failures}
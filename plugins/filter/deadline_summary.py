@@ -0,0 +1,58 @@
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+    name: deadline_summary
+    author: Ansible Network Content Team
+    version_added: "1.1.0"
+    short_description: Summarize the collection time of the health check results of a run.
+    description:
+        - Report the p50, p90, p99 and max collection time, the timed out, partial, skipped and
+          cached device counts and the slowest devices of a run, from the C(collection) entries the
+          C(collection_deadline) filter adds to the health check results.
+        - Results without a C(collection) entry are left out.
+    options:
+      results:
+        description: Health check results keyed by host.
+        type: dict
+        required: true
+      slowest:
+        description: Number of slowest devices listed, 0 listing none.
+        type: int
+        default: 5
+"""
+
+EXAMPLES = r"""
+- name: Report collection time across the inventory
+  ansible.builtin.debug:
+    msg: >-
+      {{
+        dict(ansible_play_hosts | zip(ansible_play_hosts | map('extract', hostvars, 'health_checks')))
+        | network.healthchecks.deadline_summary
+      }}
+  run_once: true
+"""
+
+RETURN = """
+  summary:
+    description:
+      - The C(hosts), C(timeout), C(partial), C(skipped) and C(cached) device counts, the C(elapsed)
+        percentiles and the C(slowest) devices with their elapsed seconds.
+    type: dict
+"""
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.deadlines import summarize_deadlines
+
+
+def deadline_summary(results, slowest=5):
+    return summarize_deadlines(results, int(slowest))
+
+
+class FilterModule(object):
+    """deadline_summary"""
+
+    def filters(self):
+        """a mapping of filter names to functions"""
+        return {"deadline_summary": deadline_summary}
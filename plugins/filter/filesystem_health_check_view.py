@@ -25,6 +25,26 @@ EXAMPLES = r"""
         name: network.healthchecks.filesystem
       vars:
         min_free_space_mb: 10
+
+# Devices reporting several filesystems (bootflash, slot0, harddisk, logflash,
+# standby supervisor and linecards) are all evaluated, each against its own
+# threshold, and the result keeps the lowest_count fullest ones.
+- name: Set health checks fact
+  ansible.builtin.set_fact:
+    health_checks: >-
+      {{
+        fs_health | network.healthchecks.filesystem_health_check_view({
+          'name': 'health_check',
+          'vars': {
+            'checks': [{
+              'name': 'filesystem_status_summary',
+              'filesystem_free_threshold': 10,
+              'filesystem_thresholds': {'bootflash': 20, 'logflash': 5},
+              'lowest_count': 3
+            }]
+          }
+        })
+      }}
 """
 
 RETURN = """
@@ -35,6 +55,11 @@ RETURN = """
 
 from ansible.errors import AnsibleFilterError
 
+from ansible_collections.network.healthchecks.plugins.plugin_utils.filesystems import (
+    evaluate_filesystems,
+    free_percent,
+)
+
 
 def _process_health_facts(health_facts):
     """Process filesystem health facts to generate summary statistics"""
@@ -45,10 +70,14 @@ def _process_health_facts(health_facts):
     if not fs_data or 'free' not in fs_data or 'total' not in fs_data:
         return None
 
+    percent = free_percent(fs_data['free'], fs_data['total'])
+    if percent is None:
+        return None
+
     return {
         'free': fs_data['free'],
         'total': fs_data['total'],
-        'free_percent': round((fs_data['free'] / fs_data['total']) * 100, 2)
+        'free_percent': percent
     }
 
 
@@ -77,6 +106,21 @@ def filesystem_health_check_view(*args, **kwargs):
 
             for check in checks:
                 if check['name'] == 'filesystem_status_summary':
+                    if health_facts and health_facts.get('filesystems'):
+                        fs_summary = evaluate_filesystems(
+                            health_facts['filesystems'],
+                            check.get('filesystem_free_threshold', 10),
+                            check.get('filesystem_thresholds'),
+                            int(check.get('lowest_count', 5))
+                        )
+                        health_checks['filesystems'] = fs_summary
+                        if fs_summary['status'] == 'FAIL':
+                            health_checks['result'] = 'FAIL'
+
+                    if health_facts and health_facts.get('filesystems') and not health_facts.get('fs_health'):
+                        # the default filesystem was not collected, the role reports it so
+                        continue
+
                     fs_data = _process_health_facts(health_facts)
                     if not fs_data:
                         health_checks['result'] = 'FAIL'
@@ -0,0 +1,56 @@
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+    name: health_check_order
+    author: Ansible Network Content Team
+    version_added: "1.1.0"
+    short_description: Sort health check roles cheapest collection first.
+    description:
+        - Sort role names by the device cost of their collection (uptime, cpu, memory, environment,
+          crashfiles, filesystem, ospf, bgp, interfaces), so in fail fast mode the short, high signal
+          checks run first.
+        - Names are matched with or without the C(network.healthchecks.) prefix, unknown roles
+          coming last in their given order.
+    options:
+      roles:
+        description: Role names to sort.
+        type: list
+        elements: str
+        required: true
+      cost:
+        description: Relative collection cost per role name, overriding the built in costs.
+        type: dict
+"""
+
+EXAMPLES = r"""
+- name: Run the health checks cheapest first, stopping at a critical failure
+  ansible.builtin.include_role:
+    name: "network.healthchecks.{{ item }}"
+  loop: "{{ ['bgp', 'interfaces', 'cpu', 'environment'] | network.healthchecks.health_check_order }}"
+  vars:
+    healthchecks_fail_fast: true
+"""
+
+RETURN = """
+  roles:
+    description: Role names sorted cheapest collection first.
+    type: list
+    elements: str
+"""
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.fail_fast import order_roles
+
+
+def health_check_order(roles, cost=None):
+    return order_roles(roles, cost)
+
+
+class FilterModule(object):
+    """health_check_order"""
+
+    def filters(self):
+        """a mapping of filter names to functions"""
+        return {"health_check_order": health_check_order}
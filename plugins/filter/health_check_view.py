@@ -2,14 +2,38 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import heapq
 import os
-import yaml
 from ansible.errors import AnsibleFilterError
-
-# Load default values from defaults/main.yml
+from ansible.utils.display import Display
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.bundle import load_yaml
+from ansible_collections.network.healthchecks.plugins.plugin_utils.cpu_samples import STATISTICS, summarize
+from ansible_collections.network.healthchecks.plugins.plugin_utils.crash_files import (
+    crash_entries,
+    evaluate_crash_files,
+)
+from ansible_collections.network.healthchecks.plugins.plugin_utils.duration import duration_seconds
+from ansible_collections.network.healthchecks.plugins.plugin_utils.environment import (
+    evaluate_sensors,
+    evaluate_units,
+)
+from ansible_collections.network.healthchecks.plugins.plugin_utils.filesystems import (
+    evaluate_filesystems,
+    free_percent,
+)
+
+display = Display()
+
+# Load default values from defaults/main.yml, through the precompiled bundle
 DEFAULTS_FILE = os.path.join(os.path.dirname(__file__), 'defaults', 'main.yml')
-with open(DEFAULTS_FILE, 'r') as f:
-    DEFAULT_VALUES = yaml.safe_load(f)
+DEFAULT_VALUES = load_yaml(DEFAULTS_FILE)
+
+# Per process usage columns, most preferred first (NX-OS only reports one second usage)
+CPU_PROCESS_USAGE_KEYS = ('5_min', '1_min', 'one_sec', 'cpu_percent')
+BGP_ESTABLISHED_STATES = ('Established', 1, 'Established/OpenConfirm', 'Estab')
+BGP_DEFAULT_VRF = 'default'
+BGP_DEFAULT_AFI = 'ipv4 unicast'
 
 DOCUMENTATION = """
     name: health_check_view
@@ -36,6 +60,40 @@ EXAMPLES = r"""
         min_count: 1
       - name: bgp_status_summary
 
+# Grade the prefixes received from every established neighbor against per
+# peer, then per AS, then default limits; only the violating peers are listed.
+- name: health_check
+  vars:
+    checks:
+      - name: min_prefixes_received
+        min_count: 1
+        peer_as:
+          65010: 0
+      - name: max_prefix_proximity
+        threshold: 90
+        max_prefixes: 1000
+        peers:
+          192.0.2.1: 950000
+
+# Evaluate the same checks per VRF and address family; neighbors without
+# 'vrf'/'afi' keys fall into the default VRF, IPv4 unicast group.
+- name: health_check
+  vars:
+    per_vrf: true
+    checks:
+      - name: all_neighbors_up
+      - name: min_neighbors_up
+        min_count: 1
+
+# Restrict the per VRF rollup to some address families.
+- name: health_check
+  vars:
+    per_vrf: true
+    afis:
+      - ipv4 unicast
+    checks:
+      - name: all_neighbors_up
+
 - ansible.builtin.set_fact:
     bgp_health:
       bgp_table_version: 3
@@ -108,7 +166,6 @@ def health_check_view(*args, **kwargs):
         if 'fs_health' in health_facts:
             # Handle nested fs_health structure
             fs_data = health_facts['fs_health'].get('fs_health', {})
-            free_percent = (fs_data.get('free') / fs_data.get('total')) * 100
             free_threshold = kwargs.get('filesystem_free_threshold', health_facts.get('filesystem_free_threshold'))
 
             if not free_threshold:
@@ -116,11 +173,21 @@ def health_check_view(*args, **kwargs):
                     "Missing required filesystem_free_threshold value. Please provide it in the playbook or defaults."
                 )
 
-            if free_percent < free_threshold:
+            percent = free_percent(fs_data.get('free'), fs_data.get('total'))
+            if not fs_data and health_facts['fs_health'].get('filesystems'):
+                # the default filesystem was not collected, the role reports it so
+                pass
+            elif percent is None:
+                health_checks['result'] = 'FAIL'
+                health_checks['filesystem'] = {
+                    'status': 'FAIL',
+                    'error': 'Invalid filesystem data'
+                }
+            elif percent < free_threshold:
                 health_checks['result'] = 'FAIL'
                 health_checks['filesystem'] = {
                     'status': 'FAIL',
-                    'free_percent': round(free_percent, 2),
+                    'free_percent': percent,
                     'threshold': free_threshold,
                     'total': fs_data.get('total', 0),
                     'free': fs_data.get('free', 0)
@@ -128,12 +195,25 @@ def health_check_view(*args, **kwargs):
             else:
                 health_checks['filesystem'] = {
                     'status': 'PASS',
-                    'free_percent': round(free_percent, 2),
+                    'free_percent': percent,
                     'threshold': free_threshold,
                     'total': fs_data.get('total', 0),
                     'free': fs_data.get('free', 0)
                 }
 
+            # Every filesystem of the device, each against its own threshold
+            filesystems = health_facts['fs_health'].get('filesystems')
+            if filesystems:
+                fs_summary = evaluate_filesystems(
+                    filesystems,
+                    free_threshold,
+                    kwargs.get('filesystem_thresholds'),
+                    int(kwargs.get('lowest_count', 5))
+                )
+                health_checks['filesystems'] = fs_summary
+                if fs_summary['status'] == 'FAIL':
+                    health_checks['result'] = 'FAIL'
+
             # Always include details if details flag is True
             if kwargs.get('details', False):
                 health_checks['details'] = fs_data
@@ -144,31 +224,61 @@ def health_check_view(*args, **kwargs):
             if 'cpu_usage' in health_facts and isinstance(health_facts['cpu_usage'], dict):
                 cpu_usage = health_facts['cpu_usage']
                 current_util = int(cpu_usage.get('five_minute', 0))
+                one_min_util = int(cpu_usage.get('one_minute', current_util))
 
             # Handle IOS-XR CPU structure
             elif 'cpu' in health_facts and isinstance(health_facts['cpu'], dict):
                 cpu = health_facts['cpu']
                 current_util = int(cpu.get('5_min_avg', 0))
+                one_min_util = int(cpu.get('1_min_avg', current_util))
+
+            # Handle IOS and IOS-XR template structure
+            elif 'cpu_utilization' in health_facts and isinstance(health_facts['cpu_utilization'], dict):
+                cpu = health_facts['cpu_utilization']
+                current_util = int(cpu.get('5_min_avg', 0))
+                one_min_util = int(cpu.get('1_min_avg', current_util))
+
+            # Handle NX-OS and EOS busy time, a single window
+            elif 'cpu_util' in health_facts and isinstance(health_facts['cpu_util'], dict):
+                current_util = int(float(health_facts['cpu_util'].get('busy', 0)))
+                one_min_util = current_util
 
             # Handle IOS CPU structure
             elif 'global' in health_facts:
                 cpu_summary = health_facts.get('global', {})
                 current_util = int(cpu_summary.get('five_minute', 0))
+                one_min_util = int(cpu_summary.get('one_minute', current_util))
 
             # Handle NX-OS raw CPU data
             elif 'processes' in health_facts and isinstance(health_facts['processes'], dict):
                 processes = health_facts['processes']
                 current_util = int(processes.get('five_minute', 0))
+                one_min_util = int(processes.get('one_minute', current_util))
 
             else:
                 current_util = 0
+                one_min_util = 0
+
+            # Grade a statistic of the samples of the ring when the role took several
+            statistic = kwargs.get('statistic') or 'p95'
+            if statistic not in STATISTICS:
+                raise AnsibleFilterError(
+                    "Invalid CPU statistic '%s', use one of %s" % (statistic, ", ".join(STATISTICS))
+                )
+            samples = summarize(kwargs.get('samples'))
+            if kwargs.get('samples') is not None and not samples:
+                display.warning(
+                    "The CPU sample ring is empty, CPU utilization is graded on the last reading "
+                    "instead of its %s" % statistic
+                )
+            graded_util = samples[statistic] if samples else current_util
 
             # Set status based on threshold comparison
-            if current_util >= critical_threshold:
+            if graded_util >= critical_threshold:
                 health_checks['result'] = 'FAIL'
                 status = 'FAIL'
                 message = "CPU utilization is above the critical threshold"
-            elif current_util >= threshold:
+            elif graded_util >= threshold:
                 health_checks['result'] = 'WARNING'
                 status = 'WARNING'
                 message = "CPU utilization is above the threshold"
@@ -180,26 +290,38 @@ def health_check_view(*args, **kwargs):
             health_checks['cpu_utilization'] = {
                 'status': status,
                 'message': message,
-                '1_min_avg': current_util,
+                '1_min_avg': one_min_util,
                 '5_min_avg': current_util,
                 'threshold': threshold
             }
+            if samples:
+                # only the summary, the samples stay in the ring
+                health_checks['cpu_utilization'].update({'statistic': statistic, 'samples': samples})
 
             # Always include details if details flag is True
             if kwargs.get('details', False):
                 health_checks['details'] = {
-                    'cpu_utilization': {
-                        'status': status,
-                        'message': message,
-                        '1_min_avg': current_util,
-                        '5_min_avg': current_util,
-                        'threshold': threshold
-                    }
+                    'cpu_utilization': dict(health_checks['cpu_utilization'])
                 }
 
-        # Environment Health Checks
+        # Top CPU consuming processes
+        if data['cpu_top_processes']:
+            count = int(data['cpu_top_processes'].get('count', 5))
+            processes = get_cpu_processes(health_facts)
+            health_checks['cpu_top_processes'] = {
+                'count': count,
+                'total_processes': len(processes),
+                'processes': get_top_processes(processes, count)
+            }
+
+        # Crash files, the crashfiles role passes the parsed output directly
+        if any(check['name'] in ['crash_files', 'crash_files_summary'] for check in checks):
+            crash_files = crash_entries(health_facts.get('crash_health', health_facts))
+            get_crash_files_health(crash_files, checks, health_checks, kwargs)
+
+        # Environment Health Checks, the environment role passes the parsed output directly
         if any(check['name'] in ['environment_minimum_threshold'] for check in checks):
-            env_health = health_facts.get('env_health', {})
+            env_health = health_facts.get('env_health', health_facts)
             temp_threshold = next(
                 (check.get('environment_temp_threshold', health_facts.get('environment_temp_threshold'))
                  for check in checks if check['name'] == 'environment_minimum_threshold'),
@@ -254,11 +376,30 @@ def health_check_view(*args, **kwargs):
                     n_dict['status'] = 'FAIL'
                     health_checks['result'] = 'FAIL'
 
+            # Every sensor, power supply and fan row of modular chassis
+            sensor_thresholds = next(
+                (check.get('environment_sensor_thresholds') for check in checks
+                 if check['name'] == 'environment_minimum_threshold'),
+                None
+            )
+            for key in ('sensors', 'power_supplies', 'fan_trays'):
+                if not env_health.get(key):
+                    continue
+                if key == 'sensors':
+                    evaluated = evaluate_sensors(env_health[key], temp_threshold, sensor_thresholds)
+                else:
+                    evaluated = evaluate_units(env_health[key])
+                n_dict[key] = evaluated
+                if evaluated['status'] == 'FAIL':
+                    n_dict['status'] = 'FAIL'
+                elif evaluated['status'] == 'WARNING' and n_dict['status'] == 'PASS':
+                    n_dict['status'] = 'WARNING'
+
             # Always include the environment section in the output
             health_checks['environment'] = n_dict
             # Set overall result based on environment status
-            if n_dict['status'] == 'FAIL':
-                health_checks['result'] = 'FAIL'
+            if n_dict['status'] in ('FAIL', 'WARNING'):
+                health_checks['result'] = n_dict['status']
             else:
                 health_checks['result'] = 'PASS'
 
@@ -269,16 +410,21 @@ def health_check_view(*args, **kwargs):
             checks = vars.get('checks', [])
             dn_lst = []
             un_lst = []
+            groups = {}
             if health_facts.get("neighbors"):
                 for item in health_facts['neighbors']:
                     # Try different possible state key names
                     state = item.get('state') or item.get('peer_state') or item.get('status')
-                    if state in ('Established', 1, 'Established/OpenConfirm'):
+                    group = groups.setdefault(get_bgp_group_key(item), {'up': [], 'down': []})
+                    if is_bgp_established(state, item.get('prefixes_received')):
+                        item['prefixes_received'] = get_prefixes_received(item)
                         item['state'] = 'Established'
                         un_lst.append(item)
+                        group['up'].append(item)
                     else:
                         item['state'] = state or 'Down'
                         dn_lst.append(item)
+                        group['down'].append(item)
             stats = {}
             stats['up'] = len(un_lst)
             stats['down'] = len(dn_lst)
@@ -290,24 +436,8 @@ def health_check_view(*args, **kwargs):
             # Handle crash files health checks
             if any(check['name'] in ['crash_files', 'crash_files_summary'] for check in checks):
                 crash_data = health_facts.get('crash_health', {})
-                crash_files = crash_data.get('crash_files', [])
-
-                for check in checks:
-                    if check['name'] == 'crash_files':
-                        n_dict = {
-                            'status': 'PASS',
-                            'total_crash_files': len(crash_files)
-                        }
-                        if len(crash_files) > 0:
-                            n_dict['status'] = 'FAIL'
-                            health_checks['result'] = 'FAIL'
-                        health_checks[check['name']] = n_dict
-                    elif check['name'] == 'crash_files_summary':
-                        n_dict = {
-                            'total_crash_files': len(crash_files),
-                            'crash_files': crash_files
-                        }
-                        health_checks[check['name']] = n_dict
+                crash_files = crash_entries(crash_data)
+                get_crash_files_health(crash_files, checks, health_checks, kwargs)
 
             # Handle memory health checks
             if any(check['name'] in ['memory_utilization', 'memory_free', 'memory_buffers', 'memory_cache'] for check in checks):
@@ -381,6 +511,55 @@ def health_check_view(*args, **kwargs):
                             health_checks['result'] = 'FAIL'
                         health_checks[check['name']] = n_dict
 
+            # Handle uptime health checks
+            if any(check['name'] in ['uptime', 'uptime_status_summary'] for check in checks):
+                uptime = duration_seconds(health_facts.get('uptime'))
+                uptime_minutes = int(uptime // 60) if uptime is not None else None
+                for check in checks:
+                    if check['name'] == 'uptime':
+                        n_dict = get_uptime_status(uptime_minutes, check, health_facts)
+                        if n_dict['status'] != 'PASS' and not check.get('ignore_errors'):
+                            if n_dict['status'] == 'FAIL' or health_checks['result'] == 'PASS':
+                                health_checks['result'] = n_dict['status']
+                        health_checks[check['name']] = n_dict
+                    elif check['name'] == 'uptime_status_summary':
+                        minutes = uptime_minutes or 0
+                        health_checks[check['name']] = {
+                            'weeks': minutes // 10080,
+                            'days': minutes % 10080 // 1440,
+                            'hours': minutes % 1440 // 60,
+                            'minutes': minutes % 60
+                        }
+
+            # Handle BGP neighbors that came up recently (flapping sessions)
+            if data.get('min_uptime'):
+                min_uptime = int(data['min_uptime'].get('min_uptime', DEFAULT_VALUES.get('bgp_min_neighbor_uptime')))
+                flapped = []
+                for item in un_lst:
+                    peer_uptime = duration_seconds(item.get('uptime') or item.get('up_down'))
+                    if peer_uptime is not None and peer_uptime < min_uptime * 60:
+                        flapped.append({'peer': item.get('peer'), 'uptime': item.get('uptime') or item.get('up_down')})
+                n_dict = {
+                    'status': 'FAIL' if flapped else 'PASS',
+                    'min_uptime': min_uptime,
+                    'flapped': len(flapped),
+                    'neighbors': flapped
+                }
+                if n_dict['status'] == 'FAIL' and not data['min_uptime'].get('ignore_errors'):
+                    health_checks['result'] = 'FAIL'
+                health_checks[data['min_uptime'].get('name')] = n_dict
+
+            # Handle the prefixes received from the established BGP neighbors
+            for key, check in (('min_prefixes', 'min'), ('max_prefix', 'max')):
+                if data.get(key):
+                    try:
+                        n_dict = get_prefix_health(un_lst, data[key], check)
+                    except (TypeError, ValueError) as exc:
+                        raise AnsibleFilterError("Invalid prefix limit in '%s': %s" % (data[key].get('name'), exc))
+                    if n_dict['status'] == 'FAIL' and not data[key].get('ignore_errors'):
+                        health_checks['result'] = 'FAIL'
+                    health_checks[data[key].get('name')] = n_dict
+
             # Handle BGP health checks
             if data.get('summary'):
                 n_dict = {}
@@ -425,6 +604,12 @@ def health_check_view(*args, **kwargs):
                     health_checks['result'] = 'FAIL'
                 health_checks[data['min_up'].get('name')] = n_dict
 
+            # Per VRF / address family rollup of the same checks
+            if vars.get('per_vrf'):
+                health_checks['vrfs'] = get_bgp_group_health(groups, data, vars.get('details'), vars.get('afis'))
+                if any(afi_dict['result'] == 'FAIL' for vrf_dict in health_checks['vrfs'].values() for afi_dict in vrf_dict.values()):
+                    health_checks['result'] = 'FAIL'
+
             # Update overall status
             if any(check.get('status') == 'FAIL' for check in health_checks.values() if isinstance(check, dict)):
                 health_checks['result'] = 'FAIL'
@@ -437,6 +622,54 @@ def health_check_view(*args, **kwargs):
     return health_checks
 
 
+def is_bgp_established(state, prefixes_received=None):
+    if state in BGP_ESTABLISHED_STATES:
+        return True
+    # The summary templates capture the State/PfxRcd column as prefixes_received
+    # only when it holds the count, which it does once the session is up
+    return is_prefix_count(prefixes_received)
+
+
+def is_prefix_count(value):
+    return not isinstance(value, bool) and str(value).isdigit()
+
+
+def get_bgp_group_key(neighbor):
+    vrf = neighbor.get('vrf') or BGP_DEFAULT_VRF
+    afi = (neighbor.get('afi') or BGP_DEFAULT_AFI).lower()
+    return vrf, afi
+
+
+def get_bgp_group_health(groups, data, details=False, afis=None):
+    """Apply the requested BGP checks to every (vrf, afi) neighbor group, of the given address families only"""
+    if afis:
+        afis = [str(afi).lower() for afi in afis]
+    vrfs = {}
+    for (vrf, afi), group in sorted(groups.items()):
+        if afis and afi not in afis:
+            continue
+        stats = {}
+        stats['up'] = len(group['up'])
+        stats['down'] = len(group['down'])
+        stats['total'] = stats['up'] + stats['down']
+
+        n_dict = {}
+        n_dict.update(stats)
+        n_dict['result'] = 'PASS'
+        for key, check in (('all_up', 'up'), ('all_down', 'down'), ('min_up', 'min')):
+            opr = data.get(key)
+            if not opr:
+                continue
+            status = get_bgp_status(stats, check, opr.get('min_count'))
+            n_dict[opr['name']] = {'status': status}
+            if status == 'FAIL' and not opr.get('ignore_errors'):
+                n_dict['result'] = 'FAIL'
+        if details:
+            n_dict['details'] = {'neighbors': group['up'] + group['down']}
+        vrfs.setdefault(vrf, {})[afi] = n_dict
+    return vrfs
+
+
 def get_bgp_status(stats, check, count=None):
     if check in ('up', 'down'):
         return 'PASS' if stats['total'] == stats[check] else 'FAIL'
@@ -444,18 +677,174 @@ def get_bgp_status(stats, check, count=None):
         return 'PASS' if count <= stats['up'] else 'FAIL'
 
 
+def get_prefixes_received(neighbor):
+    """Prefixes received from an established neighbor, read from the State/PfxRcd column"""
+    value = neighbor.get('prefixes_received')
+    return int(value) if is_prefix_count(value) else None
+
+
+def get_prefix_health(neighbors, opr, check):
+    """Grade the prefixes received of the established neighbors in one pass, listing only the violating ones.
+
+    The limit of a neighbor is looked up in the `peers` of the check by peer
+    address, then in its `peer_as` by AS, then defaults to `min_count` for
+    the `min` check or `max_prefixes` for the `max` check. Neighbors without
+    a limit or a prefix count are not checked.
+    """
+    peers = dict((str(key), value) for key, value in (opr.get('peers') or {}).items())
+    by_as = dict((str(key), value) for key, value in (opr.get('peer_as') or {}).items())
+    if check == 'min':
+        default = opr.get('min_count')
+    else:
+        default = opr.get('max_prefixes')
+        threshold = float(opr.get('threshold', DEFAULT_VALUES.get('bgp_max_prefix_threshold')))
+    checked = 0
+    violations = []
+    for neighbor in neighbors:
+        count = neighbor.get('prefixes_received')
+        limit = peers.get(str(neighbor.get('peer')), by_as.get(str(neighbor.get('peer_as')), default))
+        if count is None or limit is None:
+            continue
+        limit = int(limit)
+        checked += 1
+        if check == 'min' and count < limit:
+            violations.append(get_prefix_entry(neighbor, count, min_prefixes=limit))
+        # a limit of 0 is no limit
+        elif check == 'max' and limit and count * 100.0 / limit >= threshold:
+            violations.append(get_prefix_entry(neighbor, count, max_prefixes=limit, percent=round(count * 100.0 / limit, 1)))
+    n_dict = {
+        'status': 'FAIL' if violations else 'PASS',
+        'checked': checked,
+        'violations': len(violations),
+        'neighbors': violations
+    }
+    if check == 'max':
+        n_dict['threshold'] = threshold
+    return n_dict
+
+
+def get_prefix_entry(neighbor, count, **limits):
+    entry = {'peer': neighbor.get('peer'), 'peer_as': neighbor.get('peer_as'), 'prefixes_received': count}
+    for key in ('vrf', 'afi'):
+        if neighbor.get(key):
+            entry[key] = neighbor[key]
+    entry.update(limits)
+    return entry
+
+
 def get_bgp_health(checks):
     dict = {}
     dict['summary'] = is_present(checks, 'bgp_status_summary')
     dict['all_up'] = is_present(checks, 'all_neighbors_up')
     dict['all_down'] = is_present(checks, 'all_neighbors_down')
     dict['min_up'] = is_present(checks, 'min_neighbors_up')
+    dict['min_uptime'] = is_present(checks, 'min_neighbors_uptime')
+    dict['min_prefixes'] = is_present(checks, 'min_prefixes_received')
+    dict['max_prefix'] = is_present(checks, 'max_prefix_proximity')
     return dict
 
 
+def get_uptime_status(uptime_minutes, check, health_facts):
+    """Grade the device uptime against the below (minutes) and above (days) thresholds"""
+    def threshold(option, key):
+        return float(check.get(option, health_facts.get(key, DEFAULT_VALUES.get(key))))
+
+    thresholds = {
+        'min_uptime': float(check.get('min_uptime', threshold('warning_below_threshold', 'uptime_warning_below_threshold'))),
+        'critical_below_threshold': threshold('critical_below_threshold', 'uptime_critical_below_threshold'),
+        'warning_above_threshold_days': threshold('warning_above_threshold_days', 'uptime_warning_above_threshold_days'),
+        'critical_above_threshold_days': threshold('critical_above_threshold_days', 'uptime_critical_above_threshold_days'),
+    }
+    n_dict = {'current_uptime': uptime_minutes}
+    n_dict.update(thresholds)
+    if uptime_minutes is None:
+        n_dict['status'] = 'FAIL'
+        n_dict['message'] = "Uptime could not be determined"
+    elif uptime_minutes < thresholds['critical_below_threshold']:
+        n_dict['status'] = 'FAIL'
+        n_dict['message'] = "Uptime is below the critical threshold"
+    elif uptime_minutes < thresholds['min_uptime']:
+        n_dict['status'] = 'WARNING'
+        n_dict['message'] = "Uptime is below the warning threshold"
+    elif uptime_minutes > thresholds['critical_above_threshold_days'] * 1440:
+        n_dict['status'] = 'FAIL'
+        n_dict['message'] = "Uptime is above the critical threshold"
+    elif uptime_minutes > thresholds['warning_above_threshold_days'] * 1440:
+        n_dict['status'] = 'WARNING'
+        n_dict['message'] = "Uptime is above the warning threshold"
+    else:
+        n_dict['status'] = 'PASS'
+        n_dict['message'] = "Uptime is within acceptable limits"
+    return n_dict
+
+
+def get_crash_files_health(crash_files, checks, health_checks, kwargs):
+    """Report the crash files not seen on a previous run (kwarg seen_crash_files)"""
+    for check in checks:
+        if check['name'] not in ('crash_files', 'crash_files_summary'):
+            continue
+        newest = int(check.get('newest', DEFAULT_VALUES.get('crash_files_newest', 10)))
+        evaluated = evaluate_crash_files(
+            crash_files,
+            seen=kwargs.get('seen_crash_files'),
+            max_age=duration_seconds(check.get('max_age')),
+            newest=newest,
+            now=kwargs.get('now')
+        )
+        if check['name'] == 'crash_files':
+            n_dict = {
+                'status': evaluated['status'],
+                'total_crash_files': evaluated['total_crash_files'],
+                'new_crash_files': evaluated['new_crash_files']
+            }
+            if evaluated['status'] == 'FAIL' and not check.get('ignore_errors'):
+                health_checks['result'] = 'FAIL'
+        else:
+            n_dict = {
+                'total_crash_files': evaluated['total_crash_files'],
+                'new_crash_files': evaluated['new_crash_files'],
+                'new': evaluated['new'][:newest],
+                'crash_files': evaluated['newest']
+            }
+        health_checks[check['name']] = n_dict
+
+
+def get_cpu_processes(health_facts):
+    # IOS / IOS-XR / EOS templates use 'processes', NX-OS 'cpu_utilization_processes'
+    for key in ('processes', 'cpu_utilization_processes'):
+        if isinstance(health_facts.get(key), list):
+            return health_facts[key]
+    return []
+
+
+def get_process_usage(process):
+    for key in CPU_PROCESS_USAGE_KEYS:
+        if process.get(key) not in (None, ''):
+            try:
+                return float(str(process[key]).rstrip('%'))
+            except ValueError:
+                return 0.0
+    return 0.0
+
+
+def get_top_processes(processes, count):
+    """Select the `count` busiest processes with a bounded heap, without sorting the full table"""
+    top = heapq.nlargest(count, ((get_process_usage(process), idx) for idx, process in enumerate(processes)))
+    result = []
+    for usage, idx in top:
+        process = processes[idx]
+        n_dict = {'pid': process.get('pid'), 'process': process.get('process'), 'usage': usage}
+        for key in ('1_min', '5_min', '15_min'):
+            if key in process:
+                n_dict[key] = process[key]
+        result.append(n_dict)
+    return result
+
+
 def get_health(checks):
     dict = {}
     dict['cpu_utilization'] = is_present(checks, 'cpu_utilization')
+    dict['cpu_top_processes'] = is_present(checks, 'cpu_top_processes')
     return dict
 
 
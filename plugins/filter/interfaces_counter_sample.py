@@ -0,0 +1,72 @@
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+    name: interfaces_counter_sample
+    author: Ansible Network Content Team
+    version_added: "1.1.0"
+    short_description: Build a compact interface counter sample from parsed interfaces facts.
+    description:
+        - Convert the interfaces facts parsed with the counters templates into a columnar
+          sample (interface names plus one list per error and discard counter) that can be stored
+          between runs and passed to P(network.healthchecks.interfaces_health_check_view#filter) as
+          C(previous_sample).
+    options:
+      health_facts:
+        description: Interfaces health facts with per interface C(counters).
+        type: dict
+        required: true
+      sampled_at:
+        description: Epoch time the facts were collected at.
+        type: float
+        required: true
+      utilization:
+        description: Keep the byte counters and the bandwidth too, parsed when C(max_utilization) is checked.
+        type: bool
+        default: false
+"""
+
+EXAMPLES = r"""
+- name: Keep the counter sample for the next run
+  ansible.builtin.set_fact:
+    interfaces_previous_sample: "{{ interfaces_health | network.healthchecks.interfaces_counter_sample(interfaces_sampled_at) }}"
+"""
+
+RETURN = """
+  sample:
+    description: Columnar counter sample with C(sampled_at), C(names), C(bandwidth) and C(counters).
+    type: dict
+"""
+
+from ansible.errors import AnsibleFilterError
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.interface_counters import (
+    build_sample,
+    dump_sample,
+)
+
+
+def interfaces_counter_sample(*args, **kwargs):
+    params = ["health_facts", "sampled_at", "utilization"]
+    data = dict(zip(params, args))
+    data.update(kwargs)
+    if len(data) < 2:
+        raise AnsibleFilterError(
+            "Missing either 'health facts' or 'sampled_at' in filter input, "
+            "refer 'network.healthchecks.interfaces_counter_sample' filter plugin documentation for details"
+        )
+
+    health_facts = data["health_facts"] or {}
+    return dump_sample(build_sample(
+        health_facts.get("interfaces"), data["sampled_at"], bool(data.get("utilization"))
+    ))
+
+
+class FilterModule(object):
+    """interfaces_counter_sample"""
+
+    def filters(self):
+        """a mapping of filter names to functions"""
+        return {"interfaces_counter_sample": interfaces_counter_sample}
@@ -210,6 +210,35 @@ EXAMPLES = r"""
 #
 #
 
+- name: Perform interfaces error rate checks from two counter samples
+  hosts: ios
+  gather_facts: false
+  tasks:
+    - name: INTERFACES Manager
+      ansible.builtin.include_role:
+        name: network.healthchecks.interfaces
+      vars:
+        interfaces_sample_interval: 30
+        interfaces_health_check:
+          name: health_check
+          vars:
+            checks:
+              - name: interface_error_rate
+                max_error_rate: 0.5
+                max_discard_rate: 5
+                max_utilization: 80
+
+# "interface_error_rate": {
+#     "status": "FAIL",
+#     "max_error_rate": 0.5,
+#     "max_discard_rate": 5.0,
+#     "max_utilization": 80.0,
+#     "interfaces_rate_summary": {"interval": 30.4, "total": 52, "evaluated": 52, "skipped": 0, "flagged": 1},
+#     "interfaces": {
+#         "GigabitEthernet0/1": {"error_rate": 12.3355, "crc_rate": 12.3355, "discard_rate": 0.0, "utilization": 4.12}
+#     }
+# }
+
 - name: Perform interfaces health checks with ignore_errors as false
   hosts: iosxr
   gather_facts: false
@@ -339,7 +368,14 @@ RETURN = """
 
 from ansible.errors import AnsibleFilterError
 
+from ansible_collections.network.healthchecks.plugins.plugin_utils.interface_counters import (
+    build_sample,
+    compute_rates,
+    load_sample,
+)
+
 ARGSPEC_CONDITIONALS = {}
+ERROR_RATE_DEFAULTS = {"max_error_rate": 1.0, "max_discard_rate": 10.0}
 
 
 def _process_health_facts(health_facts):
@@ -398,6 +434,15 @@ def interfaces_health_check_view(*args, **kwargs):
                     health_checks.update({option: int_dict})
                 if status:
                     health_checks.update({"result": "FAIL" if status == "unsuccessful" else "PASS"})
+
+            opr = is_present(checks, "interface_error_rate")
+            if opr:
+                int_dict, status = process_error_rate(
+                    opr, detailed_health_facts.get("interfaces"), data.get("previous_sample"), data.get("sampled_at")
+                )
+                health_checks.update({"interface_error_rate": int_dict})
+                if status == "unsuccessful":
+                    health_checks.update({"result": "FAIL"})
         else:
             health_checks = health_facts
 
@@ -434,6 +479,27 @@ def process_stats(option, health_facts, checks):
     return option, int_dict, status
 
 
+def process_error_rate(opr, interfaces, previous_sample, sampled_at):
+    status = None
+    previous = load_sample(previous_sample)
+    if not previous:
+        return {"status": "PASS", "message": "No previous counter sample, rates not evaluated"}, status
+
+    thresholds = dict((key, float(opr.get(key, value))) for key, value in ERROR_RATE_DEFAULTS.items())
+    # the utilization needs the byte counters, only parsed when it is checked
+    if opr.get("max_utilization") is not None:
+        thresholds["max_utilization"] = float(opr["max_utilization"])
+    current = build_sample(interfaces, sampled_at, utilization="max_utilization" in thresholds)
+    summary, flagged = compute_rates(previous, current, **thresholds)
+
+    int_dict = {"status": "FAIL" if flagged else "PASS"}
+    int_dict.update(thresholds)
+    int_dict.update({"interfaces_rate_summary": summary, "interfaces": flagged})
+    if flagged and not opr.get("ignore_errors"):
+        status = "unsuccessful"
+    return int_dict, status
+
+
 def get_status(stats, check, count=None):
     if check in ("up", "down"):
         return "successful" if stats["total"] == stats[check] else "unsuccessful"
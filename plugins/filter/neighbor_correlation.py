@@ -0,0 +1,96 @@
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+    name: neighbor_correlation
+    author: Ansible Network Content Team
+    version_added: "1.1.0"
+    short_description: Correlate the BGP sessions and OSPF adjacencies of the play hosts across both of their ends.
+    description:
+        - Join the BGP neighbors (C(bgp_health)) and OSPF neighbors (C(ospf_health)) collected by the roles on all
+          the hosts, pairing the two views of every session in one pass over them.
+        - A BGP peer address or OSPF neighbor ID is matched with the C(healthchecks_addresses),
+          C(healthchecks_router_id), BGP router ID and C(ansible_host) of the hosts, and with the interface
+          addresses their OSPF neighbors see them on.
+        - A session down on both ends is reported once, as a C(down) incident, instead of as a failure of
+          each end. A session up on one end only is reported as C(asymmetric), and a neighbor that the
+          remote host does not have at all as C(one_sided).
+        - Sessions to hosts that were not collected, or that cannot be told apart, are counted as C(unverified),
+          and neighbors outside the play hosts as C(external).
+    options:
+      hosts:
+        description: Hosts to correlate, usually C(ansible_play_hosts).
+        type: list
+        elements: str
+        required: true
+      hostvars:
+        description: The C(hostvars) of the play, the neighbor facts and addresses of the hosts being read from it.
+        type: dict
+        required: true
+"""
+
+EXAMPLES = r"""
+- name: Correlate the sessions of all the hosts
+  ansible.builtin.set_fact:
+    healthchecks_correlation: "{{ ansible_play_hosts | network.healthchecks.neighbor_correlation(hostvars) }}"
+  run_once: true
+  delegate_to: localhost
+
+# "healthchecks_correlation": {
+#     "bgp": {
+#         "sessions": 3, "up": 1, "unverified": 0, "external": 1,
+#         "incidents": [
+#             {"kind": "down", "hosts": ["r1", "r3"], "scope": "default/v4",
+#              "states": {"r1": "Active", "r3": "Active"}},
+#             {"kind": "one_sided", "hosts": ["r2", "r3"], "scope": "default/v4",
+#              "states": {"r2": "Established"}, "missing": "r3"}
+#         ]
+#     },
+#     "ospf": {
+#         "sessions": 2, "up": 1, "unverified": 0, "external": 0,
+#         "incidents": [
+#             {"kind": "asymmetric", "hosts": ["r2", "r3"], "scope": "v4",
+#              "states": {"r2": "INIT/DROTHER", "r3": "FULL/DR"}}
+#         ]
+#     },
+#     "conflicts": [],
+#     "unidentified": [],
+#     "merged_failures": 1,
+#     "result": "FAIL"
+# }
+"""
+
+RETURN = """
+  correlation:
+    description:
+      - C(bgp) and C(ospf) session counts and incidents, addresses claimed by several hosts (C(conflicts)),
+        hosts without any known address (C(unidentified)), the count of two-sided failures reported as one
+        incident (C(merged_failures)) and C(result), C(FAIL) with any incident.
+    type: dict
+"""
+
+from ansible.errors import AnsibleFilterError
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.correlation import correlate, host_facts
+
+
+def neighbor_correlation(*args, **kwargs):
+    params = ["hosts", "hostvars"]
+    data = dict(zip(params, args))
+    data.update(kwargs)
+    if "hostvars" not in data:
+        raise AnsibleFilterError(
+            "Missing either 'hosts' or 'hostvars' in filter input, "
+            "refer 'network.healthchecks.neighbor_correlation' filter plugin documentation for details"
+        )
+    return correlate(dict((host, host_facts(data["hostvars"].get(host) or {})) for host in data["hosts"] or []))
+
+
+class FilterModule(object):
+    """neighbor_correlation"""
+
+    def filters(self):
+        """a mapping of filter names to functions"""
+        return {"neighbor_correlation": neighbor_correlation}
@@ -0,0 +1,87 @@
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+    name: offload_details
+    author: Ansible Network Content Team
+    version_added: "1.1.0"
+    short_description: Write the large details blocks of a health check result to local files.
+    description:
+        - Write every C(details) or C(detailed_*) block of the result larger than O(min_size) bytes of
+          JSON to a gzip compressed JSON file under O(directory) and keep only a reference to it,
+          C(details_file), C(size) and C(sha256), in the result.
+        - Used in the same expression as the health check view, the blocks never reach the host facts,
+          so they are neither sent from the workers to the controller nor kept for the rest of the play.
+        - The files of a host and role are written to C(<directory>/<host>/<role>/), one per block named
+          after its keys, e.g. C(all_neighbors_up.details.json.gz).
+        - The P(network.healthchecks.details#lookup) lookup loads the blocks back.
+        - An empty O(directory) returns the result unchanged.
+    options:
+      health_checks:
+        description: Result of a health check view filter.
+        type: dict
+        required: true
+      directory:
+        description: Local directory of the details files, usually one per run.
+        type: str
+        required: true
+      host:
+        description: Host of the result, usually C(inventory_hostname).
+        type: str
+        required: true
+      role:
+        description: Role of the result.
+        type: str
+        required: true
+      min_size:
+        description: Size in bytes of JSON up to which a block stays in the result.
+        type: int
+        default: 4096
+"""
+
+EXAMPLES = r"""
+- name: Set health checks fact
+  ansible.builtin.set_fact:
+    health_checks: >-
+      {{
+        bgp_health | network.healthchecks.health_check_view(bgp_health_check)
+        | network.healthchecks.offload_details(healthchecks_details_dir | default(''), inventory_hostname, 'bgp')
+      }}
+"""
+
+RETURN = """
+  health_checks:
+    description: The result, with references in place of the large details blocks.
+    type: dict
+"""
+
+from ansible.errors import AnsibleFilterError
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.details_store import MIN_SIZE, offload
+
+
+def offload_details(*args, **kwargs):
+    params = ["health_checks", "directory", "host", "role", "min_size"]
+    data = dict(zip(params, args))
+    data.update(kwargs)
+    if not all(key in data for key in ("directory", "host", "role")):
+        raise AnsibleFilterError(
+            "Missing either 'directory', 'host' or 'role' in filter input, "
+            "refer 'network.healthchecks.offload_details' filter plugin documentation for details"
+        )
+    if not data["directory"] or not isinstance(data.get("health_checks"), dict):
+        return data.get("health_checks")
+    try:
+        return offload(data["health_checks"], data["directory"], data["host"], data["role"], int(data.get("min_size", MIN_SIZE)))
+    except (OSError, TypeError, ValueError) as exc:
+        raise AnsibleFilterError("Unable to write the details of %s to %s: %s" % (data["host"], data["directory"], exc))
+
+
+class FilterModule(object):
+    """offload_details"""
+
+    def filters(self):
+        """a mapping of filter names to functions"""
+        return {"offload_details": offload_details}
@@ -0,0 +1,82 @@
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+    name: openmetrics
+    author: Ansible Network Content Team
+    version_added: "1.1.0"
+    short_description: Render the health check results of the play hosts as an OpenMetrics text file.
+    description:
+        - Render the C(healthchecks_results) of the hosts, the result of every role kept by the roles,
+          in the OpenMetrics text format read by the textfile collector of the node exporter.
+        - Per host the result of every role and check as a status code, C(PASS) 0, C(SKIPPED) 1,
+          C(WARNING) 2, C(PARTIAL) 3, C(TIMEOUT) 4 and C(FAIL) 5, and the CPU and memory utilization,
+          filesystem free percent, neighbors and interfaces up and down reported by the checks.
+        - Per role and platform the host count per result and histograms of the collection time and
+          of its C(collect) and C(evaluate) phases, the C(collect) phase including the parsing done
+          by C(ansible.utils.cli_parse).
+        - The per host series are written worst host first up to O(max_series), the hosts left out
+          being counted, so the text stays bounded for any fleet size.
+    options:
+      hosts:
+        description: Hosts to render, usually C(ansible_play_hosts).
+        type: list
+        elements: str
+        required: true
+      hostvars:
+        description: The C(hostvars) of the play, the results and C(ansible_network_os) of the hosts being read from it.
+        type: dict
+        required: true
+      max_series:
+        description: Per host series written at most.
+        type: int
+        default: 20000
+"""
+
+EXAMPLES = r"""
+- name: Write the health check metrics for the node exporter
+  ansible.builtin.copy:
+    content: "{{ ansible_play_hosts | network.healthchecks.openmetrics(hostvars) }}"
+    dest: /var/lib/node_exporter/textfile_collector/healthchecks.prom
+    mode: "0644"
+  delegate_to: localhost
+  run_once: true
+"""
+
+RETURN = """
+  text:
+    description: OpenMetrics text, ending with the C(# EOF) line.
+    type: str
+"""
+
+from ansible.errors import AnsibleFilterError
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.openmetrics import MAX_SERIES, render
+
+
+def openmetrics(*args, **kwargs):
+    params = ["hosts", "hostvars", "max_series"]
+    data = dict(zip(params, args))
+    data.update(kwargs)
+    if "hostvars" not in data:
+        raise AnsibleFilterError(
+            "Missing either 'hosts' or 'hostvars' in filter input, "
+            "refer 'network.healthchecks.openmetrics' filter plugin documentation for details"
+        )
+    results = {}
+    platforms = {}
+    for host in data["hosts"] or []:
+        variables = data["hostvars"].get(host) or {}
+        results[host] = variables.get("healthchecks_results") or {}
+        platforms[host] = variables.get("ansible_network_os")
+    return render(results, platforms, int(data.get("max_series", MAX_SERIES)))
+
+
+class FilterModule(object):
+    """openmetrics"""
+
+    def filters(self):
+        """a mapping of filter names to functions"""
+        return {"openmetrics": openmetrics}
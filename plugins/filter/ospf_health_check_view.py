@@ -28,8 +28,27 @@ EXAMPLES = r"""
         min_count: 2
       - name: ospf_status_summary
 
+# Both v4 and v6 neighbors are evaluated together. Limit the checks to some
+# areas with 'areas'; the area of a neighbor is its 'area' key, else the area
+# of its interface in 'interfaces' (the OSPF interface table of the family),
+# and '0' and '0.0.0.0' are the same area. Neighbors whose area cannot be
+# resolved are still checked, and counted in 'unresolved_area'.
+- name: ospf_health_check
+  vars:
+    areas:
+      - 0
+    checks:
+      - name: all_neighbors_up
+      - name: ospf_status_summary
+
 - ansible.builtin.set_fact:
   ospf_health:
+    interfaces:
+      v4:
+        - interface: "Gi0/1"
+          area: "0"
+        - interface: "Gi0/0"
+          area: "0"
     neighbors:
       - address: "11.0.13.3"
         dead_time: "00:00:38"
@@ -149,10 +168,50 @@ RETURN = """
 
 """
 
+import re
+
 from ansible.errors import AnsibleFilterError
 
 ARGSPEC_CONDITIONALS = {}
-OSPF_FULL_STATES = ["FULL/BDR", "FULL/DR"]
+OSPF_FAMILIES = ("v4", "v6")
+OSPF_NEIGHBOR_STATES = ("DOWN", "ATTEMPT", "INIT", "2WAY", "EXSTART", "EXCHANGE", "LOADING", "FULL")
+OSPF_NEIGHBOR_ROLES = ("", "DR", "BDR", "DROTHER", "PTP", "-")
+OSPF_UNKNOWN_AREA = "unknown"
+
+# Upper cased "<state>/<role>" -> True when the adjacency is FULL
+OSPF_STATE_TABLE = dict(
+    ("%s/%s" % (state, role) if role else state, state == "FULL")
+    for state in OSPF_NEIGHBOR_STATES
+    for role in OSPF_NEIGHBOR_ROLES
+)
+# Abbreviation -> the other names of an interface type, "GigabitEthernet0/1"
+# and "Gi0/1" both being keyed "gi", "0/1". Types outside the table are keyed
+# on their name as is, so "TwentyFiveGigE" and "TwoGigabitEthernet" or
+# "Serial" and "ServiceEngine" never share a key.
+INTERFACE_PREFIXES = {
+    "et": ("ethernet", "eth"),
+    "fa": ("fastethernet",),
+    "gi": ("gigabitethernet", "gig", "gige"),
+    "tw": ("twogigabitethernet", "twogige"),
+    "fi": ("fivegigabitethernet", "fivegige"),
+    "te": ("tengigabitethernet", "tengige"),
+    "twe": ("twentyfivegigabitethernet", "twentyfivegige"),
+    "fo": ("fortygigabitethernet", "fortygige"),
+    "fif": ("fiftygigabitethernet", "fiftygige"),
+    "hu": ("hundredgigabitethernet", "hundredgige"),
+    "po": ("port-channel", "portchannel"),
+    "be": ("bundle-ether",),
+    "lo": ("loopback",),
+    "vl": ("vlan",),
+    "tu": ("tunnel",),
+    "se": ("serial",),
+    "mgmt": ("management", "mgmteth"),
+}
+INTERFACE_PREFIX_KEYS = dict(
+    (name, key) for key, names in INTERFACE_PREFIXES.items() for name in (key,) + names
+)
+# type, then the slot/port part from the first digit, Junos "ge-0/0/0" included
+INTERFACE_NAME_RE = re.compile(r"^([A-Za-z][A-Za-z-]*?)-?(\d.*)?$")
 
 
 def ospf_health_check_view(*args, **kwargs):
@@ -179,24 +238,24 @@ def ospf_health_check_view(*args, **kwargs):
         vars = target.get('vars')
         if vars:
             checks = vars.get('checks')
-            dn_lst = []
-            un_lst = []
-            if health_facts.get('neighbors'):
-                for item in health_facts['neighbors']:
-                    if item['peer_state'] in OSPF_FULL_STATES:
-                        un_lst.append(item)
-                    else:
-                        dn_lst.append(item)
+            areas = set(normalize_area(area) for area in vars.get('areas') or [])
+            un_lst, dn_lst, families = _process_health_facts(ospf_summary, areas)
             stats = {}
             stats['up'] = len(un_lst)
             stats['down'] = len(dn_lst)
             stats['total'] = stats['up'] + stats['down']
+            unresolved = sum(
+                family['areas'].get(OSPF_UNKNOWN_AREA, {}).get('total', 0) for family in families.values()
+            )
+            if areas and unresolved:
+                stats['unresolved_area'] = unresolved
 
             details = {}
             data = get_health(checks)
             if data['summary']:
                 n_dict = {}
                 n_dict.update(stats)
+                n_dict['families'] = families
                 if vars.get('details'):
                     details['neighbors'] = un_lst
                     n_dict['details'] = details
@@ -242,6 +301,71 @@ def ospf_health_check_view(*args, **kwargs):
     return health_checks
 
 
+def _process_health_facts(ospf_summary, areas=None):
+    """Walk the v4 and v6 neighbors once, keeping counters per family, area and interface"""
+    un_lst = []
+    dn_lst = []
+    families = {}
+    for family in OSPF_FAMILIES:
+        health_facts = ospf_summary.get(family) or {}
+        interface_areas = dict(
+            (interface_key(interface.get('interface')), interface.get('area'))
+            for interface in (ospf_summary.get('interfaces') or {}).get(family) or []
+        )
+        for item in health_facts.get('neighbors') or []:
+            area = normalize_area(item.get('area') or interface_areas.get(interface_key(item.get('interface'))))
+            # a neighbor whose area cannot be resolved is counted, a down one
+            # failing the checks rather than being left out unseen
+            if areas and area not in areas and area != OSPF_UNKNOWN_AREA:
+                continue
+            full = is_full_state(item.get('peer_state'))
+            if full:
+                un_lst.append(item)
+            else:
+                dn_lst.append(item)
+
+            family_stats = families.setdefault(family, {'up': 0, 'down': 0, 'total': 0, 'areas': {}})
+            area_stats = family_stats['areas'].setdefault(area, {'up': 0, 'down': 0, 'total': 0, 'interfaces': {}})
+            interface_stats = area_stats['interfaces'].setdefault(item.get('interface', 'unknown'), {'up': 0, 'down': 0, 'total': 0})
+            for counters in (family_stats, area_stats, interface_stats):
+                counters['up' if full else 'down'] += 1
+                counters['total'] += 1
+    return un_lst, dn_lst, families
+
+
+def is_full_state(peer_state):
+    state = str(peer_state or "").strip().upper()
+    full = OSPF_STATE_TABLE.get(state)
+    if full is None:
+        # states outside the table (new role labels) are not added to it, the
+        # device strings would grow it without bound in a long running process
+        full = state.split("/", 1)[0] == "FULL"
+    return full
+
+
+def interface_key(name):
+    """Key matching the full and abbreviated names of an interface"""
+    # FRR appends the address ("eth1:10.0.12.1") or role ("eth1[DR]")
+    name = re.split(r"[:\[]", str(name or ""), 1)[0].strip()
+    if not name:
+        return None
+    match = INTERFACE_NAME_RE.match(name)
+    if not match:
+        return name.lower(), ""
+    prefix = match.group(1).lower()
+    return INTERFACE_PREFIX_KEYS.get(prefix, prefix), match.group(2) or ""
+
+
+def normalize_area(area):
+    if area is None or area == "":
+        return OSPF_UNKNOWN_AREA
+    area = str(area).strip()
+    if area.isdigit():
+        area = int(area)
+        return "%d.%d.%d.%d" % (area >> 24 & 255, area >> 16 & 255, area >> 8 & 255, area & 255)
+    return area
+
+
 def get_status(stats, check, count=None):
     if check in ('up', 'down'):
         return 'PASS' if stats['total'] == stats[check] and stats['total'] != 0 else 'FAIL'
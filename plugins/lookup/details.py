@@ -0,0 +1,55 @@
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+    name: details
+    author: Ansible Network Content Team
+    version_added: "1.1.0"
+    short_description: Load the details blocks written by the offload_details filter.
+    description:
+        - Replace every details reference of the terms, as left in a health check result by the
+          P(network.healthchecks.offload_details#filter) filter, with the block it refers to.
+        - A term is a single reference, e.g. C(health_checks.all_neighbors_up.details), or a whole
+          result, which is returned with all of its blocks loaded.
+        - The files are read on the controller and checked against the digest of their reference.
+    options:
+      _terms:
+        description: Details references, or health check results holding some.
+        required: true
+"""
+
+EXAMPLES = r"""
+- name: Show the neighbors of the failed BGP check
+  ansible.builtin.debug:
+    msg: "{{ lookup('network.healthchecks.details', health_checks.all_neighbors_up.details) }}"
+  when: health_checks.all_neighbors_up.check_status == 'unsuccessful'
+
+- name: Save the complete interfaces result
+  ansible.builtin.copy:
+    content: "{{ lookup('network.healthchecks.details', health_checks) | to_nice_json }}"
+    dest: "reports/{{ inventory_hostname }}.interfaces.json"
+  delegate_to: localhost
+"""
+
+RETURN = """
+  _raw:
+    description: The terms with their details references replaced by the blocks.
+    type: list
+    elements: raw
+"""
+
+from ansible.errors import AnsibleLookupError
+from ansible.plugins.lookup import LookupBase
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.details_store import resolve
+
+
+class LookupModule(LookupBase):
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+        try:
+            return [resolve(term) for term in terms]
+        except (OSError, ValueError) as exc:
+            raise AnsibleLookupError("Unable to load the health check details: %s" % exc)
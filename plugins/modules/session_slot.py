@@ -0,0 +1,91 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+module: session_slot
+author: Ansible Network Content Team
+version_added: "1.1.0"
+short_description: Limit the devices of a site collected at the same time.
+description:
+  - Take or give back one of the session slots of the site of the device, so no more than
+    O(limit) devices of a site are logged into at once whatever the number of forks.
+  - Slots are lease files counted under a file lock on the controller, shared by every fork
+    and by every run using the same O(path).
+  - The roles of this collection take a slot before collecting when C(healthchecks_site_limit)
+    is set and give it back once collection is over.
+options:
+  state:
+    description: Take (V(acquired)) or give back (V(released)) the slot of the device.
+    type: str
+    choices: [acquired, released]
+    default: acquired
+  site:
+    description: Site or group the limit applies to.
+    type: str
+    default: C(healthchecks_site), else V(all)
+  limit:
+    description: Devices of the site collected at once, V(0) disables the limit.
+    type: int
+    default: C(healthchecks_site_limit), else V(0)
+  timeout:
+    description: Seconds to wait for a slot before failing with a timeout.
+    type: int
+    default: C(healthchecks_site_wait), else V(300)
+  lease:
+    description: Seconds after which a slot that was not given back is taken as free again.
+    type: int
+    default: C(healthchecks_site_lease), else V(900)
+  path:
+    description:
+      - Directory of the slots on the controller.
+      - Runs sharing the directory share the limits, the default is private to the run.
+    type: path
+    default: C(healthchecks_site_slot_dir), else the local temporary directory of the run
+notes:
+  - Runs on the controller only, the action does not connect to the device.
+  - A slot is held from one task to a later one, which needs the V(free) or V(host_pinned)
+    strategy. With the V(linear) strategy every host must finish a task before the next
+    starts, so the limit is not enforced and a warning is shown.
+"""
+
+EXAMPLES = r"""
+# strategy: host_pinned in the play
+# group_vars/branch_offices.yml
+# healthchecks_site: "{{ site_code }}"
+# healthchecks_site_limit: 2
+
+- name: Wait for a session slot of the site
+  network.healthchecks.session_slot:
+
+- name: Collect
+  ansible.builtin.include_role:
+    name: network.healthchecks.cpu
+
+- name: Give the session slot back
+  network.healthchecks.session_slot:
+    state: released
+"""
+
+RETURN = """
+site:
+  description: Site the slot belongs to.
+  returned: always
+  type: str
+limit:
+  description: Slots of the site.
+  returned: always
+  type: int
+waited:
+  description: Seconds waited for the slot.
+  returned: when state is acquired
+  type: float
+in_flight:
+  description: Slots of the site in use once this one was taken.
+  returned: when state is acquired
+  type: int
+"""
@@ -0,0 +1,164 @@
+"""Correlate the BGP sessions and OSPF adjacencies seen by both of their ends.
+
+Every host is graded on its own view, so a session down shows up as a
+failure on both ends and an adjacency seen by one end only goes unnoticed.
+The neighbors of all the hosts are joined here on their addresses, in one
+pass over them:
+
+- a BGP peer address or OSPF neighbor ID is looked up in the addresses of
+  the hosts, their `healthchecks_addresses`, `healthchecks_router_id`, BGP
+  router ID and `ansible_host`, and the interface addresses their OSPF
+  neighbors see them on;
+- the two views of a session are paired on the (host, remote host, scope)
+  keys, the scope being the VRF and address family for BGP and the address
+  family for OSPF;
+- when the remote host has no neighbor resolving back, e.g. because the
+  session runs between interface addresses not in the inventory, its one
+  unresolved neighbor of the scope, of the matching AS for BGP, is taken as
+  the other view.
+
+A session down on both ends is reported as one `down` incident, a session
+up on one end only as `asymmetric` and a neighbor the remote host does not
+have at all as `one_sided`. Sessions whose remote host was not collected, or
+has several candidate neighbors, are counted as `unverified`, and neighbors
+outside the hosts as `external`.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.network.healthchecks.plugins.filter.health_check_view import get_bgp_group_key, is_bgp_established
+from ansible_collections.network.healthchecks.plugins.filter.ospf_health_check_view import OSPF_FAMILIES, is_full_state
+
+
+def _family(address):
+    return "v6" if ":" in str(address) else "v4"
+
+
+def host_facts(variables):
+    """Addresses, local AS and BGP and OSPF neighbors of a host from its variables"""
+    bgp = variables.get("bgp_health")
+    ospf = variables.get("ospf_health")
+    addresses = list(variables.get("healthchecks_addresses") or [])
+    for address in (variables.get("healthchecks_router_id"), (bgp or {}).get("router_id"), variables.get("ansible_host")):
+        if address:
+            addresses.append(address)
+    ospf_neighbors = None
+    if isinstance(ospf, dict):
+        ospf_neighbors = [
+            dict(neighbor, family=family)
+            for family in OSPF_FAMILIES
+            for neighbor in (ospf.get(family) or {}).get("neighbors") or []
+        ]
+    return {
+        "addresses": [str(address) for address in addresses],
+        "local_as": (bgp or {}).get("local_as"),
+        "bgp": list(bgp.get("neighbors") or []) if isinstance(bgp, dict) else None,
+        "ospf": ospf_neighbors,
+    }
+
+
+def _bgp_view(neighbor):
+    """Remote address, scope, whether up, state and remote AS of a neighbor"""
+    state = neighbor.get("state") or neighbor.get("peer_state") or neighbor.get("status")
+    scope = (get_bgp_group_key(neighbor)[0], _family(neighbor.get("peer")))
+    return neighbor.get("peer"), scope, is_bgp_established(state, neighbor.get("prefixes_received")), state, neighbor.get("peer_as")
+
+
+def _ospf_view(neighbor):
+    state = neighbor.get("peer_state")
+    return neighbor.get("neighbor_id"), (neighbor.get("family", "v4"),), is_full_state(state), state, None
+
+
+def _side(entries):
+    states = sorted(set(str(state or "Down") for _neighbor, _up, state in entries))
+    return all(up for _neighbor, up, _state in entries), ", ".join(states)
+
+
+def _correlate(hosts, index, protocol, view_of, by_as=False):
+    views = {}
+    unresolved = {}
+    for host, facts in hosts.items():
+        for neighbor in facts.get(protocol) or []:
+            remote, scope, up, state, remote_as = view_of(neighbor)
+            remote_host = index.get(str(remote))
+            if remote_host == host:
+                continue
+            if remote_host is None:
+                unresolved.setdefault((host, scope), {}).setdefault(str(remote_as or ""), []).append((neighbor, up, state))
+                continue
+            views.setdefault((host, remote_host, scope), []).append((neighbor, up, state))
+
+    report = {"sessions": 0, "up": 0, "unverified": 0, "incidents": []}
+    done = set()
+    for (host, remote_host, scope), entries in sorted(views.items(), key=lambda item: (item[0][0], item[0][1], item[0][2])):
+        if (remote_host, host, scope) in done:
+            continue
+        done.add((host, remote_host, scope))
+        report["sessions"] += 1
+        reverse = views.get((remote_host, host, scope))
+        if reverse is None and hosts.get(remote_host, {}).get(protocol) is not None:
+            buckets = unresolved.get((remote_host, scope), {})
+            local_as = hosts[host].get("local_as") if by_as else None
+            if local_as:
+                # neighbors of an unknown AS may be from any host
+                keys = [key for key in (str(local_as), "") if buckets.get(key)]
+            else:
+                keys = [key for key in buckets if buckets[key]]
+            if sum(len(buckets[key]) for key in keys) > 1:
+                report["unverified"] += 1
+                continue
+            if keys:
+                reverse = [buckets[keys[0]].pop()]
+        local_up, local_state = _side(entries)
+        incident = {"hosts": [host, remote_host], "scope": "/".join(str(part) for part in scope)}
+        if reverse is None and hosts.get(remote_host, {}).get(protocol) is None:
+            report["unverified"] += 1
+        elif reverse is None:
+            incident.update(kind="one_sided", states={host: local_state}, missing=remote_host)
+            report["incidents"].append(incident)
+        else:
+            remote_up, remote_state = _side(reverse)
+            if local_up and remote_up:
+                report["up"] += 1
+                continue
+            incident.update(kind="down" if not (local_up or remote_up) else "asymmetric",
+                            states={host: local_state, remote_host: remote_state})
+            report["incidents"].append(incident)
+    report["external"] = sum(len(entries) for buckets in unresolved.values() for entries in buckets.values())
+    return report
+
+
+def correlate(hosts):
+    """Correlation report of `{host: host_facts}`"""
+    index = {}
+    conflicts = set()
+    for host, facts in sorted(hosts.items()):
+        for address in facts.get("addresses") or []:
+            if index.get(address, host) != host:
+                conflicts.add(address)
+            index[address] = host
+    for address in conflicts:
+        # an address claimed by several hosts would pair sessions at random
+        del index[address]
+    # the OSPF neighbors tell the interface addresses of the hosts they are
+    # adjacent to, which BGP sessions between interfaces are set up on
+    for host, facts in hosts.items():
+        for neighbor in facts.get("ospf") or []:
+            remote_host = index.get(str(neighbor.get("neighbor_id")))
+            address = neighbor.get("address")
+            if remote_host not in (None, host) and address and str(address) not in index and str(address) not in conflicts:
+                index[str(address)] = remote_host
+
+    report = {
+        "bgp": _correlate(hosts, index, "bgp", _bgp_view, by_as=True),
+        "ospf": _correlate(hosts, index, "ospf", _ospf_view),
+        "conflicts": sorted(conflicts),
+        "unidentified": sorted(host for host, facts in hosts.items() if not facts.get("addresses")),
+    }
+    incidents = report["bgp"]["incidents"] + report["ospf"]["incidents"]
+    # the failures reported on both ends of a session that are now one incident
+    report["merged_failures"] = len([incident for incident in incidents if incident["kind"] == "down"])
+    report["result"] = "FAIL" if incidents else "PASS"
+    return report
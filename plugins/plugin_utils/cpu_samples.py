@@ -0,0 +1,93 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import math
+import time
+
+
+# Samples kept per host, the oldest being overwritten once the ring is full
+RING_SIZE = 60
+STATISTICS = ("min", "mean", "p95", "max")
+# Utilization over the shortest window every platform reports, as the parsed
+# key and field: five seconds on IOS, one second busy time on NX-OS and EOS,
+# the one minute average on IOS-XR
+SAMPLE_FIELDS = {
+    "ios": ("cpu_utilization", "5_sec"),
+    "nxos": ("cpu_util", "busy"),
+    "eos": ("cpu_util", "busy"),
+    "iosxr": ("cpu_utilization", "1_min_avg"),
+}
+
+
+def sample_field(network_os):
+    """Parsed key and field of the samples of `network_os`, short or fully qualified"""
+    name = str(network_os).split(".")[-1]
+    if name not in SAMPLE_FIELDS:
+        raise ValueError("No CPU sample field for the %s platform" % network_os)
+    return SAMPLE_FIELDS[name]
+
+
+def sample_value(health_facts, network_os=None):
+    """CPU utilization over the shortest window of `network_os`, None when it was not parsed.
+
+    Without `network_os` the first field of SAMPLE_FIELDS found in `health_facts` is read.
+    """
+    fields = [sample_field(network_os)] if network_os else list(SAMPLE_FIELDS.values())
+    for key, field in fields:
+        value = ((health_facts or {}).get(key) or {}).get(field)
+        if value not in (None, ""):
+            return float(value)
+    return None
+
+
+def push(ring, values, size=RING_SIZE, interval=0, now=None):
+    """`ring` with the `values` taken `interval` seconds apart added, the last one at `now`.
+
+    The ring is `{"size", "next", "samples"}`, `samples` holding `[time,
+    utilization]` pairs and `next` the slot written next once it is full.
+    A ring of another size is started over.
+    """
+    size = int(size)
+    if size < 1:
+        raise ValueError("The ring size must be at least 1, got %d" % size)
+    now = time.time() if now is None else float(now)
+    ring = ring or {}
+    if ring.get("size") != size:
+        ring = {}
+    samples = [list(sample) for sample in ring.get("samples") or []]
+    position = int(ring.get("next") or 0)
+    values = [value for value in values if value is not None]
+    for index, value in enumerate(values):
+        sample = [round(now - (len(values) - 1 - index) * float(interval), 3), float(value)]
+        if len(samples) < size:
+            samples.append(sample)
+        else:
+            samples[position] = sample
+            position = (position + 1) % size
+    return {"size": size, "next": position, "samples": samples}
+
+
+def ordered(ring):
+    """Samples of `ring`, oldest first"""
+    samples = (ring or {}).get("samples") or []
+    position = int((ring or {}).get("next") or 0)
+    return samples[position:] + samples[:position]
+
+
+def summarize(ring):
+    """Count, window in seconds, min, mean, 95th percentile and max of the samples of `ring`"""
+    samples = ordered(ring)
+    if not samples:
+        return None
+    values = sorted(value for _time, value in samples)
+    # nearest rank, so the percentile is always a measured value
+    rank = max(0, int(math.ceil(0.95 * len(values))) - 1)
+    return {
+        "count": len(values),
+        "window": round(samples[-1][0] - samples[0][0], 3),
+        "min": values[0],
+        "mean": round(sum(values) / len(values), 2),
+        "p95": values[rank],
+        "max": values[-1],
+    }
@@ -0,0 +1,122 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import heapq
+import time
+
+from datetime import datetime
+
+
+# Keys the platform templates store crash entries under
+CRASH_FILE_KEYS = ("crash_files", "cores", "crashinfo_files", "crash_lines")
+# Name of the entry, in order of preference, when it has no process/pid/datetime
+CRASH_NAME_KEYS = ("file", "path", "line")
+_DATETIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%b %d %Y %H:%M:%S")
+
+
+def crash_entries(crash_health):
+    """All crash entries of the parsed output as one list, whatever platform key they are under"""
+    entries = []
+    for key in CRASH_FILE_KEYS:
+        entries.extend((crash_health or {}).get(key) or [])
+    return entries
+
+
+def crash_key(entry):
+    """Stable identity of a crash entry: process/pid/datetime for cores, else the file name.
+
+    A file listed with a size or a date is keyed on them as well, so a file
+    rewritten under the same name is a new crash.
+    """
+    if entry.get("process"):
+        return "%s/%s/%s" % (entry["process"], entry.get("pid", ""), entry.get("datetime", ""))
+    for key in CRASH_NAME_KEYS:
+        if entry.get(key):
+            name = str(entry[key]).strip()
+            size = entry.get("size")
+            modified = crash_datetime(entry)
+            if size is None and modified is None:
+                return name
+            return "%s|%s|%s" % (name, "" if size is None else size, modified or "")
+    return None
+
+
+def crash_datetime(entry):
+    """Date of the crash as listed by the device, None when the entry carries none"""
+    if entry.get("datetime"):
+        return str(entry["datetime"]).strip()
+    if entry.get("year"):
+        return "%s %s %s %s" % (entry.get("month"), entry.get("day"), entry.get("year"), entry.get("time"))
+    return None
+
+
+def merge_seen(previous, keys, limit=None):
+    """Keys seen on the previous runs followed by the ones first seen now, the last `limit` kept.
+
+    Keys are kept across runs rather than replaced, so a crash missing from
+    one listing is not new again when it comes back.
+    """
+    merged = list(previous or [])
+    known = set(merged)
+    for key in keys:
+        if key is not None and key not in known:
+            known.add(key)
+            merged.append(key)
+    if limit:
+        merged = merged[-int(limit):]
+    return merged
+
+
+def crash_timestamp(entry):
+    """Epoch seconds of the crash, None when the entry carries no usable date"""
+    value = crash_datetime(entry)
+    if value is None:
+        return None
+    for fmt in _DATETIME_FORMATS:
+        try:
+            return time.mktime(datetime.strptime(value, fmt).timetuple())
+        except ValueError:
+            continue
+    return None
+
+
+def evaluate_crash_files(entries, seen=None, max_age=None, newest=10, now=None):
+    """Split crash entries into the ones seen on a previous run and the new ones.
+
+    `seen` is the list of keys saved by the previous run, turned into a set
+    so each entry costs one lookup. New entries older than `max_age` seconds
+    are treated as already triaged. Only the `newest` most recent entries
+    are kept for the summary.
+    """
+    seen = set(seen or [])
+    now = time.time() if now is None else float(now)
+    new = []
+    total = 0
+    newest_heap = []
+    for index, entry in enumerate(entries):
+        key = crash_key(entry)
+        if key is None:
+            continue
+        total += 1
+        timestamp = crash_timestamp(entry)
+        # entries without a date sort as oldest
+        order = (timestamp if timestamp is not None else float("-inf"), index)
+        if len(newest_heap) < newest:
+            heapq.heappush(newest_heap, (order, entry))
+        elif newest and order > newest_heap[0][0]:
+            heapq.heapreplace(newest_heap, (order, entry))
+        if key in seen:
+            continue
+        if max_age is not None and timestamp is not None and now - timestamp > max_age:
+            continue
+        new.append(dict(entry, key=key))
+
+    result = {
+        "status": "FAIL" if new else "PASS",
+        "total_crash_files": total,
+        "new_crash_files": len(new),
+        "new": new,
+        "newest": [entry for _order, entry in sorted(newest_heap, key=lambda item: item[0], reverse=True)],
+    }
+    return result
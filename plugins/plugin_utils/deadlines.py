@@ -0,0 +1,127 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import math
+import time
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.schedule import cached_result
+
+
+COLLECTION_STATUSES = ("OK", "TIMEOUT", "SKIPPED", "CACHED")
+
+# Keys of a health check result that are not checks
+RESULT_KEYS = ("result", "collection", "details")
+
+
+def missing_checks(commands, health_checks):
+    """Names of the checks whose collection command did not finish.
+
+    `commands` lists the commands of a role as dicts telling whether their
+    facts were `collected`, not when the command failed or timed out, and
+    the `checks` graded from them, a command without `checks` feeding every
+    check.
+    """
+    missing = set()
+    for command in commands or []:
+        if command.get("collected"):
+            continue
+        if command.get("checks") is None:
+            return sorted(key for key in (health_checks or {}) if key not in RESULT_KEYS)
+        missing.update(command["checks"])
+    return sorted(missing)
+
+
+def apply_deadline(health_checks, status, started_at, timeout, facts=None, task=None, finished_at=None, reason=None,
+                   previous=None, collected_at=None, phases=None, commands=None):
+    """Add the collection deadline stats to a health check result.
+
+    When `commands` are given, a collection where some of them did not
+    finish is a TIMEOUT: only the checks of those commands are reported as
+    TIMEOUT, the checks already collected keep their grade and the result
+    becomes PARTIAL, or FAIL when one of them failed. Nothing collected
+    makes the whole result TIMEOUT. A SKIPPED collection keeps no check,
+    only the reason. A CACHED collection, not due yet, returns the
+    `previous` result with its age.
+
+    The time of every phase, given as `phases` seconds, or as the
+    `collected_at` time splitting the elapsed time into `collect` and
+    `evaluate`, is kept under `phases`.
+    """
+    missing = None
+    if commands is not None and status in ("OK", "TIMEOUT"):
+        missing = missing_checks(commands, health_checks)
+        facts = any(command.get("collected") for command in commands)
+        if missing:
+            status = "TIMEOUT"
+    finished_at = time.time() if finished_at is None else float(finished_at)
+    collection = {
+        "status": status,
+        "timeout": int(timeout or 0),
+        "elapsed": round(finished_at - float(started_at), 3),
+    }
+    if task:
+        collection["task"] = task
+    if missing:
+        collection["missing"] = missing
+    if collected_at is not None and status in ("OK", "TIMEOUT"):
+        phases = {"collect": float(collected_at) - float(started_at), "evaluate": finished_at - float(collected_at)}
+    if phases:
+        collection["phases"] = dict((phase, round(max(float(seconds), 0.0), 6)) for phase, seconds in phases.items())
+    if status == "SKIPPED":
+        if reason:
+            collection["reason"] = reason
+        return {"result": "SKIPPED", "collection": collection}
+    if status == "CACHED":
+        return cached_result(previous, collection, finished_at)
+    health_checks = dict(health_checks or {})
+    health_checks["collection"] = collection
+    if status == "TIMEOUT":
+        if not facts:
+            health_checks["result"] = "TIMEOUT"
+        elif missing is None:
+            health_checks["result"] = "PARTIAL"
+        else:
+            for name in missing:
+                health_checks[name] = {"status": "TIMEOUT"}
+            failed = any(
+                isinstance(value, dict) and value.get("status") == "FAIL"
+                for key, value in health_checks.items() if key not in RESULT_KEYS
+            )
+            health_checks["result"] = "FAIL" if failed and health_checks.get("result") == "FAIL" else "PARTIAL"
+    return health_checks
+
+
+def percentile(values, percent):
+    """Nearest rank percentile of sorted values"""
+    if not values:
+        return None
+    rank = max(int(math.ceil(percent / 100.0 * len(values))), 1)
+    return values[rank - 1]
+
+
+def summarize_deadlines(results, slowest=5):
+    """Fleet wide collection stats from the health check results keyed by host"""
+    elapsed = []
+    summary = {"hosts": 0, "timeout": 0, "partial": 0, "skipped": 0, "cached": 0}
+    for host, health_checks in (results or {}).items():
+        collection = (health_checks or {}).get("collection")
+        if not collection:
+            continue
+        summary["hosts"] += 1
+        elapsed.append((collection.get("elapsed", 0), host))
+        if health_checks.get("result") == "TIMEOUT":
+            summary["timeout"] += 1
+        elif health_checks.get("result") == "PARTIAL":
+            summary["partial"] += 1
+        elif health_checks.get("result") == "SKIPPED":
+            summary["skipped"] += 1
+        if collection.get("status") == "CACHED":
+            summary["cached"] += 1
+    elapsed.sort()
+    values = [value for value, _host in elapsed]
+    summary["elapsed"] = dict(
+        (name, percentile(values, percent)) for name, percent in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+    )
+    summary["slowest"] = [{"host": host, "elapsed": value} for value, host in reversed(elapsed[-slowest:])] if slowest else []
+    return summary
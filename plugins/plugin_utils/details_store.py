@@ -0,0 +1,110 @@
+"""Keep the large details blocks of health check results out of the host facts.
+
+With `details` set the checks carry whole interface dicts and neighbor lists,
+which are copied into `hostvars`, pickled between the workers and the
+controller and kept for the rest of the play. `offload` writes every details
+block larger than `min_size` bytes of JSON to a gzip compressed file of a
+local directory and leaves a small reference in its place:
+
+    {"details_file": "/runs/1700000000/r1/bgp/all_neighbors_up.details.json.gz",
+     "size": 48213, "sha256": "..."}
+
+`resolve` loads the blocks back on demand, checking their digest.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+
+# Blocks of up to this many bytes of JSON stay in the result, a reference
+# being about 200 bytes
+MIN_SIZE = 4096
+REFERENCE_KEY = "details_file"
+
+
+def is_details(key):
+    """Whether a result key holds a details block"""
+    return key == "details" or str(key).startswith("detailed_")
+
+
+def is_reference(value):
+    return isinstance(value, dict) and REFERENCE_KEY in value
+
+
+def _safe(name):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(name)) or "_"
+
+
+def write_details(path, payload):
+    """Write `payload` to `path` as gzip compressed JSON, atomically, and return its reference"""
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(prefix=".%s." % os.path.basename(path), dir=directory)
+    try:
+        with os.fdopen(handle, "wb") as output:
+            # a fixed mtime keeps the file identical for identical details
+            with gzip.GzipFile(fileobj=output, mode="wb", mtime=0) as compressed:
+                compressed.write(text)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return {REFERENCE_KEY: path, "size": len(text), "sha256": hashlib.sha256(text).hexdigest()}
+
+
+def offload(health_checks, directory, host, role, min_size=MIN_SIZE):
+    """Copy of `health_checks` with its large details blocks written under `directory`.
+
+    The blocks of a host and role go to `<directory>/<host>/<role>/`, one
+    file per block named after its keys, e.g. `vrfs.default.details.json.gz`.
+    """
+    base = os.path.join(os.path.abspath(directory), _safe(host), _safe(role))
+
+    def walk(value, keys):
+        if not isinstance(value, dict):
+            return value
+        result = {}
+        for key, item in value.items():
+            if is_details(key) and not is_reference(item):
+                size = len(json.dumps(item, sort_keys=True, separators=(",", ":")))
+                if size > min_size:
+                    name = ".".join(_safe(part) for part in keys + [key]) + ".json.gz"
+                    result[key] = write_details(os.path.join(base, name), item)
+                    continue
+            result[key] = walk(item, keys + [key])
+        return result
+
+    return walk(health_checks, [])
+
+
+def load_details(reference):
+    """Details block of a reference, failing on a missing or altered file"""
+    path = reference[REFERENCE_KEY]
+    with gzip.open(path, "rb") as compressed:
+        text = compressed.read()
+    digest = reference.get("sha256")
+    if digest and hashlib.sha256(text).hexdigest() != digest:
+        raise ValueError("Details file %s does not match its reference, it was changed after the run" % path)
+    return json.loads(text.decode("utf-8"))
+
+
+def resolve(value):
+    """`value`, a reference or a result holding some, with every reference replaced by its block"""
+    if is_reference(value):
+        return load_details(value)
+    if isinstance(value, dict):
+        return dict((key, resolve(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return [resolve(item) for item in value]
+    return value
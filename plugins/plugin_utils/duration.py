@@ -0,0 +1,70 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import re
+
+from functools import lru_cache
+
+
+UNIT_SECONDS = {"y": 365 * 86400, "w": 7 * 86400, "d": 86400, "h": 3600, "m": 60, "s": 1}
+NEVER = ("never", "n/a", "na", "-", "")
+
+# "4w4d", "1y2w", "2d03h", "1 year, 2 weeks, 3 days", "3 day(s), 4 hour(s)"
+_UNIT_RE = re.compile(
+    r"(\d+)\s*(?:(y)(?:ears?|rs?)?|(w)(?:eeks?|ks?)?|(d)(?:ays?)?|(h)(?:ours?|rs?)?|(m)(?:inutes?|ins?)?|(s)(?:econds?|ecs?)?)(?:\(s\))?(?![a-z])",
+    re.IGNORECASE,
+)
+_SEPARATOR_RE = re.compile(r"^[\s,]*(?:and)?[\s,]*$")
+# "01:02:03", "1d02:03:04" and "02:03"
+_CLOCK_RE = re.compile(r"^(?:(\d+)d\s*)?(\d+):(\d{2})(?::(\d{2}))?$", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def parse_duration(value):
+    """Return the number of seconds in a device duration string.
+
+    A bare number is seconds. None is returned for values meaning the
+    session never came up and for strings that cannot be parsed. Results are memoized since the same
+    uptime strings repeat across thousands of peers.
+    """
+    value = value.strip().lower()
+    if value in NEVER:
+        return None
+    # a bare number is seconds, as extra vars and INI inventories pass them
+    if value.isdigit():
+        return int(value)
+
+    match = _CLOCK_RE.match(value)
+    if match:
+        days, hours, minutes, seconds = match.groups()
+        return int(days or 0) * 86400 + int(hours) * 3600 + int(minutes) * 60 + int(seconds or 0)
+
+    total = 0
+    end = 0
+    for match in _UNIT_RE.finditer(value):
+        if not _SEPARATOR_RE.match(value[end:match.start()]):
+            return None
+        unit = next(group for group in match.groups()[1:] if group)
+        total += int(match.group(1)) * UNIT_SECONDS[unit.lower()]
+        end = match.end()
+    if end == 0 or not _SEPARATOR_RE.match(value[end:]):
+        return None
+    return total
+
+
+def duration_seconds(value):
+    """Seconds for a duration given as a string, a number of seconds or a dict of units"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, dict):
+        total = 0
+        for key, unit in (("years", "y"), ("weeks", "w"), ("days", "d"), ("hours", "h"), ("minutes", "m"), ("seconds", "s")):
+            try:
+                total += int(value.get(key) or 0) * UNIT_SECONDS[unit]
+            except (TypeError, ValueError):
+                return None
+        return total
+    return parse_duration(str(value))
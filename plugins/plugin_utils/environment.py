@@ -0,0 +1,144 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import re
+from array import array
+
+
+# Sensor classes matched against the sensor name, first match wins
+SENSOR_CLASSES = (
+    ("inlet", re.compile(r"inlet|intake|front|ambient", re.I)),
+    ("outlet", re.compile(r"outlet|exhaust|back|rear", re.I)),
+    ("cpu", re.compile(r"cpu|x86", re.I)),
+    ("asic", re.compile(r"asic|homewood|tahoe|sugarbowl|lacrosse|heavenly|\bls\d*\b|\bns\d*\b", re.I)),
+    ("psu", re.compile(r"psu|power|\bps\d*\b", re.I)),
+)
+OK_STATUSES = ("ok", "normal", "good", "powered-up", "on", "present")
+ABSENT_STATUSES = ("absent", "none", "not present", "notpresent", "n/a")
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def sensor_class(name):
+    """Class of a temperature sensor (inlet, outlet, cpu, asic, psu or other) from its name"""
+    for cls, regex in SENSOR_CLASSES:
+        if regex.search(name or ""):
+            return cls
+    return "other"
+
+
+def build_sensor_table(sensors):
+    """Convert parsed temperature sensors into columns.
+
+    `sensors` is a dict keyed by '<module>/<sensor>' or a list of dicts with
+    module, sensor, current, major and minor keys. Readings are stored in
+    array('d') columns (NaN when the device reports no threshold) so the
+    evaluation is a single pass over flat arrays.
+    """
+    if isinstance(sensors, dict):
+        rows = [dict(data or {}, name=name) for name, data in sensors.items()]
+    else:
+        rows = [dict(data, name=data.get("name") or "%s/%s" % (data.get("module"), data.get("sensor"))) for data in sensors or []]
+
+    table = {"names": [], "modules": [], "classes": [], "statuses": [],
+             "current": array("d"), "major": array("d"), "minor": array("d")}
+    nan = float("nan")
+    for row in rows:
+        current = _to_float(row.get("current"))
+        if current is None:
+            continue
+        major = _to_float(row.get("major"))
+        minor = _to_float(row.get("minor"))
+        table["names"].append(row["name"])
+        table["modules"].append(str(row.get("module", "")))
+        table["classes"].append(sensor_class(row.get("sensor") or row["name"]))
+        table["statuses"].append(str(row.get("status", "")).strip().lower())
+        table["current"].append(current)
+        table["major"].append(nan if major is None else major)
+        table["minor"].append(nan if minor is None else minor)
+    return table
+
+
+def evaluate_sensors(sensors, default_threshold, class_thresholds=None):
+    """Evaluate every temperature sensor against its class threshold.
+
+    The failure threshold of a sensor is the class threshold when one is
+    given, the device major threshold otherwise, and `default_threshold`
+    when the device reports none. Reaching the device minor threshold, or
+    a non OK status, is a warning. Only the out of bounds sensors are
+    returned, along with max and mean temperature per module.
+    """
+    class_thresholds = dict((str(cls).lower(), float(value)) for cls, value in (class_thresholds or {}).items())
+    default_threshold = float(default_threshold)
+    table = build_sensor_table(sensors)
+    current, major, minor = table["current"], table["major"], table["minor"]
+
+    summary = {"total": len(table["names"]), "failed": 0, "warning": 0}
+    out_of_bounds = []
+    modules = {}
+    for idx, name in enumerate(table["names"]):
+        cls = table["classes"][idx]
+        reading = current[idx]
+        limit = class_thresholds.get(cls)
+        if limit is None:
+            limit = major[idx] if major[idx] == major[idx] else default_threshold
+        status = "PASS"
+        if reading >= limit:
+            status = "FAIL"
+        elif (minor[idx] == minor[idx] and reading >= minor[idx]) or table["statuses"][idx] not in OK_STATUSES + ("",):
+            status = "WARNING"
+
+        module = modules.setdefault(table["modules"][idx], [0, 0.0, None])
+        module[0] += 1
+        module[1] += reading
+        module[2] = reading if module[2] is None else max(module[2], reading)
+
+        if status != "PASS":
+            summary["failed" if status == "FAIL" else "warning"] += 1
+            out_of_bounds.append({
+                "name": name,
+                "module": table["modules"][idx],
+                "class": cls,
+                "current": reading,
+                "threshold": limit,
+                "status": status,
+            })
+
+    result = {"status": "FAIL" if summary["failed"] else "WARNING" if summary["warning"] else "PASS"}
+    result.update(summary)
+    result["out_of_bounds"] = out_of_bounds
+    result["modules"] = dict(
+        (module, {"count": count, "max": peak, "mean": round(total / count, 2)})
+        for module, (count, total, peak) in modules.items()
+    )
+    return result
+
+
+def evaluate_units(units):
+    """Summarize power supply or fan rows, listing the ones not reporting an OK status.
+
+    Absent units (empty slots) are counted separately and do not fail the check.
+    """
+    if isinstance(units, dict):
+        units = [dict(data or {}, name=name) for name, data in units.items()]
+    summary = {"total": 0, "ok": 0, "absent": 0}
+    failed = []
+    for unit in units or []:
+        summary["total"] += 1
+        status = str(unit.get("status", "")).strip().lower()
+        if status in OK_STATUSES:
+            summary["ok"] += 1
+        elif status in ABSENT_STATUSES:
+            summary["absent"] += 1
+        else:
+            failed.append({"name": unit.get("name"), "status": unit.get("status")})
+    result = {"status": "FAIL" if failed else "PASS"}
+    result.update(summary)
+    result["failed"] = failed
+    return result
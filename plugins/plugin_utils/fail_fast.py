@@ -0,0 +1,45 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+# Relative device cost of the collection of each role, cheapest first, so the
+# short, high signal checks run before the large neighbor and interface tables
+COLLECTION_COST = {
+    "uptime": 1,
+    "cpu": 2,
+    "memory": 2,
+    "environment": 3,
+    "crashfiles": 3,
+    "filesystem": 4,
+    "ospf": 5,
+    "bgp": 6,
+    "interfaces": 7,
+}
+
+# Health check result keys of the checks not stored under their own name
+CHECK_NAMES = {
+    "environment": "environment_minimum_threshold",
+    "filesystem": "filesystem_status_summary",
+    "filesystems": "filesystem_status_summary",
+}
+
+
+def order_roles(roles, cost=None):
+    """Roles sorted cheapest collection first, unknown roles last in their given order"""
+    cost = dict(COLLECTION_COST, **(cost or {}))
+    last = max(cost.values()) + 1
+    return sorted(roles, key=lambda role: cost.get(role.rsplit(".", 1)[-1], last))
+
+
+def failed_checks(health_checks, critical):
+    """Names of the critical checks that failed in a health check result"""
+    critical = set(critical or [])
+    failed = []
+    for key, value in sorted((health_checks or {}).items()):
+        if not isinstance(value, dict) or value.get("status") != "FAIL":
+            continue
+        name = CHECK_NAMES.get(key, key)
+        if (name in critical or key in critical) and name not in failed:
+            failed.append(name)
+    return failed
@@ -0,0 +1,90 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import heapq
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def normalize_name(name):
+    """'bootflash:', 'bootflash://sup-local/' and 'bootflash' all map to 'bootflash'"""
+    return str(name).split(":", 1)[0].strip("/ ")
+
+
+def free_percent(free, total):
+    """Free space in percent, None when the total size is missing or zero"""
+    total = _to_float(total)
+    if total <= 0:
+        return None
+    return round(_to_float(free) / total * 100, 2)
+
+
+def iter_filesystems(filesystems):
+    """Yield (name, data) from either a dict keyed by prefix or a list of dicts"""
+    if isinstance(filesystems, dict):
+        for name, data in filesystems.items():
+            yield name, data or {}
+    else:
+        for data in filesystems or []:
+            yield data.get("name") or data.get("prefix"), data
+
+
+def _keep_lowest(heap, entry, count):
+    """Push `entry` on a max-heap on free percent holding the `count` smallest entries"""
+    if len(heap) < count:
+        heapq.heappush(heap, entry)
+    elif count and entry > heap[0]:
+        heapq.heapreplace(heap, entry)
+
+
+def evaluate_filesystems(filesystems, default_threshold, thresholds=None, lowest_count=5):
+    """Evaluate every filesystem against its free space threshold in one pass.
+
+    Per filesystem thresholds are looked up by normalized name and fall back
+    to the default threshold. Only the `lowest_count` filesystems with the
+    least free space, and the names of the `lowest_count` failing ones with
+    the least free space, are kept in bounded heaps, so the result stays
+    small on chassis with dozens of filesystems. `failed` counts them all.
+    """
+    thresholds = dict((normalize_name(name), float(value)) for name, value in (thresholds or {}).items())
+    default_threshold = float(default_threshold)
+    lowest_count = int(lowest_count)
+    summary = {"total": 0, "evaluated": 0, "invalid": 0, "failed": 0}
+    failed = []
+    heap = []
+    for index, (name, data) in enumerate(iter_filesystems(filesystems)):
+        summary["total"] += 1
+        percent = free_percent(data.get("free"), data.get("total"))
+        if percent is None:
+            summary["invalid"] += 1
+            continue
+        summary["evaluated"] += 1
+        threshold = thresholds.get(normalize_name(name), default_threshold)
+        # entries negate the free percent, heapq being a min-heap
+        if percent < threshold:
+            summary["failed"] += 1
+            _keep_lowest(failed, (-percent, index, name), lowest_count)
+        _keep_lowest(heap, (-percent, index, name, data, threshold), lowest_count)
+
+    lowest_free = []
+    for neg_percent, _index, name, data, threshold in sorted(heap, reverse=True):
+        lowest_free.append({
+            "name": name,
+            "status": "FAIL" if -neg_percent < threshold else "PASS",
+            "free_percent": -neg_percent,
+            "threshold": threshold,
+            "total": data.get("total", 0),
+            "free": data.get("free", 0),
+        })
+
+    result = {"status": "FAIL" if summary["failed"] or not summary["evaluated"] else "PASS"}
+    result.update(summary)
+    result["failed_filesystems"] = [name for _neg_percent, _index, name in sorted(failed, reverse=True)]
+    result["lowest_free"] = lowest_free
+    return result
@@ -0,0 +1,181 @@
+"""Re-grade saved health facts for a whole fleet without connecting to devices.
+
+Usage:
+    python -m ansible_collections.network.healthchecks.plugins.plugin_utils.fleet_evaluator \\
+        --filter health_check_view --target checks.yml --output results.jsonl facts_dir/
+
+The input is a directory of JSON files (one device per file, the host name
+defaults to the file name) or a JSONL file (one device per line). A record
+is either the raw health facts or a dict with `host`, `health_facts` and an
+optional `target` overriding `--target`. Results are written as JSONL, one
+`{"host": ..., "result": ...}` line per device, in completion order.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import itertools
+import json
+import os
+import sys
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import yaml
+
+
+FILTERS = {
+    "health_check_view": "ansible_collections.network.healthchecks.plugins.filter.health_check_view",
+    "ospf_health_check_view": "ansible_collections.network.healthchecks.plugins.filter.ospf_health_check_view",
+    "interfaces_health_check_view": "ansible_collections.network.healthchecks.plugins.filter.interfaces_health_check_view",
+    "filesystem_health_check_view": "ansible_collections.network.healthchecks.plugins.filter.filesystem_health_check_view",
+}
+
+# Settings of the worker process, set once by the pool initializer
+_WORKER = {}
+
+
+def load_filter(name):
+    """Import a filter plugin module and return its filter function"""
+    module = __import__(FILTERS[name], fromlist=[name])
+    return getattr(module, name)
+
+
+def init_worker(filter_name, target, options):
+    _WORKER["filter"] = load_filter(filter_name)
+    _WORKER["target"] = target
+    _WORKER["options"] = options
+
+
+def iter_sources(path):
+    """Yield (host, kind, payload) without reading the records themselves.
+
+    Records are loaded in the worker so JSON decoding scales with the pool
+    and the parent only ever holds the records in flight.
+    """
+    if os.path.isdir(path):
+        for entry in os.scandir(path):
+            if entry.is_file() and entry.name.endswith(".json"):
+                yield entry.name[:-len(".json")], "file", entry.path
+        return
+    with open(path) as handle:
+        for number, line in enumerate(handle, 1):
+            if line.strip():
+                yield "line %d" % number, "line", line
+
+
+def load_record(host, kind, payload):
+    if kind == "file":
+        with open(payload) as handle:
+            record = json.load(handle)
+    else:
+        record = json.loads(payload)
+    if isinstance(record, dict) and "health_facts" in record:
+        return record.get("host", host), record["health_facts"], record.get("target")
+    return host, record, None
+
+
+def evaluate(source):
+    """Grade one device, returning its overall result and its JSONL line"""
+    host, kind, payload = source
+    try:
+        host, health_facts, target = load_record(host, kind, payload)
+        result = _WORKER["filter"](health_facts, target or _WORKER["target"], **_WORKER["options"])
+    except Exception as exc:  # one bad record must not stop the fleet
+        return "error", json.dumps({"host": host, "error": "%s: %s" % (type(exc).__name__, exc)})
+    status = result.get("result", "unknown") if isinstance(result, dict) else "unknown"
+    return status, json.dumps({"host": host, "result": result}, sort_keys=True, default=str)
+
+
+def evaluate_batch(sources):
+    return [evaluate(source) for source in sources]
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    batch = list(itertools.islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(itertools.islice(iterator, size))
+
+
+def run(sources, output, filter_name, target, options, workers, max_in_flight, batch_size=64):
+    """Evaluate every source, keeping at most `max_in_flight` batches queued.
+
+    Records are sent to the pool in batches of `batch_size` so the per task
+    overhead of the pool is paid once per batch rather than once per device.
+
+    Returns the number of devices per result (PASS, FAIL, WARNING, error).
+    """
+    counts = {}
+
+    def write(evaluated):
+        for status, line in evaluated:
+            output.write(line + "\n")
+            counts[status] = counts.get(status, 0) + 1
+
+    if workers <= 1:
+        init_worker(filter_name, target, options)
+        for source in sources:
+            write([evaluate(source)])
+        return counts
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(filter_name, target, options)) as pool:
+        pending = set()
+        for batch in batched(sources, batch_size):
+            pending.add(pool.submit(evaluate_batch, batch))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(future.result())
+        for future in pending:
+            write(future.result())
+    return counts
+
+
+def parse_option(value):
+    key, sep, raw = value.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError("options are given as key=value, got %r" % value)
+    try:
+        return key, json.loads(raw)
+    except ValueError:
+        return key, raw
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate saved health facts for a fleet of devices.")
+    parser.add_argument("source", help="directory of JSON files or JSONL file of saved health facts")
+    parser.add_argument("--filter", dest="filter_name", choices=sorted(FILTERS), default="health_check_view")
+    parser.add_argument("--target", help="JSON or YAML file with the filter target (list of checks or health_check dict)")
+    parser.add_argument("--option", action="append", type=parse_option, default=[],
+                        help="filter keyword argument as key=value, the value is decoded as JSON when possible")
+    parser.add_argument("--output", help="JSONL result file, standard output by default")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-in-flight", type=int, default=0,
+                        help="batches queued to the pool at once, 4 per worker by default")
+    parser.add_argument("--batch-size", type=int, default=64, help="records sent to a worker per task")
+    args = parser.parse_args(argv)
+
+    target = None
+    if args.target:
+        with open(args.target) as handle:
+            target = yaml.safe_load(handle)
+    max_in_flight = args.max_in_flight or args.workers * 4
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        counts = run(iter_sources(args.source), output, args.filter_name, target,
+                     dict(args.option), args.workers, max_in_flight, args.batch_size)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    sys.stderr.write(json.dumps(counts, sort_keys=True) + "\n")
+    return 1 if counts.get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
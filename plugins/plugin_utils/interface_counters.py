@@ -0,0 +1,129 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from array import array
+
+
+# Error and discard columns, every sample holds them
+COUNTER_KEYS = ("in_errors", "out_errors", "crc", "in_discards", "out_discards")
+# Byte columns, only parsed, with the bandwidth, when the utilization is checked
+UTILIZATION_KEYS = ("in_octets", "out_octets")
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def build_sample(interfaces, sampled_at, utilization=False):
+    """Convert parsed interfaces into a columnar counter sample.
+
+    Interface names are kept in one list and every counter in its own
+    array('d') indexed like the names, so a 20k interface device costs
+    a handful of flat arrays instead of a dict per interface. The byte
+    counters and the bandwidth are only kept with `utilization`.
+    """
+    keys = COUNTER_KEYS + (UTILIZATION_KEYS if utilization else ())
+    names = []
+    bandwidth = array("d")
+    counters = dict((key, array("d")) for key in keys)
+    for name, interface in (interfaces or {}).items():
+        interface_counters = interface.get("counters")
+        if not interface_counters:
+            continue
+        names.append(name)
+        if utilization:
+            bandwidth.append(_to_float(interface_counters.get("bandwidth")))
+        for key in keys:
+            counters[key].append(_to_float(interface_counters.get(key)))
+    return {"sampled_at": _to_float(sampled_at), "names": names, "bandwidth": bandwidth, "counters": counters}
+
+
+def load_sample(sample):
+    """Rebuild the arrays of a sample that went through JSON (lists instead of arrays)"""
+    if not sample or not sample.get("names"):
+        return None
+    empty = [0.0] * len(sample["names"])
+    counters = sample.get("counters") or {}
+    return {
+        "sampled_at": _to_float(sample.get("sampled_at")),
+        "names": list(sample["names"]),
+        "bandwidth": array("d", sample.get("bandwidth") or []),
+        "counters": dict(
+            (key, array("d", counters.get(key) or empty))
+            for key in COUNTER_KEYS + tuple(key for key in UTILIZATION_KEYS if key in counters)
+        ),
+    }
+
+
+def dump_sample(sample):
+    """JSON friendly copy of a sample"""
+    return {
+        "sampled_at": sample["sampled_at"],
+        "names": sample["names"],
+        "bandwidth": sample["bandwidth"].tolist(),
+        "counters": dict((key, column.tolist()) for key, column in sample["counters"].items()),
+    }
+
+
+def compute_rates(previous, current, max_error_rate, max_discard_rate, max_utilization=None):
+    """Compare two samples and return the summary and the interfaces above a threshold.
+
+    Rates are per second over the time between the samples. Utilization,
+    the busiest direction in percent of the interface bandwidth, is only
+    evaluated with `max_utilization` and byte counters in both samples.
+    Interfaces whose counters went backwards (cleared or wrapped) are
+    skipped.
+    """
+    interval = current["sampled_at"] - previous["sampled_at"]
+    summary = {"interval": round(interval, 2), "total": len(current["names"]), "evaluated": 0, "skipped": 0, "flagged": 0}
+    flagged = {}
+    if interval <= 0:
+        summary["skipped"] = summary["total"]
+        return summary, flagged
+
+    utilization_keys = ()
+    if max_utilization is not None and all(
+        key in sample["counters"] for sample in (previous, current) for key in UTILIZATION_KEYS
+    ):
+        utilization_keys = UTILIZATION_KEYS
+    keys = COUNTER_KEYS + utilization_keys
+    prev_index = dict((name, idx) for idx, name in enumerate(previous["names"]))
+    columns = [(current["counters"][key], previous["counters"][key]) for key in keys]
+    in_errors, out_errors, crc, in_discards, out_discards = range(len(COUNTER_KEYS))
+    for idx, name in enumerate(current["names"]):
+        pidx = prev_index.get(name)
+        if pidx is None:
+            summary["skipped"] += 1
+            continue
+        deltas = [cur[idx] - prev[pidx] for cur, prev in columns]
+        if min(deltas) < 0:
+            summary["skipped"] += 1
+            continue
+        summary["evaluated"] += 1
+
+        error_rate = (deltas[in_errors] + deltas[out_errors]) / interval
+        discard_rate = (deltas[in_discards] + deltas[out_discards]) / interval
+        rates = {
+            "error_rate": round(error_rate, 4),
+            "crc_rate": round(deltas[crc] / interval, 4),
+            "discard_rate": round(discard_rate, 4),
+        }
+        over = error_rate > max_error_rate or discard_rate > max_discard_rate
+        if utilization_keys:
+            bandwidth = current["bandwidth"][idx]
+            utilization = 0.0
+            if bandwidth > 0:
+                # bandwidth is reported in Kbit/sec, the bytes follow the error columns
+                octets = max(deltas[len(COUNTER_KEYS):])
+                utilization = octets * 8 / interval / (bandwidth * 1000) * 100
+            rates["utilization"] = round(utilization, 2)
+            over = over or utilization > max_utilization
+
+        if over:
+            summary["flagged"] += 1
+            flagged[name] = rates
+    return summary, flagged
@@ -0,0 +1,259 @@
+"""Render health check results as an OpenMetrics text file.
+
+Usage:
+    python -m ansible_collections.network.healthchecks.plugins.plugin_utils.openmetrics \\
+        --output /var/lib/node_exporter/textfile_collector/healthchecks.prom results/
+
+The file is meant for the textfile collector of the node exporter: it is
+written to a temporary file next to it and renamed over it, so a scrape
+never reads half of it. Records are the `{"host", "role", "result"}` records
+of the sharding merge, with an optional `platform`.
+
+Per host the file holds the result of every role and check as a status code
+and the numbers of the checks: CPU and memory utilization, filesystem free
+percent, neighbors and interfaces up and down. Per role and platform it
+holds the count of hosts per result and histograms of the collection time
+and of the time of every collection phase. Those do not grow with the host
+count; the per host series are written worst host first until `max_series`
+is reached, the hosts left out being counted in `healthchecks_hosts_omitted`.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.sharding import SEVERITY, iter_records
+
+
+# Upper bounds of the latency histogram buckets, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# Status codes, higher is worse: PASS 0, SKIPPED 1, WARNING 2, PARTIAL 3, TIMEOUT 4, FAIL 5
+STATUS_CODES = dict((status, len(SEVERITY) - 1 - index) for index, status in enumerate(SEVERITY))
+# Per host series written by default, about 2 MB of text
+MAX_SERIES = 20000
+FAMILIES = (
+    ("healthchecks_result", "gauge", "Result of a role on a host, " + ", ".join(
+        "%s %d" % (status, code) for status, code in sorted(STATUS_CODES.items(), key=lambda item: item[1]))),
+    ("healthchecks_check_status", "gauge", "Status of a check of a role on a host, coded as healthchecks_result"),
+    ("healthchecks_cpu_utilization_percent", "gauge", "CPU utilization over the 1 and 5 minute windows"),
+    ("healthchecks_memory_utilization_percent", "gauge", "Memory utilization"),
+    ("healthchecks_filesystem_free_percent", "gauge", "Free space of the filesystem checked"),
+    ("healthchecks_neighbors", "gauge", "BGP or OSPF neighbors up and down"),
+    ("healthchecks_interfaces", "gauge", "Interfaces up and down, operationally and administratively"),
+    ("healthchecks_hosts", "gauge", "Hosts per role and result"),
+    ("healthchecks_hosts_omitted", "gauge", "Hosts whose series were left out to keep within the series limit"),
+    ("healthchecks_collection_seconds", "histogram", "Collection time of a role, per platform"),
+    ("healthchecks_phase_seconds", "histogram", "Time of a collection phase of a role, per platform"),
+    ("healthchecks_generated_timestamp_seconds", "gauge", "Time the file was written"),
+)
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def sample(name, labels, value):
+    text = ",".join('%s="%s"' % (key, escape(label)) for key, label in labels)
+    return "%s{%s} %s" % (name, text, _number(value)) if text else "%s %s" % (name, _number(value))
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Histogram(object):
+    """Latency histogram with the fixed BUCKETS"""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        value = float(value)
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            cumulative += count
+            yield sample(name + "_bucket", labels + [("le", _number(bound))], cumulative)
+        yield sample(name + "_bucket", labels + [("le", "+Inf")], self.count)
+        yield sample(name + "_count", labels, self.count)
+        yield sample(name + "_sum", labels, round(self.sum, 6))
+
+
+def platform_name(network_os):
+    """'cisco.ios.ios' -> 'ios'"""
+    return str(network_os or "unknown").split(".")[-1]
+
+
+def host_samples(host, role, health_checks):
+    """(family, labels, value) of the result, checks and numbers of a role on a host"""
+    labels = [("host", host), ("role", role)]
+    found = [("healthchecks_result", labels, STATUS_CODES.get(health_checks.get("result"), -1))]
+    counted = False
+    for name in sorted(health_checks):
+        check = health_checks[name]
+        if not isinstance(check, dict):
+            continue
+        if check.get("status") in STATUS_CODES:
+            found.append(("healthchecks_check_status", labels + [("check", name)], STATUS_CODES[check["status"]]))
+        if name == "cpu_utilization":
+            for window, key in (("1m", "1_min_avg"), ("5m", "5_min_avg")):
+                if isinstance(check.get(key), (int, float)):
+                    found.append(("healthchecks_cpu_utilization_percent", labels + [("window", window)], check[key]))
+        elif name == "memory_utilization" and isinstance(check.get("current_utilization"), (int, float)):
+            found.append(("healthchecks_memory_utilization_percent", labels, check["current_utilization"]))
+        elif name == "filesystem" and isinstance(check.get("free_percent"), (int, float)):
+            found.append(("healthchecks_filesystem_free_percent", labels, check["free_percent"]))
+        elif "interfaces_status_summery" in check and not counted:
+            # every interface check of the role carries the same summary
+            counted = True
+            summary = check["interfaces_status_summery"]
+            for state in ("up", "down", "admin_up", "admin_down"):
+                found.append(("healthchecks_interfaces", labels + [("state", state)], summary.get(state, 0)))
+        elif isinstance(check.get("up"), int) and isinstance(check.get("down"), int) and not counted:
+            # as every neighbor check carries the same counts
+            counted = True
+            for state in ("up", "down"):
+                found.append(("healthchecks_neighbors", labels + [("state", state)], check[state]))
+    return found
+
+
+def observe(histograms, role, platform, health_checks):
+    """Add the collection and phase times of a result to `(collection, phases)` histograms"""
+    timing = health_checks.get("collection") or {}
+    if timing.get("status") not in ("OK", "TIMEOUT") or timing.get("elapsed") is None:
+        return
+    collection, phases = histograms
+    collection.setdefault((role, platform), Histogram()).observe(timing["elapsed"])
+    for phase, seconds in sorted((timing.get("phases") or {}).items()):
+        phases.setdefault((role, platform, phase), Histogram()).observe(seconds)
+
+
+def render(results, platforms=None, max_series=MAX_SERIES, histograms=None, now=None):
+    """OpenMetrics text of the results of every host, `{host: {role: health_checks}}`.
+
+    `platforms` maps hosts to their network os. The latency histograms are
+    built from the collection times of the results unless `histograms`, the
+    `(collection, phases)` histograms kept by the caller over many results,
+    is given.
+    """
+    platforms = platforms or {}
+    families = dict((name, []) for name, _kind, _help in FAMILIES)
+    hosts = {}
+    built = ({}, {})
+    ranked = []
+    for host, roles in (results or {}).items():
+        worst = 0
+        for role, health_checks in sorted((roles or {}).items()):
+            if not isinstance(health_checks, dict):
+                continue
+            result = health_checks.get("result", "unknown")
+            hosts[(role, result)] = hosts.get((role, result), 0) + 1
+            worst = max(worst, STATUS_CODES.get(result, 0))
+            if histograms is None:
+                observe(built, role, platform_name(platforms.get(host)), health_checks)
+        ranked.append((-worst, str(host)))
+    collection, phases = histograms if histograms is not None else built
+
+    # worst hosts first, so the failures are the last to be left out
+    written = omitted = 0
+    for _worst, host in sorted(ranked):
+        found = []
+        for role, health_checks in sorted((results[host] or {}).items()):
+            if isinstance(health_checks, dict):
+                found.extend(host_samples(host, role, health_checks))
+        if max_series is not None and written + len(found) > max_series:
+            omitted += 1
+            continue
+        written += len(found)
+        for family, labels, value in found:
+            families[family].append(sample(family, labels, value))
+
+    for (role, result), count in sorted(hosts.items()):
+        families["healthchecks_hosts"].append(sample("healthchecks_hosts", [("role", role), ("result", result)], count))
+    families["healthchecks_hosts_omitted"].append(sample("healthchecks_hosts_omitted", [], omitted))
+    for (role, platform), histogram in sorted(collection.items()):
+        families["healthchecks_collection_seconds"].extend(
+            histogram.samples("healthchecks_collection_seconds", [("role", role), ("platform", platform)]))
+    for (role, platform, phase), histogram in sorted(phases.items()):
+        families["healthchecks_phase_seconds"].extend(
+            histogram.samples("healthchecks_phase_seconds", [("role", role), ("platform", platform), ("phase", phase)]))
+    families["healthchecks_generated_timestamp_seconds"].append(
+        sample("healthchecks_generated_timestamp_seconds", [], round(time.time() if now is None else now, 3)))
+
+    lines = []
+    for name, kind, help_text in FAMILIES:
+        if not families[name]:
+            continue
+        lines.append("# TYPE %s %s" % (name, kind))
+        if name.endswith("_seconds"):
+            lines.append("# UNIT %s seconds" % name)
+        lines.append("# HELP %s %s." % (name, help_text))
+        lines.extend(families[name])
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path, text):
+    """Write `text` to `path` atomically, through a temporary file renamed over it"""
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temporary = tempfile.mkstemp(prefix=".%s." % os.path.basename(path), dir=directory)
+    try:
+        with os.fdopen(handle, "w") as output:
+            output.write(text)
+            output.flush()
+            os.fsync(output.fileno())
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def from_records(records):
+    """Results and platforms of the hosts, the later record of a host and role winning"""
+    results = {}
+    platforms = {}
+    for record in records:
+        if not isinstance(record.get("result"), dict):
+            continue
+        results.setdefault(record.get("host"), {})[record.get("role") or "all"] = record["result"]
+        if record.get("platform"):
+            platforms[record["host"]] = record["platform"]
+    return results, platforms
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write health check results as an OpenMetrics text file.")
+    parser.add_argument("sources", nargs="+", help="result JSON or JSONL files, or directories of them")
+    parser.add_argument("--output", help="file written atomically, standard output by default")
+    parser.add_argument("--max-series", type=int, default=MAX_SERIES, help="per host series written at most")
+    args = parser.parse_args(argv)
+
+    results, platforms = from_records(iter_records(args.sources))
+    text = render(results, platforms, args.max_series)
+    if args.output:
+        write_textfile(args.output, text)
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
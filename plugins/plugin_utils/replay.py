@@ -0,0 +1,206 @@
+"""Replay saved CLI captures through the collection templates and filters.
+
+Usage:
+    python -m ansible_collections.network.healthchecks.plugins.plugin_utils.replay \\
+        --os ios captures.txt
+
+    python -m ansible_collections.network.healthchecks.plugins.plugin_utils.replay \\
+        --os nxos --facts-key fs_health --filter filesystem_health_check_view \\
+        --target checks.yml captures/
+
+Captures are either a directory laid out as `<host>/<command>.txt` or an
+archive of concatenated captures, each preceded by a header line:
+
+    ### host=<host> [os=<network os>] command=<command>
+
+Archives are memory-mapped and split on the header lines, so only the
+record being parsed is decoded in memory. The template of a record is
+looked up in the role templates as `<os>_<command>.yaml`, the command with
+every run of non alphanumeric characters replaced by `_`, the same names
+the native parser of ansible.utils.cli_parse resolves, or as the template
+the role tasks pass in `template_path` (`dir <filesystem>` on NX-OS).
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+
+from functools import lru_cache
+
+import yaml
+
+from ansible_collections.ansible.netcommon.plugins.module_utils.cli_parser.cli_parsertemplate import (
+    CliParserTemplate,
+)
+from ansible_collections.network.healthchecks.plugins.plugin_utils.bundle import load_yaml
+from ansible_collections.network.healthchecks.plugins.plugin_utils.fleet_evaluator import (
+    FILTERS,
+    load_filter,
+    parse_option,
+)
+
+
+ROLES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "roles")
+HEADER_RE = re.compile(rb"^### host=(?P<host>\S+)(?: os=(?P<os>\S+))? command=(?P<command>[^\r\n]+?)\r?$", re.M)
+_COMMAND_RE = re.compile(r"[^0-9a-z]+")
+# Commands the role tasks parse with a template_path, their template not
+# being named after the command, as `(os, command pattern, template name)`
+TEMPLATE_PATHS = (
+    ("nxos", re.compile(r"^dir\s+\S+:\S*$"), "nxos_dir_filesystem"),
+)
+
+
+def template_name(network_os, command):
+    """'ios', 'show ip bgp summary' -> 'ios_show_ip_bgp_summary'"""
+    return "%s_%s" % (network_os, _COMMAND_RE.sub("_", command.lower()).strip("_"))
+
+
+@lru_cache(maxsize=None)
+def template_index(roles_dir=ROLES_DIR):
+    """Template file name (without extension) to path, over every role"""
+    index = {}
+    for role in sorted(os.listdir(roles_dir)):
+        templates = os.path.join(roles_dir, role, "templates")
+        if not os.path.isdir(templates):
+            continue
+        for name in sorted(os.listdir(templates)):
+            if name.endswith(".yaml"):
+                index.setdefault(name[:-len(".yaml")], os.path.join(templates, name))
+    return index
+
+
+def find_template(network_os, command):
+    for platform, pattern, name in TEMPLATE_PATHS:
+        if platform == network_os and pattern.match(command.strip()):
+            return template_index().get(name)
+    return template_index().get(template_name(network_os, command))
+
+
+@lru_cache(maxsize=None)
+def load_template(path):
+    return load_yaml(path)
+
+
+def parse_capture(template_path, text):
+    """Parse one capture the way the native cli_parse parser does"""
+    parser = CliParserTemplate(lines=text.splitlines())
+    parser.PARSERS = load_template(template_path)
+    return parser.parse()
+
+
+def _mapped(path):
+    """mmap of a file, None when it is empty (empty files cannot be mapped)"""
+    if not os.path.getsize(path):
+        return None
+    with open(path, "rb") as handle:
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def iter_archive(path, network_os=None):
+    """Yield (host, os, command, text) for every record of a concatenated capture archive"""
+    data = _mapped(path)
+    if data is None:
+        return
+    try:
+        header = HEADER_RE.search(data)
+        while header:
+            following = HEADER_RE.search(data, header.end())
+            end = following.start() if following else len(data)
+            text = data[header.end():end].decode("utf-8", "replace").lstrip("\r\n")
+            yield (
+                header.group("host").decode(),
+                header.group("os").decode() if header.group("os") else network_os,
+                header.group("command").decode(),
+                text,
+            )
+            header = following
+    finally:
+        data.close()
+
+
+def iter_directory(path, network_os=None):
+    """Yield (host, os, command, text) for a `<host>/<command>.txt` capture tree"""
+    for host in sorted(os.listdir(path)):
+        host_dir = os.path.join(path, host)
+        if not os.path.isdir(host_dir):
+            continue
+        for name in sorted(os.listdir(host_dir)):
+            if not name.endswith(".txt"):
+                continue
+            data = _mapped(os.path.join(host_dir, name))
+            text = ""
+            if data is not None:
+                try:
+                    text = data[:].decode("utf-8", "replace")
+                finally:
+                    data.close()
+            yield host, network_os, name[:-len(".txt")], text
+
+
+def iter_captures(path, network_os=None):
+    if os.path.isdir(path):
+        return iter_directory(path, network_os)
+    return iter_archive(path, network_os)
+
+
+def replay(captures, template=None, health_filter=None, target=None, facts_key=None, options=None):
+    """Parse every capture and optionally grade it, yielding one result dict per capture"""
+    for host, network_os, command, text in captures:
+        record = {"host": host, "command": command}
+        template_path = template or find_template(network_os, command)
+        if not template_path:
+            record["error"] = "No template found for %s" % template_name(network_os, command)
+            yield record
+            continue
+        try:
+            parsed = parse_capture(template_path, text)
+            record["parsed"] = parsed
+            if health_filter:
+                facts = {facts_key: parsed} if facts_key else parsed
+                record["result"] = health_filter(facts, target, **(options or {}))
+        except Exception as exc:  # keep replaying the remaining captures
+            record["error"] = "%s: %s" % (type(exc).__name__, exc)
+        yield record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay saved CLI captures through the health check templates.")
+    parser.add_argument("source", help="capture archive or directory of <host>/<command>.txt captures")
+    parser.add_argument("--os", dest="network_os", help="network os short name (ios, eos, nxos, iosxr) used to find templates")
+    parser.add_argument("--template", help="template to parse every capture with, instead of the role templates")
+    parser.add_argument("--filter", dest="filter_name", choices=sorted(FILTERS), help="health check filter to grade the parsed facts with")
+    parser.add_argument("--target", help="JSON or YAML file with the filter target")
+    parser.add_argument("--option", action="append", type=parse_option, default=[],
+                        help="filter keyword argument as key=value, the value is decoded as JSON when possible")
+    parser.add_argument("--facts-key", help="key the parsed facts are nested under before grading, e.g. fs_health")
+    parser.add_argument("--output", help="JSONL result file, standard output by default")
+    args = parser.parse_args(argv)
+
+    target = None
+    if args.target:
+        with open(args.target) as handle:
+            target = yaml.safe_load(handle)
+    health_filter = load_filter(args.filter_name) if args.filter_name else None
+
+    errors = 0
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for record in replay(iter_captures(args.source, args.network_os), args.template,
+                             health_filter, target, args.facts_key, dict(args.option)):
+            errors += "error" in record
+            output.write(json.dumps(record, sort_keys=True, default=str) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
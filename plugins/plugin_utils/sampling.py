@@ -0,0 +1,280 @@
+"""Pulse checks of a large fleet from a stratified random sample of its hosts.
+
+Usage:
+    python -m ansible_collections.network.healthchecks.plugins.plugin_utils.sampling \\
+        sample -i inventory.yml --seed 42 --output-dir pulse/
+
+    ansible-playbook -i inventory.yml --limit @pulse/sample.txt healthchecks.yml
+
+    python -m ansible_collections.network.healthchecks.plugins.plugin_utils.sampling \\
+        estimate --plan pulse/plan.json --escalate pulse/escalate.txt results/ \\
+        || ansible-playbook -i inventory.yml --limit @pulse/escalate.txt healthchecks.yml
+
+The hosts are split into strata by platform (`ansible_network_os`) and
+inventory group by default, and each stratum is sampled on its own, with
+enough hosts for the failure rate of the stratum to be known within
+`--margin` at the `--confidence` level. The same seed and inventory always
+give the same sample.
+
+The estimate reads the result records of the run, `{"host", "role",
+"result"}` as for the sharding merge, and reports the failure rate of every
+stratum and the estimated fleet wide failure rate, overall and per role,
+with their confidence intervals. The hosts not yet collected of the strata
+whose failure rate is above `--escalate-above` are written to the
+`--escalate` limit file for a full run of those strata, the exit code being
+1. The estimate of the results of both runs then counts those strata in full.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.sharding import iter_records, worst
+
+
+# Strata keys, a host variable or `group` for the most specific group of the host
+STRATA_BY = ("ansible_network_os", "group")
+# Results counted as failures
+FAILING = ("FAIL",)
+# Two sided normal quantiles of the supported confidence levels
+Z_SCORES = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.96, 0.98: 2.3263, 0.99: 2.5758}
+
+
+def z_score(confidence):
+    if confidence not in Z_SCORES:
+        raise ValueError("Unsupported confidence %s, use one of %s" % (
+            confidence, ", ".join(str(level) for level in sorted(Z_SCORES))))
+    return Z_SCORES[confidence]
+
+
+def stratum_of(variables, groups, by=STRATA_BY):
+    """Stratum key of a host, its values of `by` joined by '/'"""
+    values = []
+    for key in by:
+        if key == "group":
+            # the deepest group, the one most specific to the host
+            named = [group for group in groups if group.name not in ("all", "ungrouped")]
+            value = sorted(named, key=lambda group: (-group.depth, group.name))[0].name if named else None
+        else:
+            value = variables.get(key)
+        values.append(str(value).split(".")[-1] if key == "ansible_network_os" and value else str(value or "unknown"))
+    return "/".join(values)
+
+
+def inventory_strata(sources, by=STRATA_BY, limit=None):
+    """Hosts of every stratum of Ansible inventory sources.
+
+    The variables are read from the host and group variables as written in
+    the inventory, without templating.
+    """
+    from ansible.inventory.helpers import get_group_vars
+    from ansible.inventory.manager import InventoryManager
+    from ansible.parsing.dataloader import DataLoader
+    from ansible.utils.vars import combine_vars
+
+    inventory = InventoryManager(loader=DataLoader(), sources=sources)
+    strata = {}
+    for host in inventory.get_hosts(limit or "all"):
+        groups = host.get_groups()
+        variables = combine_vars(get_group_vars(groups), host.get_vars())
+        strata.setdefault(stratum_of(variables, groups, by), []).append(host.name)
+    return strata
+
+
+def sample_size(population, margin, confidence, minimum=1):
+    """Hosts to sample for a failure rate within `margin`, with the finite population correction"""
+    z = z_score(confidence)
+    # the worst case p = 0.5
+    infinite = z * z * 0.25 / (margin * margin)
+    size = int(math.ceil(infinite / (1 + (infinite - 1) / population))) if population else 0
+    return min(population, max(size, minimum))
+
+
+def sample(strata, seed, margin=0.1, confidence=0.95, minimum=2, max_hosts=None):
+    """Sampled hosts of every stratum.
+
+    Each stratum is shuffled with a generator seeded from `seed` and its key,
+    so the sample of a stratum does not change when other strata do. Past
+    `max_hosts` the sizes are scaled down alike, keeping `minimum` hosts.
+    """
+    sizes = dict((key, sample_size(len(hosts), margin, confidence, minimum)) for key, hosts in strata.items())
+    total = sum(sizes.values())
+    if max_hosts and total > max_hosts:
+        scale = float(max_hosts) / total
+        sizes = dict((key, min(len(strata[key]), max(minimum, int(size * scale)))) for key, size in sizes.items())
+    sampled = {}
+    for key, hosts in strata.items():
+        ordered = sorted(hosts)
+        random.Random("%s:%s" % (seed, key)).shuffle(ordered)
+        sampled[key] = sorted(ordered[:sizes[key]])
+    return sampled
+
+
+def wilson(failed, reported, population, z):
+    """Confidence interval of a failure rate, with the finite population correction"""
+    if not reported:
+        return 0.0, 1.0
+    rate = float(failed) / reported
+    if reported >= population:
+        return rate, rate
+    # the correction shrinks the variance as an effectively larger sample would
+    n = reported * float(population - 1) / (population - reported) if population > 1 else reported
+    center = (rate + z * z / (2 * n)) / (1 + z * z / n)
+    spread = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return max(0.0, center - spread), min(1.0, center + spread)
+
+
+def stratified(counts, z):
+    """Fleet wide failure rate and interval of `{stratum: (population, reported, failed)}`.
+
+    The variance uses (failed + 1) / (reported + 2) as rate of a stratum, so
+    a stratum without any failure still adds its uncertainty. Strata without
+    any result count as fully unknown.
+    """
+    total = sum(population for population, _reported, _failed in counts.values())
+    if not total:
+        return None
+    estimate = variance = unknown = 0.0
+    for population, reported, failed in counts.values():
+        weight = float(population) / total
+        if not reported:
+            unknown += weight
+            continue
+        estimate += weight * failed / reported
+        if reported < population:
+            smoothed = (failed + 1.0) / (reported + 2.0)
+            variance += weight * weight * (1 - float(reported) / population) * smoothed * (1 - smoothed) / reported
+    spread = z * math.sqrt(variance)
+    return {
+        "rate": round(estimate, 4),
+        "low": round(max(0.0, estimate - spread), 4),
+        "high": round(min(1.0, estimate + spread + unknown), 4),
+    }
+
+
+def estimate(plan, records, failing=FAILING, escalate_above=0.0):
+    """Failure rates of the strata and of the fleet from the results of a run of `plan`"""
+    z = z_score(plan["confidence"])
+    strata_of = dict((host, key) for key, stratum in plan["strata"].items() for host in stratum["hosts"])
+    statuses = {}
+    for record in records:
+        host = record.get("host")
+        if host not in strata_of or not isinstance(record.get("result"), dict):
+            continue
+        statuses.setdefault(host, {})[record.get("role") or "all"] = record["result"].get("result", "unknown")
+
+    roles = sorted(set(role for found in statuses.values() for role in found))
+    report = {"confidence": plan["confidence"], "seed": plan["seed"], "strata": {}, "fleet": {}, "escalate": [], "missing": []}
+    counts = dict((role, {}) for role in ["all"] + roles)
+    remaining = []
+    for key, stratum in sorted(plan["strata"].items()):
+        population = len(stratum["hosts"])
+        reported = [host for host in stratum["hosts"] if host in statuses]
+        failed = [host for host in reported if worst(statuses[host].values()) in failing]
+        low, high = wilson(len(failed), len(reported), population, z)
+        rate = float(len(failed)) / len(reported) if reported else None
+        report["strata"][key] = {
+            "population": population,
+            "sampled": len(stratum["sampled"]),
+            "reported": len(reported),
+            "failed": len(failed),
+            "rate": round(rate, 4) if rate is not None else None,
+            "low": round(low, 4),
+            "high": round(high, 4),
+        }
+        report["missing"].extend(host for host in stratum["sampled"] if host not in statuses)
+        counts["all"][key] = (population, len(reported), len(failed))
+        for role in roles:
+            ran = [host for host in reported if role in statuses[host]]
+            counts[role][key] = (population, len(ran), len([host for host in ran if statuses[host][role] in failing]))
+        left = [host for host in stratum["hosts"] if host not in statuses]
+        if rate is not None and rate > escalate_above and left:
+            report["escalate"].append(key)
+            remaining.extend(left)
+    for role, found in counts.items():
+        fleet = stratified(found, z)
+        if fleet is not None:
+            fleet["reported"] = sum(reported for _population, reported, _failed in found.values())
+            fleet["failed"] = sum(failed for _population, _reported, failed in found.values())
+            report["fleet"][role] = fleet
+    report["missing"].sort()
+    return report, sorted(remaining)
+
+
+def write_hosts(path, hosts):
+    with open(path, "w") as handle:
+        handle.write("".join("%s\n" % host for host in hosts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sample a fleet by strata and estimate its health check failure rates.")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    sample_parser = commands.add_parser("sample", help="pick a stratified random sample of the inventory hosts")
+    sample_parser.add_argument("-i", "--inventory", action="append", required=True, help="inventory source, repeatable")
+    sample_parser.add_argument("--by", action="append", help="host variable, or 'group', to stratify on, repeatable, "
+                               "ansible_network_os and group by default")
+    sample_parser.add_argument("--seed", default="0", help="seed of the sample, the same seed giving the same sample")
+    sample_parser.add_argument("--margin", type=float, default=0.1, help="margin of error of the rate of a stratum")
+    sample_parser.add_argument("--confidence", type=float, default=0.95, help="confidence level, one of %s" % (
+        ", ".join(str(level) for level in sorted(Z_SCORES))))
+    sample_parser.add_argument("--min-per-stratum", type=int, default=2, help="hosts sampled at least per stratum")
+    sample_parser.add_argument("--max-hosts", type=int, help="hosts sampled at most, the strata being scaled down alike")
+    sample_parser.add_argument("--limit", help="host pattern to sample, all hosts by default")
+    sample_parser.add_argument("--output-dir", default=".", help="directory the sample.txt limit file and plan.json are written to")
+
+    estimate_parser = commands.add_parser("estimate", help="estimate the failure rates from the results of the sample")
+    estimate_parser.add_argument("sources", nargs="+", help="result JSON or JSONL files, or directories of them")
+    estimate_parser.add_argument("--plan", required=True, help="plan.json written by the sample command")
+    estimate_parser.add_argument("--failing", action="append", help="result counted as a failure, repeatable, FAIL by default")
+    estimate_parser.add_argument("--escalate-above", type=float, default=0.0,
+                                 help="failure rate of a stratum above which all of its hosts are to be run")
+    estimate_parser.add_argument("--escalate", help="limit file the hosts of the strata to escalate are written to")
+    estimate_parser.add_argument("--report", help="JSON report file, standard output by default")
+    args = parser.parse_args(argv)
+
+    if args.command == "sample":
+        z_score(args.confidence)
+        by = tuple(args.by or STRATA_BY)
+        strata = inventory_strata(args.inventory, by, args.limit)
+        sampled = sample(strata, args.seed, args.margin, args.confidence, args.min_per_stratum, args.max_hosts)
+        plan = {
+            "seed": args.seed,
+            "by": list(by),
+            "margin": args.margin,
+            "confidence": args.confidence,
+            "strata": dict((key, {"hosts": sorted(hosts), "sampled": sampled[key]}) for key, hosts in strata.items()),
+        }
+        if not os.path.isdir(args.output_dir):
+            os.makedirs(args.output_dir)
+        write_hosts(os.path.join(args.output_dir, "sample.txt"), sorted(host for hosts in sampled.values() for host in hosts))
+        with open(os.path.join(args.output_dir, "plan.json"), "w") as handle:
+            json.dump(plan, handle, sort_keys=True)
+        sys.stderr.write(json.dumps(dict((key, "%d/%d" % (len(sampled[key]), len(hosts)))
+                                         for key, hosts in sorted(strata.items()))) + "\n")
+        return 0
+
+    with open(args.plan) as handle:
+        plan = json.load(handle)
+    report, remaining = estimate(plan, iter_records(args.sources), tuple(args.failing or FAILING), args.escalate_above)
+    if args.escalate:
+        write_hosts(args.escalate, remaining)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.report:
+        with open(args.report, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    return 1 if remaining else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
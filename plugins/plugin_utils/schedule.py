@@ -0,0 +1,36 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import time
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.duration import duration_seconds
+
+
+# Share of the interval a run may come early and still collect, so a cron
+# run firing a little before the interval elapsed does not skip a whole one
+DUE_SLACK = 0.1
+
+
+def is_due(state, interval, now=None):
+    """Whether a check last run as saved in `state` is due again after `interval`.
+
+    `interval` is seconds or a duration string ("5m", "24h"), a missing or
+    zero interval making the check due on every run. A state without a run
+    time, e.g. on the first run, is always due.
+    """
+    seconds = duration_seconds(interval) or 0
+    ran_at = (state or {}).get("ran_at")
+    if seconds <= 0 or ran_at is None or not (state or {}).get("health_checks"):
+        return True
+    now = time.time() if now is None else float(now)
+    return now - float(ran_at) >= seconds * (1 - DUE_SLACK)
+
+
+def cached_result(state, collection, now=None):
+    """Health check result saved in `state`, with its age in the collection stats"""
+    now = time.time() if now is None else float(now)
+    health_checks = dict((state or {}).get("health_checks") or {})
+    ran_at = float((state or {}).get("ran_at") or now)
+    health_checks["collection"] = dict(collection, ran_at=ran_at, age=int(now - ran_at))
+    return health_checks
@@ -0,0 +1,102 @@
+"""Counting semaphore shared by the forks of the controller, one per site.
+
+A slot is a lease file `<slot_dir>/<site>/<owner>` and the leases of a site
+are counted under an exclusive flock of `<slot_dir>/<site>/.lock`, so the
+worker processes of one or more ansible-playbook runs sharing `slot_dir`
+never hold more than `limit` leases of a site at once. Leases older than
+`lease` seconds are taken as left over by a killed worker and removed.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import fcntl
+import os
+import random
+import re
+import time
+
+
+_SITE_RE = re.compile(r"[^\w.-]+")
+
+
+class SlotTimeout(Exception):
+    pass
+
+
+def _site_dir(slot_dir, site):
+    path = os.path.join(slot_dir, _SITE_RE.sub("_", str(site)) or "_")
+    if not os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _leases(path, lease, now):
+    """Owners holding a lease of the site, removing the expired leases"""
+    owners = []
+    for name in os.listdir(path):
+        if name.startswith("."):
+            continue
+        lease_path = os.path.join(path, name)
+        try:
+            if lease and now - os.path.getmtime(lease_path) > lease:
+                os.unlink(lease_path)
+                continue
+        except OSError:
+            continue
+        owners.append(name)
+    return owners
+
+
+class _Locked(object):
+    def __init__(self, path):
+        self.path = os.path.join(path, ".lock")
+        self.handle = None
+
+    def __enter__(self):
+        self.handle = open(self.path, "a")
+        fcntl.flock(self.handle, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.handle, fcntl.LOCK_UN)
+        self.handle.close()
+
+
+def acquire(slot_dir, site, owner, limit, timeout=300, lease=900, poll=0.2):
+    """Take a slot of `site` for `owner`, waiting up to `timeout` seconds.
+
+    Returns the seconds waited and the leases held once the slot is taken.
+    An owner already holding a slot keeps it, its lease being renewed.
+    Raises SlotTimeout when no slot freed up in time.
+    """
+    path = _site_dir(slot_dir, site)
+    owner = _SITE_RE.sub("_", str(owner))
+    started = time.time()
+    while True:
+        now = time.time()
+        with _Locked(path):
+            owners = _leases(path, lease, now)
+            if owner in owners or len(owners) < limit:
+                with open(os.path.join(path, owner), "w") as handle:
+                    handle.write("%d\n" % os.getpid())
+                return now - started, len(set(owners) | set([owner]))
+        if now - started >= timeout:
+            raise SlotTimeout(
+                "Timed out after %s seconds waiting for one of the %d session slots of site %s" % (timeout, limit, site)
+            )
+        # jitter so the waiting forks do not all retry at the same instant
+        time.sleep(poll * random.uniform(0.5, 1.5))
+
+
+def release(slot_dir, site, owner):
+    """Give back the slot of `owner`, returns whether it held one"""
+    path = _site_dir(slot_dir, site)
+    owner = _SITE_RE.sub("_", str(owner))
+    with _Locked(path):
+        try:
+            os.unlink(os.path.join(path, owner))
+        except OSError:
+            return False
+    return True
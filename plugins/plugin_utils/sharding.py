@@ -0,0 +1,219 @@
+"""Split a fleet over several controllers and merge their health check results.
+
+Usage:
+    python -m ansible_collections.network.healthchecks.plugins.plugin_utils.sharding \\
+        split -i inventory.yml --shards 8 --by-site --output-dir shards/
+
+    ansible-playbook -i inventory.yml --limit @shards/shard-3.txt healthchecks.yml
+
+    python -m ansible_collections.network.healthchecks.plugins.plugin_utils.sharding \\
+        merge --output fleet.jsonl --report report.json results-*/
+
+Hosts are placed on a consistent hash ring, so every controller computes the
+same split on its own and changing the shard count moves only about 1/N of
+the hosts. With `--by-site` the ring is keyed on the site of the host
+(`healthchecks_site` by default), keeping a site on one controller so the
+per site session limits still hold.
+
+Results are the records written by the runs, `{"host", "role", "result"}`
+with `result` the `health_checks` of a role, either as one JSON file per
+record or as JSONL files. The merge writes them as one JSONL file and a
+report with the rollup of a single run.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import sys
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.deadlines import summarize_deadlines
+
+
+# Points per shard on the ring, more points spread the hosts more evenly
+REPLICAS = 128
+# Worst result first, a host rolls up to the worst result of its roles
+SEVERITY = ("FAIL", "TIMEOUT", "PARTIAL", "WARNING", "SKIPPED", "PASS")
+
+
+def _hash(value):
+    return int(hashlib.md5(value.encode("utf-8")).hexdigest()[:16], 16)
+
+
+class HashRing(object):
+    """Consistent hash ring of `shards` shards numbered from 0"""
+
+    def __init__(self, shards, replicas=REPLICAS):
+        if shards < 1:
+            raise ValueError("The shard count must be at least 1, got %d" % shards)
+        points = sorted((_hash("shard-%d-%d" % (shard, replica)), shard)
+                        for shard in range(shards) for replica in range(replicas))
+        self.hashes = [point for point, _shard in points]
+        self.shards = [shard for _point, shard in points]
+
+    def shard_of(self, key):
+        index = bisect.bisect(self.hashes, _hash(str(key))) % len(self.hashes)
+        return self.shards[index]
+
+
+def split(hosts, shards, sites=None):
+    """Hosts of every shard, keyed on the site of the host when `sites` maps hosts to sites"""
+    ring = HashRing(shards)
+    assigned = dict((shard, []) for shard in range(shards))
+    for host in hosts:
+        key = (sites or {}).get(host)
+        assigned[ring.shard_of("site:%s" % key if key is not None else host)].append(host)
+    return assigned
+
+
+def inventory_hosts(sources, site_var=None, limit=None):
+    """Host names, and their site when `site_var` is given, of Ansible inventory sources.
+
+    The site is read from the host and group variables as written in the
+    inventory, without templating.
+    """
+    from ansible.inventory.helpers import get_group_vars
+    from ansible.inventory.manager import InventoryManager
+    from ansible.parsing.dataloader import DataLoader
+    from ansible.utils.vars import combine_vars
+
+    inventory = InventoryManager(loader=DataLoader(), sources=sources)
+    hosts = inventory.get_hosts(limit or "all")
+    sites = {}
+    if site_var:
+        for host in hosts:
+            variables = combine_vars(get_group_vars(host.get_groups()), host.get_vars())
+            if variables.get(site_var) is not None:
+                sites[host.name] = variables[site_var]
+    return [host.name for host in hosts], sites
+
+
+def iter_records(paths):
+    """Yield the result records of files and directories of JSON or JSONL files"""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith((".json", ".jsonl")):
+                    for record in iter_records([os.path.join(path, name)]):
+                        yield record
+            continue
+        with open(path) as handle:
+            if path.endswith(".json"):
+                yield json.load(handle)
+                continue
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def worst(results):
+    ranked = [result for result in results if result in SEVERITY]
+    if not ranked:
+        return "unknown"
+    return min(ranked, key=SEVERITY.index)
+
+
+def merge(records, output=None):
+    """Merge the result records of every shard into the report of a single run.
+
+    A host and role found in more than one shard is counted once, the later
+    record winning, and reported under `duplicates`. The merged records are
+    written to `output` sorted by host and role.
+    """
+    latest = {}
+    duplicates = set()
+    for record in records:
+        key = (record.get("host"), record.get("role"))
+        if key in latest:
+            duplicates.add("%s/%s" % key if key[1] else str(key[0]))
+        latest[key] = record
+    if output is not None:
+        for key in sorted(latest, key=lambda key: (str(key[0]), str(key[1] or ""))):
+            output.write(json.dumps(latest[key], sort_keys=True) + "\n")
+    latest = dict((key, record.get("result") or {}) for key, record in latest.items())
+
+    hosts = {}
+    roles = {}
+    for (host, role), result in latest.items():
+        status = result.get("result", "unknown") if isinstance(result, dict) else "unknown"
+        hosts.setdefault(host, []).append(status)
+        counts = roles.setdefault(role or "all", {})
+        counts[status] = counts.get(status, 0) + 1
+
+    results = {}
+    for statuses in hosts.values():
+        status = worst(statuses)
+        results[status] = results.get(status, 0) + 1
+    collection = summarize_deadlines(dict(
+        ("%s/%s" % key if key[1] else str(key[0]), result) for key, result in latest.items() if isinstance(result, dict)
+    ))
+    return {
+        "hosts": len(hosts),
+        "results": results,
+        "roles": roles,
+        "failed": sorted(host for host, statuses in hosts.items() if worst(statuses) == "FAIL"),
+        "collection": collection,
+        "duplicates": sorted(duplicates),
+    }
+
+
+def write_shards(assigned, output_dir):
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    for shard, hosts in assigned.items():
+        with open(os.path.join(output_dir, "shard-%d.txt" % shard), "w") as handle:
+            handle.write("".join("%s\n" % host for host in hosts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shard a fleet over controllers and merge the health check results.")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    split_parser = commands.add_parser("split", help="split the inventory hosts into shards")
+    split_parser.add_argument("-i", "--inventory", action="append", required=True, help="inventory source, repeatable")
+    split_parser.add_argument("--shards", type=int, required=True)
+    split_parser.add_argument("--shard", type=int, help="only print the hosts of this shard, one per line")
+    split_parser.add_argument("--by-site", action="store_true", help="keep the hosts of a site in one shard")
+    split_parser.add_argument("--site-var", default="healthchecks_site", help="host variable naming the site")
+    split_parser.add_argument("--limit", help="host pattern to split, all hosts by default")
+    split_parser.add_argument("--output-dir", default=".", help="directory the shard-<n>.txt limit files are written to")
+
+    merge_parser = commands.add_parser("merge", help="merge the results of every shard")
+    merge_parser.add_argument("sources", nargs="+", help="result JSON or JSONL files, or directories of them")
+    merge_parser.add_argument("--output", help="JSONL file all the records are written to")
+    merge_parser.add_argument("--report", help="JSON report file, standard output by default")
+    args = parser.parse_args(argv)
+
+    if args.command == "split":
+        hosts, sites = inventory_hosts(args.inventory, args.site_var if args.by_site else None, args.limit)
+        assigned = split(hosts, args.shards, sites)
+        if args.shard is not None:
+            sys.stdout.write("".join("%s\n" % host for host in assigned.get(args.shard, [])))
+        else:
+            write_shards(assigned, args.output_dir)
+            sys.stderr.write(json.dumps(dict((shard, len(hosts)) for shard, hosts in assigned.items())) + "\n")
+        return 0
+
+    output = open(args.output, "w") if args.output else None
+    try:
+        report = merge(iter_records(args.sources), output)
+    finally:
+        if output is not None:
+            output.close()
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.report:
+        with open(args.report, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    return 1 if report["duplicates"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,355 @@
+"""Run the health check roles against simulated hosts and report controller cost.
+
+    python tests/simulator/benchmark.py --hosts 2000 --platforms ios nxos \\
+        --roles cpu bgp --forks 50 --latency 0.05 --start-simulator
+
+Hosts point at the SSH simulator (tests/simulator/simulator.py), the user
+name of each host selecting its platform and its site. With `--site-limit`
+the roles keep to that many sessions per site (`healthchecks_site_limit`),
+and with `--site-sessions` the simulator refuses logins past that many
+sessions of a site, its peak sessions and refused logins being reported.
+With `--shards` the hosts are split with the sharding tool and every shard
+runs as its own ansible-playbook process, as on separate controllers, the
+shard results being merged into one fleet report. With `--mode monitor`
+the hosts are polled by the monitor daemon over persistent sessions for
+`--duration` seconds instead, reporting polls per second and per core. With
+`--mode startup` no host is run: fresh processes, as the task workers are,
+load the templates and filter defaults from their YAML and from the
+precompiled bundle, `--repeat` times each. The report has the wall time,
+the controller CPU time and peak RSS of the ansible-playbook process tree,
+and the time spent per task from the junit callback shipped with
+ansible-core.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils import bundle, sharding
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+NETWORK_OS = {"ios": "cisco.ios.ios", "iosxr": "cisco.iosxr.iosxr", "nxos": "cisco.nxos.nxos", "eos": "arista.eos.eos"}
+ROLES = ("bgp", "cpu", "crashfiles", "environment", "filesystem", "interfaces", "memory", "ospf", "uptime")
+# Loads timed in a fresh process by --mode startup, printing the milliseconds taken
+STARTUP_LOADS = {
+    "yaml": (
+        "import glob, os, time, yaml\n"
+        "from ansible_collections.network.healthchecks.plugins.plugin_utils import bundle\n"
+        "paths = [path for pattern in bundle.SOURCES for path in glob.glob(os.path.join(bundle.ROOT, pattern))]\n"
+        "started = time.perf_counter()\n"
+        "for path in paths:\n"
+        "    with open(path) as handle:\n"
+        "        yaml.safe_load(handle)\n"
+        "print((time.perf_counter() - started) * 1000)\n"
+    ),
+    "bundle": (
+        "import glob, os, time, yaml\n"
+        "from ansible_collections.network.healthchecks.plugins.plugin_utils import bundle\n"
+        "paths = [path for pattern in bundle.SOURCES for path in glob.glob(os.path.join(bundle.ROOT, pattern))]\n"
+        "started = time.perf_counter()\n"
+        "for path in paths:\n"
+        "    bundle.load_yaml(path)\n"
+        "print((time.perf_counter() - started) * 1000)\n"
+    ),
+    "health_check_view": (
+        "import time\n"
+        "started = time.perf_counter()\n"
+        "import ansible_collections.network.healthchecks.plugins.filter.health_check_view\n"
+        "print((time.perf_counter() - started) * 1000)\n"
+    ),
+}
+
+
+def write_inventory(path, hosts, platforms, port, sites=1, site_limit=0):
+    groups = {}
+    for index in range(hosts):
+        platform = platforms[index % len(platforms)]
+        name = "%s-%05d" % (platform, index)
+        site = "site%d" % (index % sites)
+        groups.setdefault(platform, {})[name] = {"ansible_user": "%s@%s" % (name, site), "healthchecks_site": site}
+    inventory = {"all": {
+        "vars": {
+            "ansible_host": "127.0.0.1",
+            "ansible_port": port,
+            "ansible_password": "simulator",
+            "ansible_connection": "ansible.netcommon.network_cli",
+            "healthchecks_site_limit": site_limit,
+        },
+        "children": dict(
+            (platform, {"hosts": members, "vars": {"ansible_network_os": NETWORK_OS[platform]}})
+            for platform, members in groups.items()
+        ),
+    }}
+    with open(path, "w") as handle:
+        json.dump(inventory, handle)
+
+
+def write_playbook(path, roles, strategy="linear", results_dir=None):
+    tasks = []
+    for role in roles:
+        tasks.append({
+            "name": "Run the %s health check" % role,
+            "ansible.builtin.include_role": {"name": "network.healthchecks.%s" % role},
+            "ignore_errors": True,
+        })
+        if results_dir:
+            tasks.append({
+                "name": "Save the %s result" % role,
+                "ansible.builtin.copy": {
+                    "content": "{{ {'host': inventory_hostname, 'role': '%s', 'result': health_checks | default({})} | to_json }}" % role,
+                    "dest": "%s/{{ inventory_hostname }}.%s.json" % (results_dir, role),
+                },
+                "delegate_to": "localhost",
+                "ignore_errors": True,
+            })
+    with open(path, "w") as handle:
+        json.dump([{"hosts": "all", "gather_facts": False, "strategy": strategy, "tasks": tasks}], handle)
+
+
+def tree_rss_kb(pid):
+    """Resident memory of a process and its descendants, from /proc (Linux only)"""
+    children = {}
+    rss = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open("/proc/%s/status" % entry) as handle:
+                status = dict(line.split(":", 1) for line in handle if ":" in line)
+        except (IOError, OSError):
+            continue
+        children.setdefault(int(status.get("PPid", "0").strip()), []).append(int(entry))
+        rss[int(entry)] = int(status.get("VmRSS", "0 kB").split()[0])
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += rss.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total
+
+
+def task_times(junit_dir):
+    """Total and mean seconds per task over every host, from the junit reports"""
+    tasks = {}
+    for name in os.listdir(junit_dir):
+        if not name.endswith(".xml"):
+            continue
+        for case in ET.parse(os.path.join(junit_dir, name)).iter("testcase"):
+            task = case.get("name", "").split("] ", 1)[-1].split(": ", 1)[-1]
+            entry = tasks.setdefault(task, {"count": 0, "total": 0.0})
+            entry["count"] += 1
+            entry["total"] += float(case.get("time") or 0)
+    for entry in tasks.values():
+        entry["mean"] = round(entry["total"] / entry["count"], 4)
+        entry["total"] = round(entry["total"], 2)
+    return dict(sorted(tasks.items(), key=lambda item: item[1]["total"], reverse=True))
+
+
+def run_benchmark(args, workdir):
+    inventory = os.path.join(workdir, "inventory.json")
+    playbook = os.path.join(workdir, "playbook.json")
+    junit_dir = os.path.join(workdir, "junit")
+    results_dir = os.path.join(workdir, "results")
+    os.mkdir(junit_dir)
+    os.mkdir(results_dir)
+    write_inventory(inventory, args.hosts, args.platforms, args.port, args.sites, args.site_limit)
+    write_playbook(playbook, args.roles, args.strategy, results_dir if args.shards > 1 else None)
+
+    env = dict(os.environ)
+    env.update({
+        "ANSIBLE_HOST_KEY_CHECKING": "False",
+        "ANSIBLE_CALLBACKS_ENABLED": "ansible.builtin.junit",
+        "JUNIT_OUTPUT_DIR": junit_dir,
+        "JUNIT_TASK_CLASS": "True",
+        "JUNIT_HIDE_TASK_ARGUMENTS": "True",
+        "ANSIBLE_STDOUT_CALLBACK": "ansible.builtin.minimal" if args.verbose else "ansible.builtin.oneline",
+        "ANSIBLE_PERSISTENT_COMMAND_TIMEOUT": str(args.command_timeout),
+    })
+    command = ["ansible-playbook", "-i", inventory, "-f", str(args.forks), playbook]
+    commands = [command]
+    if args.shards > 1:
+        hosts, sites = sharding.inventory_hosts([inventory], "healthchecks_site" if args.shard_by_site else None)
+        sharding.write_shards(sharding.split(hosts, args.shards, sites), workdir)
+        commands = [command + ["--limit", "@%s" % os.path.join(workdir, "shard-%d.txt" % shard)]
+                    for shard in range(args.shards)]
+
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.time()
+    output = None if args.verbose else subprocess.DEVNULL
+    processes = [subprocess.Popen(command, env=env, stdout=output, stderr=output) for command in commands]
+    peak_rss = 0
+    while any(process.poll() is None for process in processes):
+        if sys.platform.startswith("linux"):
+            peak_rss = max(peak_rss, sum(tree_rss_kb(process.pid) for process in processes))
+        time.sleep(args.sample_interval)
+    wall = time.time() - start
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    tasks = task_times(junit_dir)
+    report = {
+        "hosts": args.hosts,
+        "platforms": args.platforms,
+        "roles": args.roles,
+        "forks": args.forks,
+        "strategy": args.strategy,
+        "sites": args.sites,
+        "site_limit": args.site_limit,
+        "latency": args.latency,
+        "scale": args.scale,
+        "shards": args.shards,
+        "rc": max(process.returncode for process in processes),
+        "wall_time": round(wall, 2),
+        "hosts_per_second": round(args.hosts / wall, 2) if wall else None,
+        "controller_cpu_seconds": round(cpu, 2),
+        "controller_cpu_per_host": round(cpu / args.hosts, 4),
+        "max_process_rss_kb": after.ru_maxrss,
+        "peak_tree_rss_kb": peak_rss or None,
+        "task_count": sum(entry["count"] for entry in tasks.values()),
+        "tasks": dict(list(tasks.items())[:args.top_tasks]),
+    }
+    if args.shards > 1:
+        report["fleet"] = sharding.merge(sharding.iter_records([results_dir]))
+    return report
+
+
+def run_monitor(args, workdir):
+    """Poll the simulated hosts with the monitor daemon for `--duration` seconds"""
+    # the monitor needs ansible.netcommon, which the other modes do not
+    sys.path.insert(0, os.path.join(bundle.ROOT, "tools"))
+    import monitor
+
+    config = os.path.join(workdir, "monitor.json")
+    report = os.path.join(workdir, "monitor_report.json")
+    checks = [role for role in args.roles if role in monitor.CHECKS]
+    if not checks:
+        raise SystemExit("The monitor polls %s" % ", ".join(sorted(monitor.CHECKS)))
+    devices = []
+    for index in range(args.hosts):
+        platform = args.platforms[index % len(args.platforms)]
+        name = "%s-%05d" % (platform, index)
+        site = "site%d" % (index % args.sites)
+        devices.append({"name": name, "username": "%s@%s" % (name, site), "os": platform})
+    with open(config, "w") as handle:
+        json.dump({
+            "store": os.path.join(workdir, "monitor.jsonl"),
+            "connect_concurrency": args.forks,
+            "command_timeout": args.command_timeout,
+            # the simulator host key is generated every run unless --host-key is given to it
+            "defaults": {"host": "127.0.0.1", "port": args.port, "password": "simulator", "host_key_checking": False},
+            "checks": dict((check, {"interval": args.interval}) for check in checks),
+            "devices": devices,
+        }, handle)
+
+    output = None if args.verbose else subprocess.DEVNULL
+    process = subprocess.Popen(
+        [sys.executable, monitor.__file__, "--config", config, "--duration", str(args.duration),
+         "--stats-interval", str(args.duration), "--report", report],
+        stdout=output, stderr=output,
+    )
+    peak_rss = 0
+    while process.poll() is None:
+        if sys.platform.startswith("linux"):
+            peak_rss = max(peak_rss, tree_rss_kb(process.pid))
+        time.sleep(args.sample_interval)
+    with open(report) as handle:
+        stats = json.load(handle)
+    stats.update(mode="monitor", checks=checks, interval=args.interval, latency=args.latency,
+                 scale=args.scale, rc=process.returncode, peak_tree_rss_kb=peak_rss or None)
+    return stats
+
+
+def run_startup(args):
+    """Time the template and default loads of fresh processes, from YAML and from the bundle"""
+    report = {"mode": "startup", "repeat": args.repeat, "bundle_current": not bundle.stale(bundle.load_bundle())}
+    for name, code in sorted(STARTUP_LOADS.items()):
+        times = []
+        for _run in range(args.repeat):
+            output = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, check=True).stdout
+            times.append(float(output.decode().split()[-1]))
+        times.sort()
+        report[name] = {
+            "median_ms": round(times[len(times) // 2], 3),
+            "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+            "max_ms": round(times[-1], 3),
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the health check roles against simulated hosts.")
+    parser.add_argument("--hosts", type=int, default=1000)
+    parser.add_argument("--platforms", nargs="+", choices=sorted(NETWORK_OS), default=["ios"])
+    parser.add_argument("--roles", nargs="+", choices=ROLES, default=["cpu"])
+    parser.add_argument("--forks", type=int, default=50)
+    parser.add_argument("--strategy", default="linear", help="play strategy, site limits need host_pinned or free")
+    parser.add_argument("--sites", type=int, default=1, help="sites the hosts are spread over")
+    parser.add_argument("--site-limit", type=int, default=0, help="sessions per site the roles keep to, 0 for no limit")
+    parser.add_argument("--shards", type=int, default=1, help="ansible-playbook processes the hosts are split over")
+    parser.add_argument("--shard-by-site", action="store_true", help="keep the hosts of a site in one shard")
+    parser.add_argument("--port", type=int, default=2222)
+    parser.add_argument("--start-simulator", action="store_true", help="start the simulator for the run")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulator latency per command, with --start-simulator")
+    parser.add_argument("--scale", type=int, default=4, help="simulator table rows, with --start-simulator")
+    parser.add_argument("--site-sessions", type=int, default=0,
+                        help="sessions per site the simulator accepts, with --start-simulator, 0 for no limit")
+    parser.add_argument("--command-timeout", type=int, default=60)
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="seconds between RSS samples")
+    parser.add_argument("--top-tasks", type=int, default=20, help="slowest tasks listed in the report")
+    parser.add_argument("--mode", choices=["playbook", "monitor", "startup"], default="playbook",
+                        help="run the roles with ansible-playbook, poll with the monitor daemon or time the worker loads")
+    parser.add_argument("--duration", type=float, default=60, help="seconds the monitor polls for, with --mode monitor")
+    parser.add_argument("--interval", type=float, default=10, help="seconds between polls of a check, with --mode monitor")
+    parser.add_argument("--repeat", type=int, default=20, help="fresh processes timed per load, with --mode startup")
+    parser.add_argument("--output", help="JSON report file, standard output by default")
+    parser.add_argument("--verbose", action="store_true", help="show the ansible-playbook output")
+    args = parser.parse_args(argv)
+
+    simulator = None
+    workdir = tempfile.mkdtemp(prefix="healthchecks-benchmark-")
+    stats = os.path.join(workdir, "simulator_stats.json")
+    try:
+        if args.start_simulator:
+            simulator = subprocess.Popen([
+                sys.executable, os.path.join(HERE, "simulator.py"), "--port", str(args.port),
+                "--latency", str(args.latency), "--scale", str(args.scale),
+                "--site-sessions", str(args.site_sessions), "--stats", stats,
+            ])
+            time.sleep(3)
+        if args.mode == "startup":
+            report = run_startup(args)
+        elif args.mode == "monitor":
+            report = run_monitor(args, workdir)
+        else:
+            report = run_benchmark(args, workdir)
+        if os.path.exists(stats):
+            with open(stats) as handle:
+                report["simulator_sites"] = json.load(handle)
+    finally:
+        if simulator is not None:
+            simulator.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""SSH stand-in for network devices, serving canned outputs to network_cli.
+
+Every SSH login is a simulated device: the user name is the host name and
+its prefix (`ios-0001`, `nxos-0042`, ...) picks the platform whose canned
+outputs are served from `outputs/<platform>.yaml`. Passwords and keys are
+not checked. The outputs are Jinja2 templates rendered with `hostname`,
+`index` (the number in the host name) and `scale`, the row count of the
+neighbor, interface and process tables.
+
+A user name of `<host>@<site>` places the device in a site. Open sessions
+are counted per site and `--site-sessions` refuses logins past that count,
+the way an overloaded AAA server of a site does. The peak sessions and
+refused logins per site are written to `--stats`.
+
+    python tests/simulator/simulator.py --port 2222 --latency 0.05 --scale 50
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import random
+import re
+import socket
+import sys
+import threading
+import time
+
+import jinja2
+import paramiko
+import yaml
+
+
+OUTPUTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "outputs")
+PLATFORMS = ("iosxr", "nxos", "eos", "ios")
+PROMPTS = {"ios": "{hostname}#", "iosxr": "RP/0/RP0/CPU0:{hostname}#", "nxos": "{hostname}#", "eos": "{hostname}#"}
+INVALID_INPUT = "% Invalid input detected at '^' marker.\r\n"
+# Session setup commands sent by the terminal plugins, answered with no output
+_SETUP_RE = re.compile(r"^(terminal|term|screen-length|no logging|enable$)")
+
+
+def load_outputs(outputs_dir=OUTPUTS_DIR):
+    env = jinja2.Environment(trim_blocks=True, lstrip_blocks=True, keep_trailing_newline=True)
+    outputs = {}
+    for platform in PLATFORMS:
+        with open(os.path.join(outputs_dir, "%s.yaml" % platform)) as handle:
+            outputs[platform] = dict((command, env.from_string(text or "")) for command, text in yaml.safe_load(handle).items())
+    return outputs
+
+
+class SiteSessions(object):
+    """Open sessions per site, refusing logins past `limit` (0 for no limit)"""
+
+    def __init__(self, limit=0, stats_path=None):
+        self.limit = limit
+        self.stats_path = stats_path
+        self.lock = threading.Lock()
+        self.open = {}
+        self.stats = {}
+
+    def login(self, site):
+        with self.lock:
+            stats = self.stats.setdefault(site, {"peak_sessions": 0, "refused_logins": 0})
+            if self.limit and self.open.get(site, 0) >= self.limit:
+                stats["refused_logins"] += 1
+                self._write()
+                return False
+            self.open[site] = self.open.get(site, 0) + 1
+            if self.open[site] > stats["peak_sessions"]:
+                stats["peak_sessions"] = self.open[site]
+                self._write()
+            return True
+
+    def logout(self, site):
+        with self.lock:
+            self.open[site] -= 1
+
+    def _write(self):
+        if self.stats_path:
+            with open(self.stats_path, "w") as handle:
+                json.dump(self.stats, handle, sort_keys=True)
+
+
+def platform_of(username):
+    for platform in PLATFORMS:
+        if username.startswith(platform):
+            return platform
+    return "ios"
+
+
+class DeviceServer(paramiko.ServerInterface):
+    """Accept any credentials and a single interactive shell"""
+
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self.username = None
+        self.site = None
+        self.shell = threading.Event()
+
+    def _login(self, username):
+        if self.site is not None:
+            return paramiko.AUTH_SUCCESSFUL
+        site = username.partition("@")[2] or "default"
+        if not self.sessions.login(site):
+            return paramiko.AUTH_FAILED
+        self.username, self.site = username.partition("@")[0], site
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_auth_password(self, username, password):
+        return self._login(username)
+
+    def check_auth_publickey(self, username, key):
+        return self._login(username)
+
+    def check_auth_none(self, username):
+        return self._login(username)
+
+    def get_allowed_auths(self, username):
+        return "password,publickey,none"
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED if kind == "session" else paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        self.shell.set()
+        return True
+
+
+class Device(object):
+    def __init__(self, hostname, outputs, scale, latency, jitter):
+        self.hostname = hostname
+        self.platform = platform_of(hostname)
+        self.outputs = outputs[self.platform]
+        self.prompt = PROMPTS[self.platform].format(hostname=hostname)
+        digits = re.findall(r"\d+", hostname)
+        self.variables = {"hostname": hostname, "index": int(digits[-1]) if digits else 0, "scale": scale}
+        self.latency = latency
+        self.jitter = jitter
+        self.rendered = {}
+
+    def run(self, command):
+        """Output of a command, with CRLF line endings as network devices send them"""
+        if not command or _SETUP_RE.match(command):
+            return ""
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+        template = self.outputs.get(command)
+        if template is None:
+            return INVALID_INPUT
+        if command not in self.rendered:
+            self.rendered[command] = template.render(**self.variables).replace("\n", "\r\n")
+        return self.rendered[command]
+
+
+def serve_client(client, host_key, outputs, sessions, args):
+    transport = paramiko.Transport(client)
+    transport.add_server_key(host_key)
+    server = DeviceServer(sessions)
+    try:
+        transport.start_server(server=server)
+        channel = transport.accept(30)
+        if channel is None or not server.shell.wait(30):
+            return
+        device = Device(server.username or "ios-0", outputs, args.scale, args.latency, args.jitter)
+        channel.sendall("\r\n%s" % device.prompt)
+        buffer = b""
+        last_separator = b""
+        while True:
+            data = channel.recv(4096)
+            if not data:
+                break
+            buffer += data
+            while b"\r" in buffer or b"\n" in buffer:
+                line, separator, buffer = re.split(rb"(\r\n|\r|\n)", buffer, maxsplit=1)
+                # "\r" and "\n" of one CRLF split across two reads
+                if not line and separator == b"\n" and last_separator == b"\r":
+                    last_separator = b""
+                    continue
+                last_separator = separator
+                command = line.decode("utf-8", "replace").strip()
+                if command in ("exit", "logout"):
+                    return
+                channel.sendall("%s\r\n%s%s" % (command, device.run(command), device.prompt))
+    except (EOFError, socket.error, paramiko.SSHException):
+        pass
+    finally:
+        transport.close()
+        if server.site is not None:
+            sessions.logout(server.site)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve canned network device outputs over SSH.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2222)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every command")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra seconds, up to this value, added to every command")
+    parser.add_argument("--scale", type=int, default=4, help="rows of the neighbor, interface and process tables")
+    parser.add_argument("--outputs", default=OUTPUTS_DIR, help="directory of <platform>.yaml canned outputs")
+    parser.add_argument("--host-key", help="private RSA key file, a new key is generated by default")
+    parser.add_argument("--site-sessions", type=int, default=0, help="open sessions allowed per site, 0 for no limit")
+    parser.add_argument("--stats", help="JSON file the peak sessions and refused logins per site are written to")
+    args = parser.parse_args(argv)
+
+    outputs = load_outputs(args.outputs)
+    sessions = SiteSessions(args.site_sessions, args.stats)
+    host_key = paramiko.RSAKey(filename=args.host_key) if args.host_key else paramiko.RSAKey.generate(2048)
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((args.host, args.port))
+    listener.listen(1024)
+    sys.stderr.write("simulator listening on %s:%d\n" % (args.host, args.port))
+    while True:
+        client, _address = listener.accept()
+        thread = threading.Thread(target=serve_client, args=(client, host_key, outputs, sessions, args))
+        thread.daemon = True
+        thread.start()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleFilterError
+
+from ansible_collections.network.healthchecks.plugins.filter import cpu_sample_ring as ring_module
+from ansible_collections.network.healthchecks.plugins.filter.cpu_sample_ring import cpu_sample_ring
+
+
+def test_reads_the_field_of_the_platform():
+    ring = cpu_sample_ring({}, [{"cpu_util": {"busy": 6.5}}], network_os="cisco.nxos.nxos", interval=1)
+    assert [value for _time, value in ring["samples"]] == [6.5]
+
+
+def test_warns_when_no_output_holds_a_sample(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(ring_module.display, "warning", warnings.append)
+    ring = cpu_sample_ring({}, [{"cpu_utilization_processes": []}], network_os="nxos")
+    assert ring["samples"] == []
+    assert "nxos" in warnings[0]
+
+
+def test_rejects_unknown_platform():
+    with pytest.raises(AnsibleFilterError, match="junos"):
+        cpu_sample_ring({}, [{}], network_os="junos")
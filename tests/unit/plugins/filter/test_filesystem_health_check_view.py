@@ -0,0 +1,31 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.network.healthchecks.plugins.filter.filesystem_health_check_view import (
+    filesystem_health_check_view,
+)
+
+
+TARGET = {"name": "health_check", "vars": {"checks": [{"name": "filesystem_status_summary", "filesystem_free_threshold": 10}]}}
+
+
+def test_default_and_every_filesystem():
+    facts = {"fs_health": {"free": 50, "total": 100}, "filesystems": {"flash:": {"free": 50, "total": 100}}}
+    result = filesystem_health_check_view(facts, TARGET)
+    assert result["filesystem"]["status"] == "PASS"
+    assert result["filesystems"]["status"] == "PASS"
+    assert result["result"] == "PASS"
+
+
+def test_default_filesystem_not_collected_is_not_a_failure():
+    facts = {"filesystems": {"flash:": {"free": 50, "total": 100}}}
+    result = filesystem_health_check_view(facts, TARGET)
+    assert "filesystem" not in result
+    assert result["result"] == "PASS"
+
+
+def test_invalid_default_filesystem_fails():
+    result = filesystem_health_check_view({"fs_health": {"free": 5, "total": 0}}, TARGET)
+    assert result["filesystem"] == {"status": "FAIL", "error": "Invalid filesystem data"}
+    assert result["result"] == "FAIL"
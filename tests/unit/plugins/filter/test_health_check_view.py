@@ -0,0 +1,225 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.network.healthchecks.plugins.filter import health_check_view as view_module
+from ansible_collections.network.healthchecks.plugins.filter.cpu_sample_ring import cpu_sample_ring
+from ansible_collections.network.healthchecks.plugins.filter.health_check_view import health_check_view
+
+
+CPU_CHECKS = [{"name": "cpu_utilization"}]
+
+
+def spiky_cpu_ring():
+    """20 samples of 10%, one of them a 95% spike"""
+    return cpu_sample_ring({}, [{"cpu_utilization": {"5_sec": value}} for value in [10] * 19 + [95]],
+                           network_os="ios", interval=5)
+
+
+CPU_FACTS = {"cpu_utilization": {"5_sec": 10, "1_min_avg": 10, "5_min_avg": 10}}
+
+
+def test_cpu_graded_on_the_p95_of_the_samples():
+    result = health_check_view(CPU_FACTS, CPU_CHECKS, warning_threshold=60, critical_threshold=90,
+                               samples=spiky_cpu_ring())
+    assert result["cpu_utilization"]["statistic"] == "p95"
+    assert result["cpu_utilization"]["samples"]["count"] == 20
+    # the single spike is past the 95th percentile
+    assert result["cpu_utilization"]["status"] == "PASS"
+
+
+def test_cpu_graded_on_the_max_of_the_samples():
+    result = health_check_view(CPU_FACTS, CPU_CHECKS, warning_threshold=60, critical_threshold=90,
+                               samples=spiky_cpu_ring(), statistic="max")
+    assert result["cpu_utilization"]["statistic"] == "max"
+    assert result["cpu_utilization"]["samples"]["count"] == 20
+    assert result["cpu_utilization"]["status"] == "FAIL"
+
+
+def test_cpu_busy_time_of_nxos_and_eos():
+    result = health_check_view({"cpu_util": {"idle": 30.0, "busy": 70.0}}, CPU_CHECKS,
+                               warning_threshold=60, critical_threshold=90)
+    assert result["cpu_utilization"]["5_min_avg"] == 70
+    assert result["cpu_utilization"]["status"] == "WARNING"
+
+
+def test_cpu_empty_ring_warns(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(view_module.display, "warning", warnings.append)
+    result = health_check_view({"cpu_utilization": {"1_min_avg": 20, "5_min_avg": 20}}, CPU_CHECKS, samples={})
+    assert "samples" not in result["cpu_utilization"]
+    assert len(warnings) == 1 and "p95" in warnings[0]
+    # a single sample per run grades the reading without a warning
+    health_check_view({"cpu_utilization": {"5_min_avg": 20}}, CPU_CHECKS, samples=None)
+    assert len(warnings) == 1
+
+
+def bgp_target(*checks):
+    return {"name": "health_check", "vars": {"checks": list(checks)}}
+
+
+def test_bgp_established_from_the_prefix_count_column_only():
+    facts = {"neighbors": [
+        {"peer": "192.0.2.1", "peer_as": 65001, "state": "12", "prefixes_received": 12},
+        {"peer": "192.0.2.2", "peer_as": 65002, "state": "Idle", "prefixes_received": None},
+        # a numeric state outside the State/PfxRcd column is no prefix count
+        {"peer": "192.0.2.3", "peer_as": 65003, "status": "3"},
+    ]}
+    result = health_check_view(facts, bgp_target({"name": "all_neighbors_up"}, {"name": "bgp_status_summary"}))
+    assert result["bgp_status_summary"] == {"up": 1, "down": 2, "total": 3}
+    assert result["all_neighbors_up"]["status"] == "FAIL"
+
+
+def test_bgp_prefix_counts():
+    facts = {"neighbors": [
+        {"peer": "192.0.2.1", "peer_as": 65001, "state": "0", "prefixes_received": 0},
+        {"peer": "192.0.2.2", "peer_as": 65010, "state": "0", "prefixes_received": 0},
+        {"peer": "192.0.2.3", "peer_as": 65003, "state": "950", "prefixes_received": 950},
+    ]}
+    result = health_check_view(facts, bgp_target(
+        {"name": "min_prefixes_received", "min_count": 1, "peer_as": {65010: 0}},
+        {"name": "max_prefix_proximity", "max_prefixes": 1000, "peers": {"192.0.2.1": 0}},
+    ))
+    minimum = result["min_prefixes_received"]
+    assert (minimum["status"], minimum["checked"], minimum["violations"]) == ("FAIL", 3, 1)
+    assert minimum["neighbors"] == [{"peer": "192.0.2.1", "peer_as": 65001, "prefixes_received": 0, "min_prefixes": 1}]
+    maximum = result["max_prefix_proximity"]
+    assert (maximum["status"], maximum["threshold"], maximum["violations"]) == ("FAIL", 90.0, 1)
+    assert maximum["neighbors"][0]["percent"] == 95.0
+    assert result["result"] == "FAIL"
+
+
+def test_bgp_min_prefixes_without_a_limit_checks_nothing():
+    facts = {"neighbors": [{"peer": "192.0.2.1", "peer_as": 65001, "state": "0", "prefixes_received": 0}]}
+    result = health_check_view(facts, bgp_target({"name": "min_prefixes_received"}))
+    assert result["min_prefixes_received"]["status"] == "PASS"
+    assert result["min_prefixes_received"]["checked"] == 0
+
+
+def test_bgp_per_vrf_rollup_of_the_requested_address_families():
+    facts = {"neighbors": [
+        {"peer": "192.0.2.1", "vrf": "red", "afi": "IPv4 Unicast", "state": "Established"},
+        {"peer": "2001:db8::1", "vrf": "red", "afi": "ipv6 unicast", "state": "Idle"},
+        {"peer": "192.0.2.2", "state": "Established"},
+    ]}
+    target = bgp_target({"name": "all_neighbors_up"})
+    target["vars"]["per_vrf"] = True
+    result = health_check_view(facts, target)
+    assert sorted(result["vrfs"]["red"]) == ["ipv4 unicast", "ipv6 unicast"]
+    assert result["vrfs"]["default"]["ipv4 unicast"]["total"] == 1
+    target["vars"]["afis"] = ["IPv4 Unicast"]
+    result = health_check_view(facts, target)
+    assert result["vrfs"] == {
+        "default": {"ipv4 unicast": {"up": 1, "down": 0, "total": 1, "result": "PASS", "all_neighbors_up": {"status": "PASS"}}},
+        "red": {"ipv4 unicast": {"up": 1, "down": 0, "total": 1, "result": "PASS", "all_neighbors_up": {"status": "PASS"}}},
+    }
+
+
+def test_cpu_top_processes_of_every_platform():
+    nxos = {"cpu_utilization_processes": [
+        {"pid": 1, "process": "init", "one_sec": 0.0},
+        {"pid": 2, "process": "bgp", "one_sec": 30.0},
+        {"pid": 3, "process": "ospf", "one_sec": 10.0},
+    ]}
+    result = health_check_view(nxos, [{"name": "cpu_top_processes", "count": 2}])
+    assert result["cpu_top_processes"]["total_processes"] == 3
+    assert [process["process"] for process in result["cpu_top_processes"]["processes"]] == ["bgp", "ospf"]
+    iosxr = {"processes": [
+        {"pid": 1, "process": "bgp", "1_min": 9, "5_min": 4, "15_min": 2},
+        {"pid": 2, "process": "ospf", "1_min": 1, "5_min": 5, "15_min": 2},
+    ]}
+    result = health_check_view(iosxr, [{"name": "cpu_top_processes", "count": 5}])
+    assert result["cpu_top_processes"]["processes"] == [
+        {"pid": 2, "process": "ospf", "usage": 5.0, "1_min": 1, "5_min": 5, "15_min": 2},
+        {"pid": 1, "process": "bgp", "usage": 4.0, "1_min": 9, "5_min": 4, "15_min": 2},
+    ]
+    # a device without a process table
+    assert health_check_view({}, [{"name": "cpu_top_processes"}])["cpu_top_processes"] == {
+        "count": 5, "total_processes": 0, "processes": []}
+
+
+def test_crash_files_new_since_the_previous_run():
+    facts = {"cores": [
+        {"process": "bgp", "pid": 1, "datetime": "2024-05-01 10:00:00"},
+        {"process": "ospf", "pid": 2, "datetime": "2024-05-02 10:00:00"},
+    ]}
+    checks = [{"name": "crash_files"}, {"name": "crash_files_summary", "newest": 1}]
+    result = health_check_view(facts, checks, seen_crash_files=["bgp/1/2024-05-01 10:00:00"])
+    assert result["crash_files"] == {"status": "FAIL", "total_crash_files": 2, "new_crash_files": 1}
+    assert [entry["process"] for entry in result["crash_files_summary"]["crash_files"]] == ["ospf"]
+    assert result["result"] == "FAIL"
+    result = health_check_view(facts, [{"name": "crash_files", "ignore_errors": True}])
+    assert result["crash_files"]["status"] == "FAIL"
+    assert result["result"] == "PASS"
+
+
+def test_uptime_thresholds():
+    checks = [{"name": "uptime"}, {"name": "uptime_status_summary"}]
+    result = health_check_view({"uptime": "1 week, 2 days, 3 hours, 4 minutes"}, bgp_target(*checks))
+    assert result["uptime"]["current_uptime"] == 10080 + 2 * 1440 + 184
+    assert result["uptime"]["status"] == "PASS"
+    assert result["uptime_status_summary"] == {"weeks": 1, "days": 2, "hours": 3, "minutes": 4}
+    assert health_check_view({"uptime": "30 minutes"}, bgp_target(*checks))["uptime"]["status"] == "FAIL"
+    assert health_check_view({"uptime": "2 hours"}, bgp_target(*checks))["uptime"]["status"] == "WARNING"
+    assert health_check_view({"uptime": "200 days"}, bgp_target(*checks))["uptime"]["status"] == "WARNING"
+    assert health_check_view({"uptime": "2 years"}, bgp_target(*checks))["uptime"]["status"] == "FAIL"
+
+
+def test_uptime_unknown_fails():
+    result = health_check_view({"uptime": "unknown"}, bgp_target({"name": "uptime"}, {"name": "uptime_status_summary"}))
+    assert result["uptime"]["status"] == "FAIL"
+    assert result["uptime"]["current_uptime"] is None
+    assert result["uptime_status_summary"] == {"weeks": 0, "days": 0, "hours": 0, "minutes": 0}
+
+
+def test_bgp_recently_established_neighbors_flapped():
+    facts = {"neighbors": [
+        {"peer": "192.0.2.1", "state": "Established", "uptime": "00:05:00"},
+        {"peer": "192.0.2.2", "state": "Established", "uptime": "4w4d"},
+        {"peer": "192.0.2.3", "state": "Established", "uptime": "never"},
+        # a session down is not a flap
+        {"peer": "192.0.2.4", "state": "Active", "uptime": "00:00:10"},
+    ]}
+    result = health_check_view(facts, bgp_target({"name": "min_neighbors_uptime"}))
+    assert result["min_neighbors_uptime"] == {
+        "status": "FAIL", "min_uptime": 60, "flapped": 1, "neighbors": [{"peer": "192.0.2.1", "uptime": "00:05:00"}]}
+    result = health_check_view(facts, bgp_target({"name": "min_neighbors_uptime", "min_uptime": 1}))
+    assert result["min_neighbors_uptime"]["status"] == "PASS"
+
+
+NXOS_ENVIRONMENT = """Temperature:
+--------------------------------------------------------------------
+Module   Sensor        MajorThresh   MinorThres   CurTemp     Status
+--------------------------------------------------------------------
+1        FRONT           90              80          95         Major
+1        CPU             90              80          41         Ok
+
+Power Supply:
+Voltage: 12.0 Volts
+Power                              Actual        Total
+Supply    Model                    Output     Capacity    Status
+                                   (Watts )   (Watts )
+-------  -------------------  -----------  -----------  --------------
+1        N9K-PAC-650W-B               97 W      650 W     Ok
+2        N9K-PAC-650W-B                0 W      650 W     Shutdown
+"""
+
+
+def test_environment_of_the_parsed_output_the_role_passes():
+    pytest.importorskip("ansible_collections.ansible.netcommon")
+    from ansible_collections.network.healthchecks.plugins.plugin_utils import replay
+
+    env_health = replay.parse_capture(replay.find_template("nxos", "show environment"), NXOS_ENVIRONMENT)
+    checks = [{
+        "name": "environment_minimum_threshold",
+        "environment_temp_threshold": 40,
+        "environment_sensor_thresholds": {},
+    }]
+    # the call of roles/environment/tasks/main.yml
+    result = health_check_view(env_health, checks, details=False)
+    assert result["result"] == "FAIL"
+    assert result["environment"]["sensors"]["out_of_bounds"][0]["name"] == "1/FRONT"
+    assert result["environment"]["power_supplies"]["failed"] == [{"name": 2, "status": "Shutdown"}]
+    assert health_check_view({"env_health": env_health}, checks) == result
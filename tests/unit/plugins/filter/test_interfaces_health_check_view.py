@@ -0,0 +1,46 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.network.healthchecks.plugins.filter.interfaces_counter_sample import interfaces_counter_sample
+from ansible_collections.network.healthchecks.plugins.filter.interfaces_health_check_view import (
+    interfaces_health_check_view,
+)
+
+
+def facts(errors, octets):
+    counters = {"in_errors": errors, "out_errors": 0, "crc": 0, "in_discards": 0, "out_discards": 0,
+                "in_octets": octets, "out_octets": 0, "bandwidth": 1000}
+    return {"interfaces": {"Gi0/1": {"admin": "up", "operational": "up", "counters": counters}}}
+
+
+def target(**check):
+    check["name"] = "interface_error_rate"
+    return {"name": "health_check", "vars": {"checks": [check]}}
+
+
+def test_error_rate_without_previous_sample():
+    result = interfaces_health_check_view(facts(0, 0), target())
+    assert result["interface_error_rate"]["status"] == "PASS"
+    assert result["result"] == "PASS"
+
+
+def test_error_rate_checks_utilization_only_when_set():
+    previous = interfaces_counter_sample(facts(0, 0), 0, True)
+    result = interfaces_health_check_view(facts(0, 1250000), target(), previous_sample=previous, sampled_at=10)
+    assert result["interface_error_rate"]["status"] == "PASS"
+    assert "max_utilization" not in result["interface_error_rate"]
+    result = interfaces_health_check_view(
+        facts(0, 1250000), target(max_utilization=80), previous_sample=previous, sampled_at=10
+    )
+    assert result["interface_error_rate"]["interfaces"]["Gi0/1"]["utilization"] == 100.0
+    assert result["result"] == "FAIL"
+
+
+def test_error_rate_ignore_errors():
+    previous = interfaces_counter_sample(facts(0, 0), 0)
+    result = interfaces_health_check_view(
+        facts(100, 0), target(ignore_errors=True), previous_sample=previous, sampled_at=10
+    )
+    assert result["interface_error_rate"]["status"] == "FAIL"
+    assert result["result"] == "PASS"
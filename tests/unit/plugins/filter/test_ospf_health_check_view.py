@@ -0,0 +1,89 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.network.healthchecks.plugins.filter.ospf_health_check_view import (
+    OSPF_STATE_TABLE,
+    interface_key,
+    is_full_state,
+    normalize_area,
+    ospf_health_check_view,
+)
+
+
+FACTS = {
+    "v4": {"neighbors": [
+        {"neighbor_id": "2.2.2.2", "peer_state": "FULL/DR", "interface": "GigabitEthernet0/0"},
+        {"neighbor_id": "3.3.3.3", "peer_state": "INIT/DROTHER", "interface": "GigabitEthernet0/1"},
+    ]},
+    "v6": {"neighbors": [
+        {"neighbor_id": "2.2.2.2", "peer_state": "FULL/DR", "interface": "GigabitEthernet0/0"},
+    ]},
+    "interfaces": {
+        "v4": [{"interface": "Gi0/0", "area": 0}, {"interface": "Gi0/1", "area": "0.0.0.1"}],
+        "v6": [{"interface": "Gi0/0", "area": 10}],
+    },
+}
+
+
+def view(areas=None):
+    checks = [{"name": "all_neighbors_up"}, {"name": "ospf_status_summary"}]
+    return ospf_health_check_view(FACTS, {"name": "health_check", "vars": {"areas": areas, "checks": checks}})
+
+
+def test_interface_key_matches_abbreviations():
+    assert interface_key("GigabitEthernet0/1") == interface_key("Gi0/1") == ("gi", "0/1")
+    assert interface_key("Port-channel10") == interface_key("Po10")
+    assert interface_key("Ethernet1/1") == interface_key("Eth1/1")
+    assert interface_key("TenGigE0/0/0/1") == interface_key("Te0/0/0/1")
+    assert interface_key("ge-0/0/0.0") == ("ge", "0/0/0.0")
+    assert interface_key("eth1:10.0.12.1") == interface_key("eth1[DR]") == interface_key("eth1")
+    assert interface_key(None) is None
+    assert interface_key("") is None
+
+
+def test_interface_key_keeps_types_sharing_letters_apart():
+    assert interface_key("TwentyFiveGigE1/0/1") == interface_key("Twe1/0/1") == ("twe", "1/0/1")
+    assert interface_key("TwoGigabitEthernet1/0/1") == interface_key("Tw1/0/1") == ("tw", "1/0/1")
+    assert interface_key("TwentyFiveGigE1/0/1") != interface_key("TwoGigabitEthernet1/0/1")
+    assert interface_key("Serial0/0") == interface_key("Se0/0")
+    assert interface_key("ServiceEngine0/0") != interface_key("Serial0/0")
+
+
+def test_normalize_area():
+    assert normalize_area(0) == normalize_area("0.0.0.0") == "0.0.0.0"
+    assert normalize_area(256) == "0.0.1.0"
+    assert normalize_area(None) == "unknown"
+
+
+def test_areas_from_interface_table():
+    families = view()["ospf_status_summary"]["families"]
+    assert sorted(families["v4"]["areas"]) == ["0.0.0.0", "0.0.0.1"]
+    assert sorted(families["v6"]["areas"]) == ["0.0.0.10"]
+
+
+def test_areas_filter_keeps_matching_neighbors():
+    result = view(areas=[0])
+    assert result["all_neighbors_up"] == {"up": 1, "down": 0, "total": 1, "status": "PASS"}
+    assert view(areas=["0.0.0.1"])["all_neighbors_up"]["status"] == "FAIL"
+
+
+def test_no_interface_table_counts_unknown_area():
+    facts = {"v4": FACTS["v4"], "v6": FACTS["v6"]}
+    result = ospf_health_check_view(facts, {"name": "health_check", "vars": {"checks": [{"name": "ospf_status_summary"}]}})
+    assert list(result["ospf_status_summary"]["families"]["v4"]["areas"]) == ["unknown"]
+
+
+def test_areas_filter_checks_neighbors_of_unresolved_areas():
+    facts = {"v4": FACTS["v4"], "v6": FACTS["v6"], "interfaces": {"v4": [{"interface": "Gi0/0", "area": 0}]}}
+    checks = [{"name": "all_neighbors_up"}]
+    result = ospf_health_check_view(facts, {"name": "health_check", "vars": {"areas": [0], "checks": checks}})
+    # the v6 neighbor and the down v4 neighbor on Gi0/1 have no area
+    assert result["all_neighbors_up"] == {"up": 2, "down": 1, "total": 3, "unresolved_area": 2, "status": "FAIL"}
+
+
+def test_unknown_states_are_not_cached():
+    size = len(OSPF_STATE_TABLE)
+    assert is_full_state("full/new-role")
+    assert not is_full_state("2WAY/SOMETHING")
+    assert len(OSPF_STATE_TABLE) == size
@@ -0,0 +1,52 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils import bundle
+
+
+def write_tree(root):
+    (root / "roles" / "cpu" / "templates").mkdir(parents=True)
+    (root / "roles" / "cpu" / "tasks").mkdir()
+    (root / "plugins" / "filter" / "defaults").mkdir(parents=True)
+    (root / "roles" / "cpu" / "templates" / "ios_show_processes_cpu.yaml").write_text("# fmt: off\n[]\n# fmt: on\n")
+    (root / "plugins" / "filter" / "defaults" / "main.yml").write_text("cpu_threshold: 90\n")
+    (root / "roles" / "cpu" / "tasks" / "ios.yml").write_text(
+        "- ansible.utils.cli_parse:\n    command: show processes cpu\n"
+        "- block:\n    - ansible.utils.cli_parse:\n        command: show version\n"
+        "    - ansible.utils.cli_parse:\n        command: show processes cpu\n")
+    (root / "roles" / "cpu" / "tasks" / "main.yml").write_text("- ansible.utils.cli_parse:\n    command: ignored\n")
+
+
+def test_build_and_stale(tmp_path):
+    write_tree(tmp_path)
+    built = bundle.build(str(tmp_path))
+    assert sorted(built["files"]) == ["plugins/filter/defaults/main.yml", "roles/cpu/templates/ios_show_processes_cpu.yaml"]
+    assert built["files"]["plugins/filter/defaults/main.yml"]["data"] == {"cpu_threshold": 90}
+    assert built["commands"] == {"cpu": {"ios": ["show processes cpu", "show version"]}}
+    assert bundle.stale(built, str(tmp_path)) == []
+    (tmp_path / "plugins" / "filter" / "defaults" / "main.yml").write_text("cpu_threshold: 80\n")
+    (tmp_path / "roles" / "cpu" / "templates" / "ios_show_version.yaml").write_text("[]\n")
+    assert bundle.stale(built, str(tmp_path)) == [
+        "plugins/filter/defaults/main.yml", "roles/cpu/templates/ios_show_version.yaml"]
+    assert bundle.stale(dict(built, format=0), str(tmp_path))[-1] == "format or commands"
+
+
+def test_load_yaml_reads_a_changed_source_again(tmp_path):
+    source = tmp_path / "defaults.yml"
+    source.write_text("cpu_threshold: 90\n")
+    assert bundle.load_yaml(str(source)) == {"cpu_threshold": 90}
+
+
+def test_load_bundle_of_another_format(tmp_path):
+    path = tmp_path / "bundle.json"
+    path.write_text(json.dumps({"format": bundle.FORMAT + 1, "files": {}}))
+    assert bundle.load_bundle(str(path)) == {}
+    assert bundle.load_bundle(str(tmp_path / "missing.json")) == {}
+
+
+def test_shipped_bundle_is_current():
+    with open(bundle.BUNDLE_FILE) as handle:
+        assert bundle.stale(json.load(handle)) == []
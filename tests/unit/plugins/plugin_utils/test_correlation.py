@@ -0,0 +1,81 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.network.healthchecks.plugins.filter.neighbor_correlation import neighbor_correlation
+from ansible_collections.network.healthchecks.plugins.plugin_utils.correlation import correlate, host_facts
+
+
+def bgp_host(router_id, local_as, *neighbors):
+    return {"bgp_health": {"router_id": router_id, "local_as": local_as, "neighbors": [
+        dict(zip(("peer", "peer_as", "state"), neighbor)) for neighbor in neighbors]}}
+
+
+def test_host_facts():
+    facts = host_facts(dict(bgp_host("10.0.0.1", 65001), ansible_host="192.0.2.1",
+                            ospf_health={"v4": {"neighbors": [{"neighbor_id": "10.0.0.2"}]}}))
+    assert facts["addresses"] == ["10.0.0.1", "192.0.2.1"]
+    assert facts["local_as"] == 65001
+    assert facts["bgp"] == []
+    assert facts["ospf"] == [{"neighbor_id": "10.0.0.2", "family": "v4"}]
+    assert host_facts({}) == {"addresses": [], "local_as": None, "bgp": None, "ospf": None}
+
+
+def test_session_seen_from_both_ends():
+    hostvars = {
+        "r1": bgp_host("10.0.0.1", 65001, ("10.0.0.2", 65002, "Established"), ("10.0.0.3", 65003, "Idle")),
+        "r2": bgp_host("10.0.0.2", 65002, ("10.0.0.1", 65001, "Established")),
+        "r3": bgp_host("10.0.0.3", 65003, ("10.0.0.1", 65001, "Active")),
+    }
+    report = neighbor_correlation(sorted(hostvars), hostvars)
+    assert (report["bgp"]["sessions"], report["bgp"]["up"]) == (2, 1)
+    assert report["bgp"]["incidents"] == [
+        {"hosts": ["r1", "r3"], "scope": "default/v4", "kind": "down", "states": {"r1": "Idle", "r3": "Active"}}]
+    assert report["merged_failures"] == 1
+    assert report["result"] == "FAIL"
+
+
+def test_asymmetric_and_one_sided_sessions():
+    hostvars = {
+        "r1": bgp_host("10.0.0.1", 65001, ("10.0.0.2", 65002, "Established"), ("10.0.0.3", 65003, "Established")),
+        "r2": bgp_host("10.0.0.2", 65002, ("10.0.0.1", 65001, "Idle")),
+        "r3": bgp_host("10.0.0.3", 65003),
+    }
+    incidents = neighbor_correlation(sorted(hostvars), hostvars)["bgp"]["incidents"]
+    assert [(incident["hosts"], incident["kind"]) for incident in incidents] == [
+        (["r1", "r2"], "asymmetric"), (["r1", "r3"], "one_sided")]
+    assert incidents[1]["missing"] == "r3"
+
+
+def test_unverified_external_and_unidentified():
+    hostvars = {
+        # r2 runs no BGP collection, 198.51.100.1 is outside the fleet
+        "r1": bgp_host("10.0.0.1", 65001, ("10.0.0.2", 65002, "Established"), ("198.51.100.1", 64999, "Established")),
+        "r2": {"ansible_host": "10.0.0.2"},
+        "r3": {},
+    }
+    report = neighbor_correlation(sorted(hostvars), hostvars)
+    assert report["bgp"]["unverified"] == 1
+    assert report["bgp"]["external"] == 1
+    assert report["unidentified"] == ["r3"]
+    assert report["result"] == "PASS"
+
+
+def test_conflicting_addresses_are_not_paired():
+    hosts = {
+        "r1": {"addresses": ["10.0.0.9"], "bgp": [], "ospf": None},
+        "r2": {"addresses": ["10.0.0.9"], "bgp": [], "ospf": None},
+    }
+    assert correlate(hosts)["conflicts"] == ["10.0.0.9"]
+
+
+def test_ospf_adjacency_and_unknown_state():
+    hostvars = {
+        "r1": {"healthchecks_router_id": "10.0.0.1", "ospf_health": {"v4": {"neighbors": [
+            {"neighbor_id": "10.0.0.2", "peer_state": "FULL/DR", "address": "10.1.0.2"}]}}},
+        "r2": {"healthchecks_router_id": "10.0.0.2", "ospf_health": {"v4": {"neighbors": [
+            {"neighbor_id": "10.0.0.1", "peer_state": None, "address": "10.1.0.1"}]}}},
+    }
+    report = neighbor_correlation(sorted(hostvars), hostvars)
+    assert report["ospf"]["incidents"] == [
+        {"hosts": ["r1", "r2"], "scope": "v4", "kind": "asymmetric", "states": {"r1": "FULL/DR", "r2": "Down"}}]
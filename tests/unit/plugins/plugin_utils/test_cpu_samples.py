@@ -0,0 +1,87 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils import cpu_samples
+
+
+def test_sample_value_per_platform():
+    ios = {"cpu_utilization": {"5_sec": "12", "1_min_avg": 30, "5_min_avg": 20}}
+    busy = {"cpu_util": {"idle": 93.5, "busy": 6.5}}
+    assert cpu_samples.sample_value(ios, "ios") == 12.0
+    assert cpu_samples.sample_value(ios, "cisco.ios.ios") == 12.0
+    assert cpu_samples.sample_value(busy, "nxos") == 6.5
+    assert cpu_samples.sample_value(busy, "arista.eos.eos") == 6.5
+    assert cpu_samples.sample_value({"cpu_utilization": {"1_min_avg": 4, "5_min_avg": 5}}, "iosxr") == 4.0
+
+
+def test_sample_value_without_platform_reads_the_first_field_found():
+    assert cpu_samples.sample_value({"cpu_util": {"busy": 6.5}}) == 6.5
+    assert cpu_samples.sample_value({"cpu_utilization": {"1_min_avg": 4}}) == 4.0
+
+
+def test_sample_value_missing_field():
+    # a window of another platform is not a sample, nor the NX-OS process table
+    assert cpu_samples.sample_value({"cpu_utilization": {"1_min_avg": 4}}, "ios") is None
+    assert cpu_samples.sample_value({"cpu_utilization_processes": [{"one_sec": 1.0}]}, "nxos") is None
+    assert cpu_samples.sample_value({"cpu_utilization": {"5_sec": ""}}, "ios") is None
+    assert cpu_samples.sample_value(None) is None
+
+
+def test_sample_value_unknown_platform():
+    with pytest.raises(ValueError, match="junos"):
+        cpu_samples.sample_value({}, "junos")
+
+
+def test_push_spaces_the_samples():
+    ring = cpu_samples.push({}, [10, None, 20], size=5, interval=5, now=100)
+    assert ring == {"size": 5, "next": 0, "samples": [[95.0, 10.0], [100.0, 20.0]]}
+
+
+def test_push_overwrites_the_oldest_sample():
+    ring = cpu_samples.push({}, [1, 2, 3], size=3, interval=1, now=3)
+    ring = cpu_samples.push(ring, [4, 5], size=3, interval=1, now=5)
+    assert ring["next"] == 2
+    assert [value for _time, value in cpu_samples.ordered(ring)] == [3.0, 4.0, 5.0]
+    # the write position wraps around to the first slot
+    ring = cpu_samples.push(ring, [6, 7], size=3, interval=1, now=7)
+    assert ring["next"] == 1
+    assert [value for _time, value in cpu_samples.ordered(ring)] == [5.0, 6.0, 7.0]
+
+
+def test_push_restarts_a_ring_of_another_size():
+    ring = cpu_samples.push({}, [1, 2, 3], size=3, now=3)
+    assert cpu_samples.push(ring, [4], size=2, now=4)["samples"] == [[4.0, 4.0]]
+    with pytest.raises(ValueError):
+        cpu_samples.push(ring, [4], size=0)
+
+
+def test_summarize():
+    ring = cpu_samples.push({}, list(range(1, 21)), size=60, interval=5, now=100)
+    assert cpu_samples.summarize(ring) == {
+        "count": 20, "window": 95.0, "min": 1.0, "mean": 10.5, "p95": 19.0, "max": 20.0,
+    }
+
+
+def test_summarize_empty_ring():
+    assert cpu_samples.summarize({}) is None
+    assert cpu_samples.summarize(None) is None
+    assert cpu_samples.ordered({"size": 3, "next": 0, "samples": []}) == []
+
+
+@pytest.mark.parametrize("network_os, command, text, expected", [
+    ("nxos", "show processes cpu",
+     "1000  500  300  10  1.00%  process_0\n\nCPU util  :    3.50% user,    3.00% kernel,   93.50% idle\n", 6.5),
+    ("eos", "show processes top once",
+     "top - 10:00:00 up 17 days\n%Cpu(s):  4.1 us,  1.0 sy,  0.0 ni, 94.9 id,  0.0 wa,  0.0 hi\n", 5.1),
+    ("iosxr", "show processes cpu",
+     "CPU utilization for one minute: 4%; five minutes: 5%; fifteen minutes: 5%\n", 4.0),
+])
+def test_templates_parse_a_sample(network_os, command, text, expected):
+    pytest.importorskip("ansible_collections.ansible.netcommon")
+    from ansible_collections.network.healthchecks.plugins.plugin_utils import replay
+
+    parsed = replay.parse_capture(replay.find_template(network_os, command), text)
+    assert cpu_samples.sample_value(parsed, network_os) == expected
@@ -0,0 +1,51 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.network.healthchecks.plugins.filter.crash_files_seen import crash_files_seen
+from ansible_collections.network.healthchecks.plugins.plugin_utils import crash_files
+
+
+CORE = {"process": "bgp", "pid": 1234, "datetime": "2024-05-01 10:00:00"}
+CRASHINFO = {"path": "crashinfo_RP_00_00", "size": 1024, "month": "May", "day": 1, "year": 2024, "time": "10:00:00"}
+
+
+def test_crash_key():
+    assert crash_files.crash_key(CORE) == "bgp/1234/2024-05-01 10:00:00"
+    assert crash_files.crash_key(CRASHINFO) == "crashinfo_RP_00_00|1024|May 1 2024 10:00:00"
+    assert crash_files.crash_key({"file": " /misc/disk1/core.1 "}) == "/misc/disk1/core.1"
+    assert crash_files.crash_key({}) is None
+
+
+def test_file_rewritten_under_the_same_name_is_new():
+    seen = [crash_files.crash_key(CRASHINFO)]
+    rewritten = dict(CRASHINFO, size=2048, day=2)
+    result = crash_files.evaluate_crash_files([rewritten], seen=seen)
+    assert result["status"] == "FAIL"
+    assert result["new"][0]["key"] == "crashinfo_RP_00_00|2048|May 2 2024 10:00:00"
+    assert crash_files.evaluate_crash_files([CRASHINFO], seen=seen)["status"] == "PASS"
+
+
+def test_max_age_and_newest():
+    now = crash_files.crash_timestamp({"datetime": "2024-05-10 10:00:00"})
+    entries = [dict(CORE, pid=pid, datetime="2024-05-%02d 10:00:00" % day) for pid, day in ((1, 1), (2, 9), (3, 5))]
+    entries.append({"line": "undated crash"})
+    result = crash_files.evaluate_crash_files(entries, max_age=3 * 86400, newest=2, now=now)
+    assert result["total_crash_files"] == 4
+    assert [entry["pid"] for entry in result["new"] if "pid" in entry] == [2]
+    assert result["new_crash_files"] == 2
+    assert [entry["pid"] for entry in result["newest"]] == [2, 3]
+    assert crash_files.evaluate_crash_files(entries, newest=0)["newest"] == []
+
+
+def test_merge_seen_keeps_the_previous_runs():
+    assert crash_files.merge_seen(["a", "b"], ["b", "c", None]) == ["a", "b", "c"]
+    assert crash_files.merge_seen(["a", "b"], ["c", "d"], limit=3) == ["b", "c", "d"]
+    assert crash_files.merge_seen(None, []) == []
+
+
+def test_crash_files_seen_filter():
+    facts = {"cores": [CORE], "crashinfo_files": [CRASHINFO, {}]}
+    assert crash_files_seen(facts) == ["bgp/1234/2024-05-01 10:00:00", "crashinfo_RP_00_00|1024|May 1 2024 10:00:00"]
+    # a crash missing from this listing stays seen
+    assert crash_files_seen({"cores": [CORE]}, seen=["old"], limit=0) == ["old", "bgp/1234/2024-05-01 10:00:00"]
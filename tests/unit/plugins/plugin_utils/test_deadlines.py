@@ -0,0 +1,91 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.network.healthchecks.plugins.filter.deadline_summary import deadline_summary
+from ansible_collections.network.healthchecks.plugins.plugin_utils import deadlines
+
+
+HEALTH_CHECKS = {
+    "result": "FAIL",
+    "all_neighbors_up": {"status": "PASS"},
+    "interface_error_rate": {"status": "FAIL"},
+}
+
+
+def test_ok_collection():
+    result = deadlines.apply_deadline(
+        {"result": "PASS", "cpu_utilization": {"status": "PASS"}}, "OK", 100, 30,
+        finished_at=102, collected_at=101, commands=[{"collected": True}],
+    )
+    assert result["result"] == "PASS"
+    assert result["collection"] == {
+        "status": "OK", "timeout": 30, "elapsed": 2.0, "phases": {"collect": 1.0, "evaluate": 1.0},
+    }
+
+
+def test_missing_command_only_times_out_its_checks():
+    commands = [{"collected": True, "checks": ["all_neighbors_up"]}, {"collected": False, "checks": ["interface_error_rate"]}]
+    result = deadlines.apply_deadline(HEALTH_CHECKS, "OK", 100, 30, finished_at=110, commands=commands)
+    assert result["collection"]["status"] == "TIMEOUT"
+    assert result["collection"]["missing"] == ["interface_error_rate"]
+    assert result["interface_error_rate"] == {"status": "TIMEOUT"}
+    assert result["all_neighbors_up"] == {"status": "PASS"}
+    # the failure came from the check that was not collected
+    assert result["result"] == "PARTIAL"
+
+
+def test_collected_failure_is_kept():
+    health_checks = dict(HEALTH_CHECKS, all_neighbors_up={"status": "FAIL"})
+    commands = [{"collected": True, "checks": ["all_neighbors_up"]}, {"collected": False, "checks": ["interface_error_rate"]}]
+    result = deadlines.apply_deadline(health_checks, "OK", 100, 30, finished_at=110, commands=commands)
+    assert result["all_neighbors_up"] == {"status": "FAIL"}
+    assert result["result"] == "FAIL"
+
+
+def test_command_without_checks_feeds_every_check():
+    commands = [{"collected": True}, {"collected": False}]
+    result = deadlines.apply_deadline(HEALTH_CHECKS, "OK", 100, 30, finished_at=110, commands=commands)
+    assert result["collection"]["missing"] == ["all_neighbors_up", "interface_error_rate"]
+    assert result["result"] == "PARTIAL"
+
+
+def test_nothing_collected():
+    result = deadlines.apply_deadline(HEALTH_CHECKS, "OK", 100, 30, finished_at=130, commands=[{"collected": False}])
+    assert result["result"] == "TIMEOUT"
+    assert result["collection"]["status"] == "TIMEOUT"
+
+
+def test_skipped_and_cached():
+    skipped = deadlines.apply_deadline(HEALTH_CHECKS, "SKIPPED", 100, 0, finished_at=100, reason="Critical checks failed: crash_files")
+    assert skipped == {
+        "result": "SKIPPED",
+        "collection": {"status": "SKIPPED", "timeout": 0, "elapsed": 0.0, "reason": "Critical checks failed: crash_files"},
+    }
+    previous = {"ran_at": 40, "health_checks": {"result": "PASS"}}
+    cached = deadlines.apply_deadline({}, "CACHED", 100, 0, finished_at=100, previous=previous, commands=[{"collected": False}])
+    assert cached["result"] == "PASS"
+    assert cached["collection"]["age"] == 60
+    assert "missing" not in cached["collection"]
+
+
+def test_summarize_deadlines():
+    results = {
+        "r1": {"result": "PASS", "collection": {"status": "OK", "elapsed": 1.0}},
+        "r2": {"result": "PARTIAL", "collection": {"status": "TIMEOUT", "elapsed": 30.0}},
+        "r3": {"result": "TIMEOUT", "collection": {"status": "TIMEOUT", "elapsed": 31.0}},
+        "r4": {"result": "PASS"},
+    }
+    summary = deadlines.summarize_deadlines(results, slowest=2)
+    assert summary["hosts"] == 3
+    assert (summary["timeout"], summary["partial"]) == (1, 1)
+    assert summary["elapsed"] == {"p50": 30.0, "p90": 31.0, "p99": 31.0, "max": 31.0}
+    assert summary["slowest"] == [{"host": "r3", "elapsed": 31.0}, {"host": "r2", "elapsed": 30.0}]
+    assert deadline_summary(results, "2") == summary
+
+
+def test_summarize_empty_fleet():
+    summary = deadlines.summarize_deadlines({})
+    assert summary["hosts"] == 0
+    assert summary["elapsed"]["max"] is None
+    assert summary["slowest"] == []
@@ -0,0 +1,61 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import gzip
+import os
+
+import pytest
+
+from ansible.errors import AnsibleFilterError
+
+from ansible_collections.network.healthchecks.plugins.filter.offload_details import offload_details
+from ansible_collections.network.healthchecks.plugins.plugin_utils import details_store
+
+
+LARGE = {"neighbors": [{"peer": "10.0.%d.%d" % (index // 250, index % 250)} for index in range(500)]}
+
+
+def test_offload_writes_the_large_blocks_only(tmp_path):
+    health_checks = {
+        "result": "PASS",
+        "details": {"small": True},
+        "vrfs": {"default": {"ipv4 unicast": {"result": "PASS", "details": LARGE}}},
+        "detailed_interfaces": LARGE,
+    }
+    offloaded = details_store.offload(health_checks, str(tmp_path), "r1/x", "bgp")
+    assert offloaded["details"] == {"small": True}
+    reference = offloaded["vrfs"]["default"]["ipv4 unicast"]["details"]
+    assert reference["details_file"] == os.path.join(str(tmp_path), "r1_x", "bgp", "vrfs.default.ipv4_unicast.details.json.gz")
+    assert offloaded["detailed_interfaces"]["details_file"].endswith("detailed_interfaces.json.gz")
+    assert details_store.resolve(offloaded) == health_checks
+    # identical details give identical files
+    with open(reference["details_file"], "rb") as handle:
+        first = handle.read()
+    details_store.offload(health_checks, str(tmp_path), "r1/x", "bgp")
+    with open(reference["details_file"], "rb") as handle:
+        assert handle.read() == first
+
+
+def test_offload_leaves_references_alone(tmp_path):
+    reference = details_store.write_details(str(tmp_path / "block.json.gz"), LARGE)
+    assert details_store.offload({"details": reference}, str(tmp_path), "r1", "bgp", min_size=0) == {"details": reference}
+
+
+def test_altered_file_fails(tmp_path):
+    reference = details_store.write_details(str(tmp_path / "block.json.gz"), LARGE)
+    with gzip.open(reference["details_file"], "wb") as handle:
+        handle.write(b"{}")
+    with pytest.raises(ValueError, match="does not match"):
+        details_store.load_details(reference)
+    os.unlink(reference["details_file"])
+    with pytest.raises(OSError):
+        details_store.resolve([reference])
+
+
+def test_offload_details_filter(tmp_path):
+    health_checks = {"details": LARGE}
+    assert offload_details(health_checks, "", "r1", "bgp") is health_checks
+    assert "details_file" in offload_details(health_checks, str(tmp_path), "r1", "bgp")["details"]
+    with pytest.raises(AnsibleFilterError):
+        offload_details(health_checks, str(tmp_path))
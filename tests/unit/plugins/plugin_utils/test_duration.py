@@ -0,0 +1,40 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.duration import duration_seconds, parse_duration
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("4w4d", (28 + 4) * 86400),
+    ("1y2w", 365 * 86400 + 14 * 86400),
+    ("2d03h", 2 * 86400 + 3 * 3600),
+    ("1 year, 2 weeks, 3 days", 365 * 86400 + 17 * 86400),
+    ("3 day(s), 4 hour(s)", 3 * 86400 + 4 * 3600),
+    ("1 hour and 5 minutes", 3900),
+    ("01:02:03", 3723),
+    ("1d02:03:04", 86400 + 7384),
+    ("02:03", 7380),
+    ("45S", 45),
+    ("300", 300),
+    (" 0 ", 0),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == seconds
+
+
+@pytest.mark.parametrize("value", ["never", "N/A", "-", "", "Idle", "4w4x", "4 weeks ago", "1:2:3"])
+def test_parse_duration_unknown(value):
+    assert parse_duration(value) is None
+
+
+def test_duration_seconds():
+    assert duration_seconds(None) is None
+    assert duration_seconds(True) is None
+    assert duration_seconds(90.5) == 90
+    assert duration_seconds("7d") == 7 * 86400
+    assert duration_seconds("604800") == 604800
+    assert duration_seconds({"days": 1, "minutes": "2"}) == 86520
+    assert duration_seconds({"days": "x"}) is None
@@ -0,0 +1,97 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import math
+import os
+
+import pytest
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils import environment
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+TWO_COLUMNS = """Power                              Actual        Total
+Supply    Model                    Output     Capacity    Status
+                                   (Watts )   (Watts )
+-------  -------------------  -----------  -----------  --------------
+1        N9K-PAC-650W-B               97 W      650 W     Ok
+2        N9K-PAC-650W-B                0 W      650 W     Absent
+"""
+
+
+def parse_nxos_environment(text):
+    pytest.importorskip("ansible_collections.ansible.netcommon")
+    from ansible_collections.network.healthchecks.plugins.plugin_utils import replay
+
+    return replay.parse_capture(replay.find_template("nxos", "show environment"), text)
+
+
+def test_nxos_power_supplies_two_wattage_columns():
+    supplies = parse_nxos_environment(TWO_COLUMNS)["power_supplies"]
+    assert supplies[1] == {"model": "N9K-PAC-650W-B", "actual_output": 97, "capacity": 650, "status": "Ok"}
+    assert environment.evaluate_units(supplies) == {"status": "PASS", "total": 2, "ok": 1, "absent": 1, "failed": []}
+
+
+def test_nxos_power_supplies_output_input_and_capacity_columns():
+    with open(os.path.join(FIXTURES, "nxos_show_environment_power_input.txt")) as handle:
+        supplies = parse_nxos_environment(handle.read())["power_supplies"]
+    assert supplies[1] == {
+        "model": "NXA-PAC-1100W-PE2", "actual_output": 169, "actual_input": 186, "capacity": 1100, "status": "Ok",
+    }
+    assert sorted(supplies) == [1, 2, 3]
+    assert environment.evaluate_units(supplies) == {
+        "status": "FAIL", "total": 3, "ok": 1, "absent": 1, "failed": [{"name": 2, "status": "Shutdown"}],
+    }
+
+
+def test_sensor_class():
+    assert environment.sensor_class("Intake") == "inlet"
+    assert environment.sensor_class("Back-Exhaust") == "outlet"
+    assert environment.sensor_class("CPU") == "cpu"
+    assert environment.sensor_class("HOMEWOOD") == "asic"
+    assert environment.sensor_class("PS1") == "psu"
+    assert environment.sensor_class("Board") == "other"
+    assert environment.sensor_class(None) == "other"
+
+
+def test_sensor_table_skips_sensors_without_reading():
+    table = environment.build_sensor_table([
+        {"module": 1, "sensor": "CPU", "current": "40", "major": "n/a"},
+        {"module": 1, "sensor": "Board", "current": None},
+    ])
+    assert table["names"] == ["1/CPU"]
+    assert math.isnan(table["major"][0])
+
+
+def test_evaluate_sensors_thresholds():
+    sensors = {
+        "1/Intake": {"module": 1, "sensor": "Intake", "current": 45, "major": 70, "minor": 42, "status": "ok"},
+        "1/CPU": {"module": 1, "sensor": "CPU", "current": 75, "major": 90, "minor": 80, "status": "ok"},
+        "1/Board": {"module": 1, "sensor": "Board", "current": 60, "status": "ok"},
+        "2/ASIC": {"module": 2, "sensor": "ASIC", "current": 50, "major": 100, "minor": 90, "status": "alarm"},
+    }
+    result = environment.evaluate_sensors(sensors, 55, {"CPU": 70})
+    by_name = dict((sensor["name"], sensor) for sensor in result["out_of_bounds"])
+    # the class threshold wins over the device major threshold
+    assert by_name["1/CPU"]["status"] == "FAIL" and by_name["1/CPU"]["threshold"] == 70.0
+    # without a device threshold the default applies
+    assert by_name["1/Board"]["status"] == "FAIL" and by_name["1/Board"]["threshold"] == 55.0
+    # past the minor threshold, or with a status that is not OK, is a warning
+    assert by_name["1/Intake"]["status"] == "WARNING"
+    assert by_name["2/ASIC"]["status"] == "WARNING"
+    assert (result["status"], result["total"], result["failed"], result["warning"]) == ("FAIL", 4, 2, 2)
+    assert result["modules"]["1"] == {"count": 3, "max": 75.0, "mean": 60.0}
+
+
+def test_evaluate_without_sensors_or_units():
+    assert environment.evaluate_sensors({}, 55) == {
+        "status": "PASS", "total": 0, "failed": 0, "warning": 0, "out_of_bounds": [], "modules": {},
+    }
+    assert environment.evaluate_units(None) == {"status": "PASS", "total": 0, "ok": 0, "absent": 0, "failed": []}
+
+
+def test_evaluate_units_unknown_status_fails():
+    result = environment.evaluate_units([{"name": "Fan1", "status": "Unknown"}, {"name": "Fan2", "status": "ok"}])
+    assert result["status"] == "FAIL"
+    assert result["failed"] == [{"name": "Fan1", "status": "Unknown"}]
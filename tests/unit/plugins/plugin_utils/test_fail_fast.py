@@ -0,0 +1,44 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleFilterError
+
+from ansible_collections.network.healthchecks.plugins.filter.critical_failures import critical_failures
+from ansible_collections.network.healthchecks.plugins.filter.health_check_order import health_check_order
+from ansible_collections.network.healthchecks.plugins.plugin_utils.fail_fast import failed_checks, order_roles
+
+
+def test_order_roles_cheapest_first():
+    roles = ["network.healthchecks.interfaces", "custom", "bgp", "network.healthchecks.uptime", "other"]
+    assert order_roles(roles) == ["network.healthchecks.uptime", "bgp", "network.healthchecks.interfaces", "custom", "other"]
+    assert order_roles(["cpu", "bgp"], cost={"bgp": 0}) == ["bgp", "cpu"]
+    assert health_check_order([]) == []
+
+
+def test_failed_checks_of_the_critical_checks_only():
+    health_checks = {
+        "environment": {"status": "FAIL"},
+        "crash_files": {"status": "FAIL"},
+        "cpu_utilization": {"status": "WARNING"},
+        "all_neighbors_up": {"status": "FAIL"},
+        "result": "FAIL",
+    }
+    critical = ["environment_minimum_threshold", "crash_files", "cpu_utilization"]
+    assert failed_checks(health_checks, critical) == ["crash_files", "environment_minimum_threshold"]
+    # filesystem and filesystems map to one check name
+    assert failed_checks({"filesystem": {"status": "FAIL"}, "filesystems": {"status": "FAIL"}},
+                         ["filesystem_status_summary"]) == ["filesystem_status_summary"]
+    assert failed_checks(None, critical) == []
+
+
+def test_critical_failures_filter():
+    health_checks = {"crash_files": {"status": "FAIL"}, "all_neighbors_up": {"status": "FAIL"}}
+    # the defaults list environment_minimum_threshold and crash_files
+    assert critical_failures(health_checks) == ["crash_files"]
+    assert critical_failures(health_checks, ["all_neighbors_up"]) == ["all_neighbors_up"]
+    assert critical_failures(health_checks, []) == []
+    with pytest.raises(AnsibleFilterError):
+        critical_failures(None)
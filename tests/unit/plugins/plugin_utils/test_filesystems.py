@@ -0,0 +1,54 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils import filesystems
+
+
+def test_normalize_name():
+    assert filesystems.normalize_name("bootflash:") == "bootflash"
+    assert filesystems.normalize_name("bootflash://sup-local/") == "bootflash"
+    assert filesystems.normalize_name("bootflash") == "bootflash"
+
+
+def test_free_percent():
+    assert filesystems.free_percent(25, 100) == 25.0
+    assert filesystems.free_percent("1", "3") == 33.33
+    assert filesystems.free_percent(10, 0) is None
+    assert filesystems.free_percent(10, None) is None
+
+
+def test_iter_filesystems_dict_and_list():
+    assert list(filesystems.iter_filesystems({"flash:": None})) == [("flash:", {})]
+    assert list(filesystems.iter_filesystems([{"prefix": "nvram:", "free": 1}])) == [("nvram:", {"prefix": "nvram:", "free": 1})]
+    assert list(filesystems.iter_filesystems(None)) == []
+
+
+def test_per_filesystem_thresholds():
+    result = filesystems.evaluate_filesystems(
+        {"bootflash:": {"free": 15, "total": 100}, "logflash:": {"free": 15, "total": 100}},
+        10, {"bootflash://sup-local/": 20},
+    )
+    assert result["failed_filesystems"] == ["bootflash:"]
+    thresholds = dict((entry["name"], entry["threshold"]) for entry in result["lowest_free"])
+    assert thresholds == {"bootflash:": 20.0, "logflash:": 10.0}
+    assert result["status"] == "FAIL"
+
+
+def test_failed_filesystems_are_capped_like_lowest_free():
+    many = dict(("fs%d:" % index, {"free": index, "total": 100}) for index in range(20))
+    result = filesystems.evaluate_filesystems(many, 50, lowest_count=3)
+    assert result["failed"] == 20
+    assert result["failed_filesystems"] == ["fs0:", "fs1:", "fs2:"]
+    assert [entry["name"] for entry in result["lowest_free"]] == ["fs0:", "fs1:", "fs2:"]
+    assert filesystems.evaluate_filesystems(many, 50, lowest_count=0)["failed_filesystems"] == []
+
+
+def test_invalid_and_empty_filesystems():
+    result = filesystems.evaluate_filesystems({"nvram:": {"free": 5, "total": 0}}, 10)
+    assert (result["status"], result["invalid"], result["evaluated"]) == ("FAIL", 1, 0)
+    result = filesystems.evaluate_filesystems({}, 10)
+    assert result == {
+        "status": "FAIL", "total": 0, "evaluated": 0, "invalid": 0, "failed": 0,
+        "failed_filesystems": [], "lowest_free": [],
+    }
@@ -0,0 +1,87 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import io
+import json
+
+import pytest
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils import fleet_evaluator
+
+
+TARGET = {"name": "health_check", "vars": {"checks": [{"name": "all_neighbors_up"}]}}
+UP = {"neighbors": [{"peer": "10.0.0.1", "state": "Established"}]}
+DOWN = {"neighbors": [{"peer": "10.0.0.1", "state": "Idle"}]}
+
+
+def write_fleet(path):
+    path.mkdir()
+    (path / "r1.json").write_text(json.dumps(UP))
+    (path / "r2.json").write_text(json.dumps({"host": "core-2", "health_facts": DOWN}))
+    (path / "r3.json").write_text("{broken")
+    (path / "notes.txt").write_text("ignored")
+    return path
+
+
+def results(output):
+    return dict((line["host"], line) for line in (json.loads(text) for text in output.getvalue().splitlines()))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_grades_every_device(tmp_path, workers):
+    fleet = write_fleet(tmp_path / "fleet")
+    output = io.StringIO()
+    counts = fleet_evaluator.run(fleet_evaluator.iter_sources(str(fleet)), output, "health_check_view",
+                                 TARGET, {}, workers, max_in_flight=1, batch_size=1)
+    assert counts == {"PASS": 1, "FAIL": 1, "error": 1}
+    graded = results(output)
+    assert graded["r1"]["result"]["result"] == "PASS"
+    assert graded["core-2"]["result"]["all_neighbors_up"]["status"] == "FAIL"
+    assert graded["r3"]["error"].startswith("JSONDecodeError")
+
+
+def test_run_of_an_empty_fleet(tmp_path):
+    (tmp_path / "empty").mkdir()
+    output = io.StringIO()
+    assert fleet_evaluator.run(fleet_evaluator.iter_sources(str(tmp_path / "empty")), output,
+                               "health_check_view", TARGET, {}, 2, 8) == {}
+    assert output.getvalue() == ""
+
+
+def test_jsonl_source_with_its_own_target(tmp_path):
+    source = tmp_path / "fleet.jsonl"
+    source.write_text("\n".join([
+        json.dumps({"host": "r1", "health_facts": DOWN, "target": [{"name": "uptime"}]}),
+        "",
+        json.dumps(UP),
+    ]) + "\n")
+    assert list(fleet_evaluator.iter_sources(str(source)))[1][0] == "line 3"
+    output = io.StringIO()
+    fleet_evaluator.run(fleet_evaluator.iter_sources(str(source)), output, "health_check_view", TARGET, {}, 1, 1)
+    graded = results(output)
+    assert "all_neighbors_up" not in graded["r1"]["result"]
+    assert graded["line 3"]["result"]["result"] == "PASS"
+
+
+def test_batched():
+    assert list(fleet_evaluator.batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(fleet_evaluator.batched([], 2)) == []
+
+
+def test_parse_option():
+    assert fleet_evaluator.parse_option("details=true") == ("details", True)
+    assert fleet_evaluator.parse_option("statistic=p95") == ("statistic", "p95")
+    with pytest.raises(argparse.ArgumentTypeError):
+        fleet_evaluator.parse_option("details")
+
+
+def test_main(tmp_path, capsys):
+    fleet = write_fleet(tmp_path / "fleet")
+    target = tmp_path / "target.yml"
+    target.write_text("name: health_check\nvars:\n  checks:\n    - name: all_neighbors_up\n")
+    output = tmp_path / "results.jsonl"
+    assert fleet_evaluator.main([str(fleet), "--target", str(target), "--output", str(output), "--workers", "1"]) == 1
+    assert json.loads(capsys.readouterr().err) == {"FAIL": 1, "PASS": 1, "error": 1}
+    assert len(output.read_text().splitlines()) == 3
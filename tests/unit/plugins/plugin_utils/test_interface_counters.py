@@ -0,0 +1,71 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils import interface_counters
+
+
+def interfaces(errors=0, discards=0, octets=0):
+    return {
+        "Gi0/1": {"admin": "up", "operational": "up", "counters": {
+            "in_errors": errors, "out_errors": 0, "crc": errors, "in_discards": discards, "out_discards": 0,
+            "in_octets": octets, "out_octets": 0, "bandwidth": 1000,
+        }},
+        # without counters, e.g. a subinterface
+        "Gi0/1.10": {"admin": "up", "operational": "up"},
+    }
+
+
+def test_build_sample_keeps_only_error_and_discard_columns():
+    sample = interface_counters.build_sample(interfaces(), 10)
+    assert sample["names"] == ["Gi0/1"]
+    assert sorted(sample["counters"]) == sorted(interface_counters.COUNTER_KEYS)
+    assert len(sample["bandwidth"]) == 0
+    sample = interface_counters.build_sample(interfaces(), 10, utilization=True)
+    assert "in_octets" in sample["counters"] and sample["bandwidth"].tolist() == [1000.0]
+
+
+def test_sample_survives_json():
+    sample = interface_counters.dump_sample(interface_counters.build_sample(interfaces(errors=3), 10))
+    loaded = interface_counters.load_sample(sample)
+    assert loaded["counters"]["in_errors"].tolist() == [3.0]
+    assert "in_octets" not in loaded["counters"]
+    assert interface_counters.load_sample({"names": []}) is None
+    assert interface_counters.load_sample(None) is None
+
+
+def test_compute_rates_flags_errors():
+    previous = interface_counters.build_sample(interfaces(), 0)
+    current = interface_counters.build_sample(interfaces(errors=100, discards=10), 10)
+    summary, flagged = interface_counters.compute_rates(previous, current, 1.0, 10.0)
+    assert summary == {"interval": 10.0, "total": 1, "evaluated": 1, "skipped": 0, "flagged": 1}
+    assert flagged == {"Gi0/1": {"error_rate": 10.0, "crc_rate": 10.0, "discard_rate": 1.0}}
+
+
+def test_compute_rates_utilization_needs_byte_counters_in_both_samples():
+    previous = interface_counters.build_sample(interfaces(), 0, utilization=True)
+    # 1 Mbit/s on a 1 Mbit/s interface
+    current = interface_counters.build_sample(interfaces(octets=1250000), 10, utilization=True)
+    _summary, flagged = interface_counters.compute_rates(previous, current, 1.0, 10.0, max_utilization=90)
+    assert flagged["Gi0/1"]["utilization"] == 100.0
+    # an older sample without the byte counters only gives error and discard rates
+    previous = interface_counters.build_sample(interfaces(), 0)
+    _summary, flagged = interface_counters.compute_rates(previous, current, 1.0, 10.0, max_utilization=90)
+    assert flagged == {}
+
+
+def test_compute_rates_skips_wrapped_or_cleared_counters():
+    previous = interface_counters.build_sample(interfaces(errors=2 ** 32 - 1), 0)
+    current = interface_counters.build_sample(interfaces(errors=5), 10)
+    summary, flagged = interface_counters.compute_rates(previous, current, 1.0, 10.0)
+    assert summary["skipped"] == 1 and summary["evaluated"] == 0
+    assert flagged == {}
+
+
+def test_compute_rates_new_interface_and_no_interval():
+    previous = interface_counters.build_sample({}, 0)
+    current = interface_counters.build_sample(interfaces(errors=100), 10)
+    summary, _flagged = interface_counters.compute_rates(previous, current, 1.0, 10.0)
+    assert summary["skipped"] == 1
+    summary, flagged = interface_counters.compute_rates(current, current, 1.0, 10.0)
+    assert summary["interval"] == 0 and summary["skipped"] == 1 and flagged == {}
@@ -0,0 +1,95 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.network.healthchecks.plugins.filter.openmetrics import openmetrics
+from ansible_collections.network.healthchecks.plugins.plugin_utils import openmetrics as metrics
+
+
+CPU = {
+    "result": "WARNING",
+    "cpu_utilization": {"status": "WARNING", "1_min_avg": 70, "5_min_avg": 65.5},
+    "collection": {"status": "OK", "elapsed": 0.3, "phases": {"collect": 0.2}},
+}
+BGP = {
+    "result": "FAIL",
+    "all_neighbors_up": {"status": "FAIL", "up": 3, "down": 1, "total": 4},
+    "min_neighbors_up": {"status": "PASS", "up": 3, "down": 1, "total": 4},
+}
+
+
+def test_status_codes():
+    assert metrics.STATUS_CODES["PASS"] == 0
+    assert metrics.STATUS_CODES["FAIL"] == 5
+
+
+def test_sample_escapes_labels():
+    assert metrics.sample("m", [("host", 'a"b\\c\n')], 1.0) == 'm{host="a\\"b\\\\c\\n"} 1'
+    assert metrics.sample("m", [], 0.25) == "m 0.25"
+
+
+def test_histogram_is_cumulative():
+    histogram = metrics.Histogram()
+    for value in (0.002, 0.3, 1000):
+        histogram.observe(value)
+    samples = list(histogram.samples("h", [("role", "cpu")]))
+    assert 'h_bucket{role="cpu",le="0.005"} 1' in samples
+    assert 'h_bucket{role="cpu",le="0.5"} 2' in samples
+    assert 'h_bucket{role="cpu",le="300"} 2' in samples
+    assert 'h_bucket{role="cpu",le="+Inf"} 3' in samples
+    assert 'h_count{role="cpu"} 3' in samples
+
+
+def test_host_samples_count_the_neighbors_once():
+    found = metrics.host_samples("r1", "bgp", BGP)
+    neighbors = [(labels[-1], value) for family, labels, value in found if family == "healthchecks_neighbors"]
+    assert neighbors == [(("state", "up"), 3), (("state", "down"), 1)]
+    assert ("healthchecks_result", [("host", "r1"), ("role", "bgp")], 5) in found
+
+
+def test_render():
+    text = metrics.render({"r1": {"cpu": CPU, "bgp": BGP}, "r2": {"cpu": {"result": "PASS"}, "bad": None}},
+                          {"r1": "cisco.ios.ios"}, now=1000)
+    lines = text.splitlines()
+    assert lines[-1] == "# EOF"
+    assert '# TYPE healthchecks_result gauge' in lines
+    assert 'healthchecks_cpu_utilization_percent{host="r1",role="cpu",window="5m"} 65.5' in lines
+    assert 'healthchecks_hosts{role="cpu",result="PASS"} 1' in lines
+    assert 'healthchecks_collection_seconds_count{role="cpu",platform="ios"} 1' in lines
+    assert 'healthchecks_phase_seconds_sum{role="cpu",platform="ios",phase="collect"} 0.2' in lines
+    assert "# UNIT healthchecks_collection_seconds seconds" in lines
+    assert "healthchecks_generated_timestamp_seconds 1000" in lines
+
+
+def test_render_keeps_the_worst_hosts_within_the_series_limit():
+    results = dict(("ok%d" % index, {"cpu": {"result": "PASS"}}) for index in range(5))
+    results["bad"] = {"bgp": BGP}
+    text = metrics.render(results, max_series=5)
+    assert 'healthchecks_result{host="bad",role="bgp"} 5' in text
+    assert "healthchecks_hosts_omitted 5" in text
+
+
+def test_render_of_an_empty_fleet():
+    lines = metrics.render({}, now=0).splitlines()
+    assert "healthchecks_hosts_omitted 0" in lines
+    assert "# TYPE healthchecks_result gauge" not in lines
+    assert lines[-1] == "# EOF"
+
+
+def test_from_records_and_write_textfile(tmp_path):
+    results, platforms = metrics.from_records([
+        {"host": "r1", "role": "cpu", "platform": "cisco.nxos.nxos", "result": {"result": "FAIL"}},
+        {"host": "r1", "role": "cpu", "result": {"result": "PASS"}},
+        {"host": "r2", "result": "not a result"},
+    ])
+    assert results == {"r1": {"cpu": {"result": "PASS"}}}
+    assert platforms == {"r1": "cisco.nxos.nxos"}
+    path = tmp_path / "healthchecks.prom"
+    metrics.write_textfile(str(path), "# EOF\n")
+    assert path.read_text() == "# EOF\n"
+    assert [entry.name for entry in tmp_path.iterdir()] == ["healthchecks.prom"]
+
+
+def test_openmetrics_filter():
+    hostvars = {"r1": {"healthchecks_results": {"cpu": CPU}, "ansible_network_os": "arista.eos.eos"}}
+    assert 'platform="eos"' in openmetrics(["r1", "r2"], hostvars)
@@ -0,0 +1,222 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import glob
+import os
+
+import jinja2
+import pytest
+import yaml
+
+
+pytest.importorskip("ansible_collections.ansible.netcommon")
+
+from ansible_collections.network.healthchecks.plugins.filter.health_check_view import health_check_view
+from ansible_collections.network.healthchecks.plugins.plugin_utils import bundle, replay
+
+
+CAPTURES = os.path.join(os.path.dirname(__file__), "fixtures", "ios_captures.txt")
+TARGET = {"name": "health_check", "vars": {"checks": [{"name": "all_neighbors_up"}]}}
+
+
+def test_template_name():
+    assert replay.template_name("ios", "show ip bgp summary") == "ios_show_ip_bgp_summary"
+    assert replay.template_name("nxos", "dir bootflash:") == "nxos_dir_bootflash"
+    # the template of the loop over the filesystems of the role
+    assert os.path.basename(replay.find_template("nxos", "dir bootflash:")) == "nxos_dir_filesystem.yaml"
+
+
+def test_iter_archive_splits_records():
+    records = list(replay.iter_archive(CAPTURES))
+    assert [(host, network_os, command) for host, network_os, command, _text in records] == [
+        ("r1", "ios", "show ip bgp summary"),
+        ("r2", "ios", "show ip bgp summary"),
+        ("r2", "ios", "show unknown thing"),
+    ]
+    assert records[0][3].startswith("BGP router identifier 192.0.2.254")
+
+
+def test_replay_parses_capture():
+    records = list(replay.replay(replay.iter_archive(CAPTURES)))
+    parsed = records[0]["parsed"]
+    assert "error" not in records[0]
+    assert parsed["router_id"] == "192.0.2.254"
+    assert [neighbor["peer"] for neighbor in parsed["neighbors"]] == ["192.0.2.1", "192.0.2.2"]
+    assert parsed["neighbors"][0]["prefixes_received"] == 12
+    assert "prefixes_received" not in parsed["neighbors"][1]
+    assert records[2]["error"] == "No template found for ios_show_unknown_thing"
+
+
+def test_replay_grades_capture():
+    records = list(replay.replay(replay.iter_archive(CAPTURES), health_filter=health_check_view, target=TARGET))
+    assert records[0]["result"]["all_neighbors_up"] == {"up": 1, "down": 1, "total": 2, "status": "FAIL"}
+    assert records[1]["result"]["result"] == "PASS"
+
+
+def test_main_writes_jsonl(tmp_path):
+    output = tmp_path / "replay.jsonl"
+    # the capture without a template is an error
+    assert replay.main([CAPTURES, "--output", str(output)]) == 1
+    assert len(output.read_text().splitlines()) == 3
+
+
+IOS_VRF_SUMMARY = """For address family: IPv4 Unicast
+BGP router identifier 192.0.2.254, local AS number 65000
+
+Neighbor        V           AS MsgRcvd MsgSent   TblVer  InQ OutQ Up/Down  State/PfxRcd
+192.0.2.1       4        65001     120     118       12    0    0 1d02h         12
+
+For address family: IPv4 Unicast VRF red
+Neighbor        V           AS MsgRcvd MsgSent   TblVer  InQ OutQ Up/Down  State/PfxRcd
+172.16.0.1      4        65100     120     118       12    0    0 1d02h   Idle
+"""
+
+
+def test_ios_vrf_summary_reads_the_vrf_from_the_section_header():
+    parsed = replay.parse_capture(replay.find_template("ios", "show bgp vrf all all summary"), IOS_VRF_SUMMARY)
+    assert [(neighbor["vrf"], neighbor["afi"], neighbor["peer"]) for neighbor in parsed["neighbors"]] == [
+        ("default", "IPv4 Unicast", "192.0.2.1"),
+        ("red", "IPv4 Unicast", "172.16.0.1"),
+    ]
+    result = health_check_view(parsed, {"name": "health_check", "vars": {"per_vrf": True, "checks": [{"name": "all_neighbors_up"}]}})
+    assert result["vrfs"]["default"]["ipv4 unicast"]["result"] == "PASS"
+    assert result["vrfs"]["red"]["ipv4 unicast"]["result"] == "FAIL"
+
+
+EOS_TOP = """top - 10:00:00 up 17 days,  4:05,  0 users,  load average: 0.31, 0.28, 0.25
+%Cpu(s):  4.1 us,  1.0 sy,  0.0 ni, 94.9 id,  0.0 wa,  0.0 hi,  0.0 si,  0.0 st
+KiB Mem:   8011832 total,  5514212 used,  2497620 free,   251396 buffers
+
+  PID USER      PR  NI    VIRT    RES    SHR S  %CPU %MEM     TIME+ COMMAND
+ 2290 root      20   0  606856 189604 123456 S   6.2  2.4  85:02.13 Sysdb
+ 3001 root      rt   0 1.234g  51200  40960 R  12.5  0.6   1:00.00 Bgp-main
+"""
+
+
+def test_eos_top_processes_parsed_only_by_the_processes_template():
+    assert "processes" not in replay.parse_capture(replay.find_template("eos", "show processes top once"), EOS_TOP)
+    parsed = replay.parse_capture(replay.find_template("eos", "show processes top once processes"), EOS_TOP)
+    assert parsed["cpu_util"]["busy"] == 5.1
+    assert [(process["pid"], process["process"], process["cpu_percent"]) for process in parsed["processes"]] == [
+        (2290, "Sysdb", 6.2),
+        (3001, "Bgp-main", 12.5),
+    ]
+    result = health_check_view(parsed, [{"name": "cpu_top_processes", "count": 1}])
+    assert result["cpu_top_processes"]["processes"] == [{"pid": 3001, "process": "Bgp-main", "usage": 12.5}]
+
+
+EOS_SUMMARY = """BGP summary information for VRF default
+Router identifier 192.0.2.254, local AS number 65000
+Neighbor Status Codes: m - Under maintenance
+  Neighbor         V  AS           MsgRcvd   MsgSent  InQ OutQ  Up/Down State   PfxRcd PfxAcc
+  192.0.2.1        4  65001            120       118    0    0 1d02h Estab   12     12
+  192.0.2.2        4  65002            120       118    0    0 1d02h Estab   0      0
+  192.0.2.3        4  65003              7         9    0    0 00:01:02 Active
+"""
+
+
+def parse_content_template(path, text):
+    """Parse the way the content_templates cli_parse parser does"""
+    from ansible_collections.ansible.netcommon.plugins.module_utils.cli_parser.cli_parsertemplate import (
+        CliParserTemplate,
+    )
+
+    parser = CliParserTemplate(lines=text.splitlines())
+    with open(path) as handle:
+        parser.PARSERS = list(eval(handle.read()))
+    return parser.parse()
+
+
+def test_eos_summary_state_and_prefix_count_columns():
+    expected = [("192.0.2.1", "Estab", 12), ("192.0.2.2", "Estab", 0), ("192.0.2.3", "Active", None)]
+    parsed = parse_content_template(replay.find_template("eos", "show ip bgp summary"), EOS_SUMMARY)
+    assert parsed["router_id"] == "192.0.2.254"
+    assert [(n["peer"], n["peer_state"], n.get("prefixes_received")) for n in parsed["neighbors"]] == expected
+    for command in ("show ip bgp summary vrf all", "show ipv6 bgp summary vrf all"):
+        vrfs = replay.parse_capture(replay.find_template("eos", command), EOS_SUMMARY)
+        assert [(n["peer"], n["peer_state"], n.get("prefixes_received")) for n in vrfs["neighbors"]] == expected
+    result = health_check_view(parsed, {"name": "health_check", "vars": {"checks": [
+        {"name": "min_prefixes_received", "min_count": 1},
+    ]}})
+    minimum = result["min_prefixes_received"]
+    assert (minimum["status"], minimum["checked"], minimum["violations"]) == ("FAIL", 2, 1)
+
+
+def content_templates():
+    """Templates of the role tasks parsing with content_templates, as `(os, command, path)`"""
+    def walk(tasks):
+        for task in tasks or []:
+            for key in ("block", "rescue", "always"):
+                for module in walk(task.get(key)):
+                    yield module
+            if "ansible.utils.cli_parse" in task:
+                yield task["ansible.utils.cli_parse"]
+
+    found = []
+    for tasks in sorted(glob.glob(os.path.join(replay.ROLES_DIR, "*", "tasks", "*.y*ml"))):
+        platform = os.path.splitext(os.path.basename(tasks))[0]
+        if platform not in bundle.PLATFORMS:
+            continue
+        with open(tasks) as handle:
+            modules = list(walk(yaml.safe_load(handle)))
+        for module in modules:
+            path = replay.find_template(platform, module["command"])
+            if module["parser"]["name"] == "ansible.netcommon.content_templates" and path:
+                found.append((platform, module["command"], path))
+    return found
+
+
+SIMULATOR_OUTPUTS = os.path.join(os.path.dirname(__file__), "..", "..", "..", "simulator", "outputs")
+
+
+@pytest.mark.parametrize("platform, command, path", content_templates(), ids=lambda value: os.path.basename(value))
+def test_content_templates_parse(platform, command, path):
+    """Every content_templates template evaluates as Python and parses the simulator output"""
+    outputs = os.path.join(SIMULATOR_OUTPUTS, "%s.yaml" % platform)
+    text = ""
+    if os.path.exists(outputs):
+        with open(outputs) as handle:
+            text = yaml.safe_load(handle).get(command) or ""
+    env = jinja2.Environment(trim_blocks=True, lstrip_blocks=True)
+    parsed = parse_content_template(path, env.from_string(text).render(hostname="r1", index=1, scale=2))
+    assert isinstance(parsed, dict)
+
+
+@pytest.mark.parametrize("platform, command, text, minutes", [
+    ("ios", "show version | include Uptime", "Uptime for this control processor is 3 days, 4 hours, 5 minutes", 4565),
+    ("ios", "show version | include Uptime", "Uptime for this control processor is 1 year, 2 weeks, 3 days, 4 hours, 5 minutes",
+     525600 + 20160 + 4565),
+    ("eos", "show version", "System uptime is 4 hours and 5 minutes", 245),
+    ("iosxr", "show version", "System uptime is 4 hours 5 minutes", 245),
+])
+def test_uptime_of_every_length(platform, command, text, minutes):
+    parsed = replay.parse_capture(replay.find_template(platform, command), text + "\n")
+    result = health_check_view(parsed, {"name": "health_check", "vars": {"checks": [{"name": "uptime"}]}})
+    assert result["uptime"]["current_uptime"] == minutes
+
+
+@pytest.mark.parametrize("platform, command, text", [
+    ("eos", "show ipv6 ospf interface", """Ethernet1 is up, line protocol is up
+  Interface Address fe80::5054:ff:fe00:1%Et1, Area 0.0.0.0, VRF default
+Ethernet2 is up, line protocol is up
+  Interface Address fe80::5054:ff:fe00:2%Et2, Area 0.0.0.1, VRF default
+"""),
+    ("vyos", "show ip ospf interface", """eth1 is up
+  ifindex 3, MTU 1500 bytes, BW 1000 Mbit <UP,BROADCAST,RUNNING,MULTICAST>
+  Internet Address 10.0.12.1/24, Broadcast 10.0.12.255, Area 0.0.0.0
+eth2 is up
+  Internet Address 10.0.13.1/30, Area 0.0.0.1
+lo is up
+  OSPF not enabled on this interface
+"""),
+    ("vyos", "show ipv6 ospfv3 interface", """eth1 is up, type BROADCAST
+  Interface ID: 3
+  Area ID 0.0.0.0, Cost 10
+eth2 is up, type BROADCAST
+  Area ID 0.0.0.1, Cost 10
+"""),
+])
+def test_ospf_interface_areas_of_the_interface_blocks(platform, command, text):
+    parsed = replay.parse_capture(replay.find_template(platform, command), text)
+    assert [interface["area"] for interface in parsed["interfaces"]] == ["0.0.0.0", "0.0.0.1"]
@@ -0,0 +1,97 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+
+import pytest
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils import sampling
+
+
+class Group(object):
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+
+
+STRATA = {
+    "ios/core": ["core%d" % index for index in range(10)],
+    "nxos/leaf": ["leaf%d" % index for index in range(400)],
+}
+
+
+def test_stratum_of():
+    groups = [Group("all", 0), Group("dc1", 1), Group("leaf", 2)]
+    assert sampling.stratum_of({"ansible_network_os": "cisco.nxos.nxos"}, groups) == "nxos/leaf"
+    assert sampling.stratum_of({}, [Group("all", 0)]) == "unknown/unknown"
+
+
+def test_sample_size():
+    assert sampling.sample_size(10000, 0.1, 0.95) == 96
+    # the finite population correction
+    assert sampling.sample_size(100, 0.1, 0.95) == 50
+    assert sampling.sample_size(1, 0.1, 0.95, minimum=2) == 1
+    assert sampling.sample_size(0, 0.1, 0.95) == 0
+    with pytest.raises(ValueError):
+        sampling.z_score(0.5)
+
+
+def test_sample_is_reproducible_and_bounded():
+    sampled = sampling.sample(STRATA, "42")
+    assert sampled == sampling.sample(STRATA, "42")
+    assert sampled != sampling.sample(STRATA, "43")
+    assert set(sampled["nxos/leaf"]) <= set(STRATA["nxos/leaf"])
+    # the sample of a stratum does not depend on the others
+    assert sampling.sample({"nxos/leaf": STRATA["nxos/leaf"]}, "42")["nxos/leaf"] == sampled["nxos/leaf"]
+    capped = sampling.sample(STRATA, "42", max_hosts=20)
+    assert sum(len(hosts) for hosts in capped.values()) <= 20
+    assert len(capped["ios/core"]) >= 2
+
+
+def test_wilson():
+    assert sampling.wilson(0, 0, 10, 1.96) == (0.0, 1.0)
+    assert sampling.wilson(2, 10, 10, 1.96) == (0.2, 0.2)
+    low, high = sampling.wilson(2, 10, 1000, 1.96)
+    assert low < 0.2 < high
+
+
+def test_estimate_and_escalate():
+    plan = {"seed": "1", "confidence": 0.95, "strata": {
+        "ios/core": {"hosts": ["c1", "c2", "c3", "c4"], "sampled": ["c1", "c2"]},
+        "nxos/leaf": {"hosts": ["l1", "l2", "l3"], "sampled": ["l1", "l2"]},
+    }}
+    records = [
+        {"host": "c1", "role": "cpu", "result": {"result": "FAIL"}},
+        {"host": "c2", "role": "cpu", "result": {"result": "PASS"}},
+        {"host": "l1", "role": "cpu", "result": {"result": "PASS"}},
+        {"host": "x9", "role": "cpu", "result": {"result": "FAIL"}},
+    ]
+    report, remaining = sampling.estimate(plan, records)
+    assert report["strata"]["ios/core"]["rate"] == 0.5
+    assert report["strata"]["nxos/leaf"]["rate"] == 0.0
+    assert report["escalate"] == ["ios/core"]
+    assert remaining == ["c3", "c4"]
+    assert report["missing"] == ["l2"]
+    assert report["fleet"]["all"]["failed"] == 1
+    assert report["fleet"]["all"]["low"] <= report["fleet"]["all"]["rate"] <= report["fleet"]["all"]["high"]
+    assert sorted(report["fleet"]) == ["all", "cpu"]
+
+
+def test_estimate_without_results():
+    plan = {"seed": "1", "confidence": 0.95, "strata": {"ios/core": {"hosts": ["c1"], "sampled": ["c1"]}}}
+    report, remaining = sampling.estimate(plan, [])
+    assert report["strata"]["ios/core"]["rate"] is None
+    assert report["fleet"]["all"] == {"rate": 0.0, "low": 0.0, "high": 1.0, "reported": 0, "failed": 0}
+    assert remaining == []
+    assert sampling.stratified({}, 1.96) is None
+
+
+def test_main_estimate(tmp_path):
+    plan = {"seed": "1", "confidence": 0.95, "strata": {"ios/core": {"hosts": ["c1", "c2"], "sampled": ["c1"]}}}
+    (tmp_path / "plan.json").write_text(json.dumps(plan))
+    (tmp_path / "results.jsonl").write_text('{"host": "c1", "role": "cpu", "result": {"result": "FAIL"}}\n')
+    escalate = tmp_path / "escalate.txt"
+    assert sampling.main(["estimate", str(tmp_path / "results.jsonl"), "--plan", str(tmp_path / "plan.json"),
+                          "--escalate", str(escalate), "--report", str(tmp_path / "report.json")]) == 1
+    assert escalate.read_text() == "c2\n"
@@ -0,0 +1,42 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleFilterError
+
+from ansible_collections.network.healthchecks.plugins.filter.collection_due import collection_due
+from ansible_collections.network.healthchecks.plugins.plugin_utils.schedule import cached_result, is_due
+
+
+STATE = {"ran_at": 1000.0, "health_checks": {"result": "PASS"}}
+
+
+def test_is_due():
+    assert is_due(STATE, "5m", now=1000 + 300) is True
+    # a run a little early still collects
+    assert is_due(STATE, "5m", now=1000 + 280) is True
+    assert is_due(STATE, 300, now=1000 + 200) is False
+    assert is_due(STATE, 0, now=1000) is True
+    assert is_due(None, "5m", now=1000) is True
+    assert is_due({"ran_at": 1000.0}, "5m", now=1000) is True
+
+
+def test_cached_result_age():
+    result = cached_result(STATE, {"status": "CACHED"}, now=1060)
+    assert result == {"result": "PASS", "collection": {"status": "CACHED", "ran_at": 1000.0, "age": 60}}
+    assert "collection" not in STATE["health_checks"]
+
+
+def test_collection_due_filter():
+    assert collection_due(STATE, "1h", now=2000) is False
+    assert collection_due(STATE, "", now=2000) is True
+    # intervals from extra vars and INI inventories arrive as strings
+    assert collection_due(STATE, "0", now=1000) is True
+    assert collection_due(STATE, "300", now=1200) is False
+    assert collection_due(STATE, "300", now=1300) is True
+    with pytest.raises(AnsibleFilterError, match="Invalid polling interval"):
+        collection_due(STATE, "soon")
+    with pytest.raises(AnsibleFilterError):
+        collection_due(STATE)
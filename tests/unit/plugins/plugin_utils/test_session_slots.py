@@ -0,0 +1,41 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import time
+
+import pytest
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils import session_slots
+
+
+def test_acquire_up_to_the_limit(tmp_path):
+    slot_dir = str(tmp_path)
+    assert session_slots.acquire(slot_dir, "site a", "r1", 2)[1] == 1
+    assert session_slots.acquire(slot_dir, "site a", "r2", 2)[1] == 2
+    # an owner holding a slot keeps it
+    assert session_slots.acquire(slot_dir, "site a", "r1", 2, timeout=0)[1] == 2
+    with pytest.raises(session_slots.SlotTimeout):
+        session_slots.acquire(slot_dir, "site a", "r3", 2, timeout=0)
+    # another site has its own slots
+    assert session_slots.acquire(slot_dir, "site b", "r3", 2)[1] == 1
+    assert sorted(os.listdir(os.path.join(slot_dir, "site_a"))) == [".lock", "r1", "r2"]
+
+
+def test_release_frees_a_slot(tmp_path):
+    slot_dir = str(tmp_path)
+    session_slots.acquire(slot_dir, "a", "r1", 1)
+    assert session_slots.release(slot_dir, "a", "r1") is True
+    assert session_slots.release(slot_dir, "a", "r1") is False
+    assert session_slots.acquire(slot_dir, "a", "r2", 1, timeout=0)[1] == 1
+
+
+def test_expired_lease_is_removed(tmp_path):
+    slot_dir = str(tmp_path)
+    session_slots.acquire(slot_dir, "a", "killed", 1)
+    lease_path = os.path.join(slot_dir, "a", "killed")
+    stale = time.time() - 1000
+    os.utime(lease_path, (stale, stale))
+    assert session_slots.acquire(slot_dir, "a", "r1", 1, timeout=0, lease=900)[1] == 1
+    assert not os.path.exists(lease_path)
@@ -0,0 +1,80 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import io
+import json
+
+import pytest
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils import sharding
+
+
+HOSTS = ["r%d" % index for index in range(200)]
+
+
+def test_split_covers_every_host_once():
+    assigned = sharding.split(HOSTS, 4)
+    assert sorted(host for hosts in assigned.values() for host in hosts) == sorted(HOSTS)
+    assert all(hosts for hosts in assigned.values())
+    # every controller computes the same split
+    assert sharding.split(HOSTS, 4) == assigned
+
+
+def test_adding_a_shard_moves_few_hosts():
+    before = dict((host, shard) for shard, hosts in sharding.split(HOSTS, 4).items() for host in hosts)
+    after = dict((host, shard) for shard, hosts in sharding.split(HOSTS, 5).items() for host in hosts)
+    moved = [host for host in HOSTS if before[host] != after[host]]
+    assert all(after[host] == 4 for host in moved)
+    assert len(moved) < len(HOSTS) / 2
+
+
+def test_split_by_site_and_empty_shards():
+    sites = dict((host, "site-%d" % (index % 2)) for index, host in enumerate(HOSTS))
+    assigned = sharding.split(HOSTS, 8, sites)
+    shards = set(shard for shard, hosts in assigned.items() for host in hosts if sites[host] == "site-0")
+    assert len(shards) == 1
+    # two sites leave most of the eight shards empty
+    assert len([hosts for hosts in assigned.values() if not hosts]) >= 6
+    assert sharding.split([], 3) == {0: [], 1: [], 2: []}
+    with pytest.raises(ValueError):
+        sharding.HashRing(0)
+
+
+def test_write_shards_writes_the_empty_shards(tmp_path):
+    sharding.write_shards({0: ["r1", "r2"], 1: []}, str(tmp_path / "shards"))
+    assert (tmp_path / "shards" / "shard-0.txt").read_text() == "r1\nr2\n"
+    assert (tmp_path / "shards" / "shard-1.txt").read_text() == ""
+
+
+def test_merge_rolls_up_the_worst_result():
+    records = [
+        {"host": "r1", "role": "cpu", "result": {"result": "PASS"}},
+        {"host": "r1", "role": "bgp", "result": {"result": "FAIL"}},
+        {"host": "r2", "role": "cpu", "result": {"result": "PARTIAL", "collection": {"elapsed": 3.0}}},
+        {"host": "r2", "role": "cpu", "result": {"result": "WARNING", "collection": {"elapsed": 2.0}}},
+        {"host": "r3", "role": "cpu", "result": "oops"},
+    ]
+    output = io.StringIO()
+    report = sharding.merge(records, output)
+    assert report["hosts"] == 3
+    assert report["results"] == {"FAIL": 1, "WARNING": 1, "unknown": 1}
+    assert report["roles"] == {"cpu": {"PASS": 1, "WARNING": 1, "unknown": 1}, "bgp": {"FAIL": 1}}
+    assert report["failed"] == ["r1"]
+    assert report["duplicates"] == ["r2/cpu"]
+    assert report["collection"]["hosts"] == 1
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [(line["host"], line["role"]) for line in lines] == [("r1", "bgp"), ("r1", "cpu"), ("r2", "cpu"), ("r3", "cpu")]
+
+
+def test_merge_of_no_records():
+    report = sharding.merge([])
+    assert (report["hosts"], report["results"], report["failed"], report["duplicates"]) == (0, {}, [], [])
+
+
+def test_main_merge(tmp_path):
+    (tmp_path / "a.jsonl").write_text('{"host": "r1", "role": "cpu", "result": {"result": "PASS"}}\n\n')
+    (tmp_path / "b.json").write_text('{"host": "r2", "role": "cpu", "result": {"result": "FAIL"}}')
+    report = tmp_path / "report.json"
+    assert sharding.main(["merge", str(tmp_path), "--report", str(report)]) == 0
+    assert json.loads(report.read_text())["failed"] == ["r2"]
@@ -0,0 +1,81 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import sys
+
+import pytest
+
+
+pytest.importorskip("ansible_collections.ansible.netcommon")
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.bundle import ROOT
+from ansible_collections.network.healthchecks.plugins.plugin_utils.replay import find_template
+
+
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+import monitor  # noqa: E402
+
+
+def test_connect_options_check_host_keys_by_default():
+    options = monitor.connect_options({"host": "r1", "username": "admin"})
+    assert options["known_hosts"] == os.path.expanduser("~/.ssh/known_hosts")
+    assert options["port"] == 22
+    assert "password" not in options
+
+
+def test_connect_options_known_hosts_and_password():
+    options = monitor.connect_options({"host": "r1", "known_hosts": "/etc/ssh/known_hosts", "password": "secret"})
+    assert options["known_hosts"] == "/etc/ssh/known_hosts"
+    assert options["password"] == "secret" and options["client_keys"] is None
+
+
+def test_connect_options_opt_out():
+    assert monitor.connect_options({"host": "r1", "host_key_checking": False})["known_hosts"] is None
+    assert monitor.connect_options({"host": "r1", "host_key_checking": "no"})["known_hosts"] is None
+    # a typo does not turn checking off
+    with pytest.raises(TypeError):
+        monitor.connect_options({"host": "r1", "host_key_checking": "flase"})
+
+
+def test_load_config_merges_defaults(tmp_path):
+    path = tmp_path / "monitor.yml"
+    path.write_text(
+        "known_hosts: /etc/ssh/known_hosts\n"
+        "defaults: {os: ios, username: admin}\n"
+        "devices:\n"
+        "  - {name: r1, host: 192.0.2.1}\n"
+        "  - {name: r2, host: 192.0.2.2, os: nxos, known_hosts: /tmp/r2}\n"
+    )
+    config = monitor.load_config(str(path))
+    assert config["devices"][0] == {"name": "r1", "host": "192.0.2.1", "os": "ios", "username": "admin",
+                                    "known_hosts": "/etc/ssh/known_hosts"}
+    assert config["devices"][1]["known_hosts"] == "/tmp/r2"
+    assert config["devices"][1]["os"] == "nxos"
+
+
+def test_load_config_without_devices(tmp_path):
+    path = tmp_path / "monitor.yml"
+    path.write_text("")
+    assert monitor.load_config(str(path))["devices"] == []
+
+
+def test_every_check_command_has_a_template():
+    for name, check in monitor.CHECKS.items():
+        for network_os, command in check["commands"].items():
+            assert find_template(network_os, command), (name, network_os, command)
+
+
+def test_checks_intervals():
+    checks = monitor.Monitor._checks({"cpu": {"interval": "1m"}, "bgp": None})
+    assert checks["cpu"]["interval"] == 60
+    assert checks["bgp"]["interval"] == 60
+    with pytest.raises(ValueError):
+        monitor.Monitor._checks({"cpu": {"interval": 0}})
+
+
+def test_role_variable():
+    assert monitor.role_variable("memory", "memory_threshold") is not None
+    with pytest.raises(KeyError):
+        monitor.role_variable("memory", "not_a_variable")
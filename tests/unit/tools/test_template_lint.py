@@ -0,0 +1,70 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import os
+import sys
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.bundle import ROOT
+
+
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+import template_lint  # noqa: E402
+
+
+def findings(pattern):
+    return template_lint.static_findings(template_lint.sre_parse.parse(pattern))
+
+
+def test_nested_quantifiers_are_errors():
+    assert findings(r"^(\S+\s*)+$") == [
+        ("error", "nested unbounded quantifiers, a quantified group containing another quantifier")
+    ]
+
+
+def test_unambiguous_nested_quantifiers_pass():
+    # every iteration starts with whitespace the previous one cannot end with
+    assert findings(r"^\S+(?:\s+\S+)*$") == []
+
+
+def test_adjacent_overlapping_quantifiers_are_warnings():
+    assert findings(r"^(?P<process>.+?)\s+(?P<pid>\d+)$") == [
+        ("warning", "adjacent unbounded quantifiers overlapping on whitespace")
+    ]
+    assert findings(r"^(?P<name>\S+)\s+(?P<pid>\d+)$") == []
+
+
+def write_template(tmp_path, getval):
+    templates = tmp_path / "role" / "templates"
+    templates.mkdir(parents=True)
+    (templates / "ios_show_x.yaml").write_text(json.dumps([{"name": "x", "getval": getval, "result": {}}]))
+    return str(tmp_path)
+
+
+def test_main_fails_only_on_errors(tmp_path, capsys):
+    assert template_lint.main([write_template(tmp_path / "warn", r"^(.+?)\s+(\d+)$")]) == 0
+    assert "warning" in capsys.readouterr().out
+    assert template_lint.main([write_template(tmp_path / "nested", r"^(\S+\s*)+$")]) == 1
+    assert "error" in capsys.readouterr().out
+
+
+def test_fuzz_timings_are_information(tmp_path, capsys):
+    # a budget no pattern meets, the slow patterns are reported without failing the run
+    path = write_template(tmp_path, r"^(?P<name>\S+)\s+(?P<pid>\d+)$")
+    assert template_lint.main(["--fuzz", "--budget", "0", "--max-size", "1", path]) == 0
+    assert ": info: " in capsys.readouterr().out
+
+
+def test_invalid_pattern_fails(tmp_path):
+    assert template_lint.main([write_template(tmp_path, "(")]) == 1
+
+
+def test_role_templates_have_no_errors():
+    results = list(template_lint.lint([os.path.join(ROOT, "roles")]))
+    assert results
+    assert [result for result in results if "error" in result] == []
+    assert [
+        (result["template"], result["name"]) for result in results
+        if any(severity == "error" for severity, _finding in result["findings"])
+    ] == []
@@ -0,0 +1,406 @@
+"""Monitor devices continuously over persistent SSH sessions.
+
+Usage, with the directory holding ansible_collections on PYTHONPATH:
+    python tools/monitor.py --config monitor.yml
+
+Every device keeps one interactive SSH session open, the way network_cli
+does, and an asyncio scheduler polls each check of the device on its own
+interval. The output is parsed with the role templates and graded with the
+health check filters, and every poll appends a `{"host", "role", "time",
+"result"}` record, the format the sharding merge reads, to a JSONL store.
+
+The configuration file is YAML:
+
+    store: /var/lib/healthchecks/monitor.jsonl
+    metrics: /var/lib/node_exporter/textfile_collector/healthchecks.prom
+    connect_concurrency: 100      # logins in progress at once
+    command_timeout: 30           # seconds, the poll is recorded as TIMEOUT past it
+    defaults: {os: ios, port: 22, username: admin, password: secret}
+    known_hosts: ~/.ssh/known_hosts   # host keys checked against it, the default
+    checks:
+      cpu: {interval: 1m}
+      bgp:
+        interval: 5m
+        target: {name: health_check, vars: {checks: [{name: all_neighbors_up}]}}
+    devices:
+      - {name: r1, host: 192.0.2.1}
+      - {name: r2, host: 192.0.2.2, os: nxos}
+
+Checks default to the command and target of their role for the os of the
+device, `command`, `target`, `filter` and `options` overriding them. The
+asyncssh package is required.
+
+Host keys are checked against `known_hosts`, set for all devices or per
+device, `~/.ssh/known_hosts` by default. Checking is only skipped when a
+device, or `defaults`, sets `host_key_checking: false`.
+
+With `metrics` the latest result of every device and check, and histograms
+of the connect, command, parse and evaluate phases of every poll, are
+written as an OpenMetrics text file every `--stats-interval` seconds.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import re
+import resource
+import signal
+import sys
+import time
+
+import yaml
+
+from ansible.module_utils.parsing.convert_bool import boolean
+
+from ansible_collections.network.healthchecks.plugins.plugin_utils.bundle import ROOT, load_yaml
+from ansible_collections.network.healthchecks.plugins.plugin_utils.deadlines import apply_deadline
+from ansible_collections.network.healthchecks.plugins.plugin_utils.duration import duration_seconds
+from ansible_collections.network.healthchecks.plugins.plugin_utils.fleet_evaluator import load_filter
+from ansible_collections.network.healthchecks.plugins.plugin_utils.openmetrics import (
+    MAX_SERIES,
+    observe,
+    render,
+    write_textfile,
+)
+from ansible_collections.network.healthchecks.plugins.plugin_utils.replay import (
+    find_template,
+    parse_capture,
+    template_name,
+)
+
+
+try:
+    import asyncssh
+
+    HAS_ASYNCSSH = True
+except ImportError:
+    HAS_ASYNCSSH = False
+
+
+def role_variable(role, name):
+    """Value of a variable of a role, from its vars then its defaults as Ansible resolves them"""
+    for layer in ("vars", "defaults"):
+        for path in sorted(glob.glob(os.path.join(ROOT, "roles", role, layer, "main.y*ml"))):
+            variables = load_yaml(path) or {}
+            if name in variables:
+                return variables[name]
+    raise KeyError("%s is not a variable of the %s role" % (name, role))
+
+
+# Command per network os and target of the checks, as the roles run them
+CHECKS = {
+    "cpu": {
+        "commands": {"ios": "show processes cpu", "iosxr": "show processes cpu", "nxos": "show processes cpu", "eos": "show processes top once"},
+        "target": [{"name": "cpu_utilization"}],
+    },
+    "memory": {
+        "commands": {"ios": "show memory summary", "iosxr": "show memory summary", "nxos": "show system resources", "eos": "show memory summary"},
+        "target": {"name": "health_check", "vars": {"checks": [
+            {"name": "memory_utilization", "threshold": role_variable("memory", "memory_threshold")},
+            {"name": "memory_status_summary"},
+        ]}},
+    },
+    "uptime": {
+        "commands": {"ios": "show version | include Uptime", "iosxr": "show version", "nxos": "show version | include uptime", "eos": "show version"},
+        "target": {"name": "health_check", "vars": {"checks": [
+            {"name": "uptime", "min_uptime": role_variable("uptime", "uptime_threshold_minutes")},
+            {"name": "uptime_status_summary"},
+        ]}},
+    },
+    "bgp": {
+        "commands": {"ios": "show ip bgp summary", "iosxr": "show bgp summary", "nxos": "show ip bgp summary", "eos": "show ip bgp summary"},
+        "target": {"name": "health_check", "vars": {"checks": [
+            {"name": "all_neighbors_up"},
+            {"name": "bgp_status_summary"},
+        ]}},
+    },
+}
+# Host keys are checked against it unless a device sets host_key_checking to false
+KNOWN_HOSTS = "~/.ssh/known_hosts"
+# Commands run once a session is open, so the output is not paged on any platform
+SESSION_SETUP = ("terminal length 0",)
+# Prompt ending the output of a command, as matched by the terminal plugins
+PROMPT_RE = re.compile(r"[\r\n]?[\w+\-.:/\[\]]+(?:\([^)]+\)){0,3}[>#] ?$")
+
+
+def connect_options(device):
+    """asyncssh.connect options of a device, its host key checked unless it opts out"""
+    options = {"port": int(device.get("port", 22)), "username": device.get("username")}
+    if boolean(device.get("host_key_checking", True)):
+        options["known_hosts"] = os.path.expanduser(device.get("known_hosts") or KNOWN_HOSTS)
+    else:
+        options["known_hosts"] = None
+    if device.get("password") is not None:
+        # password only, without trying the keys of the user first
+        options.update(password=device["password"], client_keys=None)
+    return options
+
+
+class Session(object):
+    """Interactive shell on a device, commands being run one at a time"""
+
+    def __init__(self, device, network_os, timeout):
+        self.device = device
+        self.network_os = network_os
+        self.timeout = timeout
+        self.connection = None
+        self.process = None
+        self.opened = False
+
+    async def open(self):
+        self.connection = await asyncssh.connect(self.device["host"], **connect_options(self.device))
+        self.process = await self.connection.create_process(term_type="vt100", term_size=(511, 24))
+        await self._read_prompt()
+        for command in SESSION_SETUP:
+            await self.run(command)
+        self.opened = True
+
+    async def _read_prompt(self):
+        output = ""
+        while True:
+            chunk = await asyncio.wait_for(self.process.stdout.read(65536), self.timeout or None)
+            if not chunk:
+                raise ConnectionError("Session closed by %s" % self.device["host"])
+            output += chunk
+            last_line = output.rsplit("\n", 1)[-1]
+            if PROMPT_RE.search(last_line):
+                return output
+
+    async def run(self, command):
+        """Output of a command without its echo and the prompt that follows"""
+        self.process.stdin.write(command + "\n")
+        output = (await self._read_prompt()).replace("\r", "")
+        lines = output.split("\n")
+        return "\n".join(lines[1:-1])
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+        self.connection = self.process = None
+
+
+class Monitor(object):
+    def __init__(self, config, store):
+        self.config = config
+        self.store = store
+        self.timeout = float(config.get("command_timeout", 30))
+        self.connect_slots = asyncio.Semaphore(int(config.get("connect_concurrency", 100)))
+        self.checks = self._checks(config.get("checks") or dict((name, {}) for name in CHECKS))
+        self.stats = {"polls": 0, "errors": 0, "timeouts": 0, "sessions": 0}
+        self.filters = {}
+        self.stopping = False
+        # latest result per device and check, and the phase histograms of every poll, for the metrics
+        self.latest = {}
+        self.platforms = {}
+        self.histograms = ({}, {})
+
+    @staticmethod
+    def _checks(configured):
+        checks = {}
+        for name, settings in configured.items():
+            check = dict(CHECKS.get(name, {}), **(settings or {}))
+            check["interval"] = duration_seconds(check.get("interval", 60))
+            if not check["interval"]:
+                raise ValueError("Invalid interval for check %s" % name)
+            checks[name] = check
+        return checks
+
+    def _filter(self, name):
+        if name not in self.filters:
+            self.filters[name] = load_filter(name)
+        return self.filters[name]
+
+    def evaluate(self, name, check, network_os, output, started, phases):
+        """Parse and grade the output of a check, returning its health check result"""
+        command = check.get("command") or check["commands"][network_os]
+        template = check.get("template") or find_template(network_os, command)
+        if not template:
+            raise ValueError("No template found for %s" % template_name(network_os, command))
+        parse_started = time.time()
+        facts = parse_capture(template, output)
+        evaluate_started = time.time()
+        health_filter = self._filter(check.get("filter", "health_check_view"))
+        result = health_filter(facts, check.get("target"), **(check.get("options") or {}))
+        finished = time.time()
+        phases.update(parse=evaluate_started - parse_started, evaluate=finished - evaluate_started)
+        return apply_deadline(result, "OK", started, self.timeout, finished_at=finished, phases=phases)
+
+    def write(self, host, name, result=None, error=None):
+        record = {"host": host, "role": name, "time": round(time.time(), 3)}
+        if error is not None:
+            record["error"] = error
+        else:
+            record["result"] = result
+            self.latest.setdefault(host, {})[name] = result
+            observe(self.histograms, name, self.platforms.get(host, "unknown"), result)
+        self.store.write(json.dumps(record, sort_keys=True, default=str) + "\n")
+
+    async def poll_device(self, device):
+        host = device.get("name") or device["host"]
+        network_os = device.get("os", "ios")
+        self.platforms[host] = network_os
+        session = None
+        loop = asyncio.get_running_loop()
+        due = {}
+        for name, check in self.checks.items():
+            command = check.get("command") or check.get("commands", {}).get(network_os)
+            if not command or not (check.get("template") or find_template(network_os, command)):
+                # reported once, the check is not polled on this device
+                self.stats["errors"] += 1
+                self.write(host, name, error="No command or template for check %s on %s" % (name, network_os))
+                continue
+            # first polls spread over the interval so the devices do not all poll at once
+            due[name] = loop.time() + random.uniform(0, check["interval"])
+        if not due:
+            return
+        # wait_for can swallow a cancellation racing the command output
+        # (fixed in Python 3.12), the flag stops the loop in any case
+        while not self.stopping:
+            name = min(due, key=due.get)
+            await asyncio.sleep(max(0.0, due[name] - loop.time()))
+            check = self.checks[name]
+            started = time.time()
+            phases = {}
+            try:
+                if session is None:
+                    session = Session(device, network_os, self.timeout)
+                    async with self.connect_slots:
+                        await session.open()
+                    self.stats["sessions"] += 1
+                    phases["connect"] = time.time() - started
+                command = check.get("command") or check["commands"][network_os]
+                sent = time.time()
+                output = await asyncio.wait_for(session.run(command), self.timeout or None)
+                phases["command"] = time.time() - sent
+                self.write(host, name, self.evaluate(name, check, network_os, output, started, phases))
+                self.stats["polls"] += 1
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                self.write(host, name, apply_deadline({}, "TIMEOUT", started, self.timeout, task=name))
+                session = self._drop(session)
+            except asyncio.CancelledError:
+                session = self._drop(session)
+                raise
+            except Exception as exc:  # keep polling the device and the others
+                self.stats["errors"] += 1
+                self.write(host, name, error="%s: %s" % (type(exc).__name__, exc))
+                session = self._drop(session)
+            # missed polls are dropped rather than run back to back
+            now = loop.time()
+            due[name] += check["interval"]
+            if due[name] < now:
+                due[name] = now + check["interval"]
+        self._drop(session)
+
+    def write_metrics(self):
+        if self.config.get("metrics"):
+            text = render(self.latest, self.platforms, int(self.config.get("metrics_max_series", MAX_SERIES)), self.histograms)
+            write_textfile(self.config["metrics"], text)
+
+    def _drop(self, session):
+        if session is not None:
+            self.stats["sessions"] -= session.opened
+            session.close()
+        return None
+
+
+def load_config(path):
+    with open(path) as handle:
+        config = yaml.safe_load(handle) or {}
+    defaults = dict(config.get("defaults") or {})
+    if config.get("known_hosts"):
+        defaults.setdefault("known_hosts", config["known_hosts"])
+    config["devices"] = [dict(defaults, **device) for device in config.get("devices") or []]
+    return config
+
+
+async def monitor(config, store, duration=None, stats_interval=60, report=None):
+    """Poll every device until cancelled or for `duration` seconds, returning the run stats"""
+    runner = Monitor(config, store)
+    tasks = [asyncio.ensure_future(runner.poll_device(device)) for device in config["devices"]]
+    started, cpu_started = time.time(), time.process_time()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    def summary():
+        elapsed = time.time() - started
+        cpu = time.process_time() - cpu_started
+        return dict(
+            runner.stats,
+            devices=len(config["devices"]),
+            elapsed=round(elapsed, 2),
+            cpu_seconds=round(cpu, 2),
+            polls_per_second=round(runner.stats["polls"] / elapsed, 2) if elapsed else None,
+            # polls one fully busy core sustains
+            polls_per_core_second=round(runner.stats["polls"] / cpu, 2) if cpu else None,
+            max_rss_kb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        )
+
+    deadline = time.time() + duration if duration else None
+    try:
+        while not stop.is_set():
+            wait = stats_interval if deadline is None else min(stats_interval, deadline - time.time())
+            if wait <= 0:
+                break
+            try:
+                await asyncio.wait_for(stop.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+            store.flush()
+            runner.write_metrics()
+            if report is not None:
+                report.write(json.dumps(summary(), sort_keys=True) + "\n")
+                report.flush()
+    finally:
+        runner.stopping = True
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        store.flush()
+        runner.write_metrics()
+    return summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monitor devices over persistent sessions with the health check templates.")
+    parser.add_argument("--config", required=True, help="YAML configuration file")
+    parser.add_argument("--store", help="JSONL file the poll records are appended to, overrides `store`")
+    parser.add_argument("--duration", type=float, help="seconds to run for, until interrupted by default")
+    parser.add_argument("--stats-interval", type=float, default=60, help="seconds between stats lines on standard error")
+    parser.add_argument("--report", help="JSON file the final stats are written to")
+    parser.add_argument("--metrics", help="OpenMetrics text file written every stats interval, overrides `metrics`")
+    args = parser.parse_args(argv)
+
+    if not HAS_ASYNCSSH:
+        sys.stderr.write("The monitor requires the asyncssh package\n")
+        return 2
+    config = load_config(args.config)
+    unchecked = [device.get("name") or device["host"] for device in config["devices"]
+                 if not boolean(device.get("host_key_checking", True))]
+    if unchecked:
+        sys.stderr.write("Host keys are not checked for %s\n" % ", ".join(unchecked))
+    if args.metrics:
+        config["metrics"] = args.metrics
+    store_path = args.store or config.get("store") or "monitor.jsonl"
+    with open(store_path, "a") as store:
+        stats = asyncio.run(monitor(config, store, args.duration, args.stats_interval, sys.stderr))
+    text = json.dumps(stats, indent=2, sort_keys=True)
+    if args.report:
+        with open(args.report, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+"""Lint the regular expressions of the role templates for backtracking.
+
+Usage:
+    python tools/template_lint.py roles/
+    python tools/template_lint.py --fuzz roles/
+
+Every `getval` of the templates under `roles/*/templates/` is checked
+statically for
+
+- a quantifier nested in an unbounded quantifier, like `(\\S+\\s*)+`, whose
+  iterations can split a line in exponentially many ways: catastrophic
+  backtracking, an error failing the run.
+- two unbounded quantifiers that can match the same characters with
+  nothing but those characters between them, like `(?P<process>.+?)\\s+`,
+  which split a line in polynomially many ways: a warning.
+
+The regex engine tries those splits one by one when the rest of the
+pattern fails. With `--fuzz` every pattern is also timed the way the native
+parser matches it, one `re.match` per line, against adversarial lines: the
+pattern cut short after each unbounded quantifier with that quantifier
+pumped with one character it shares with the others, and the same line
+completed with a trailing character no pattern expects. The lines are
+scaled up to `--max-size` KB and the patterns slower than `--budget`
+milliseconds per KB of line are reported for information only, timings
+depending on the machine. Only the standard library and PyYAML are needed,
+the linter being a development tool run from a checkout.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import math
+import os
+import re
+import sys
+import time
+
+import yaml
+
+
+try:  # Python 3.11 renamed the regex parser modules
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_constants
+    import sre_parse
+
+
+ROLES_DIR = os.path.join(os.path.dirname(__file__), "..", "roles")
+# Characters the patterns are analysed over, templates parse ASCII output
+UNIVERSE = frozenset(chr(code) for code in range(128))
+# Preferred characters to pump a quantifier with, the first one it matches wins
+PREFERRED = " a0.:/-\t"
+# Character no template expects, ending a line so a trailing anchor fails
+TRAILER = "\x01"
+_CATEGORIES = {
+    "CATEGORY_DIGIT": r"\d",
+    "CATEGORY_NOT_DIGIT": r"\D",
+    "CATEGORY_SPACE": r"\s",
+    "CATEGORY_NOT_SPACE": r"\S",
+    "CATEGORY_WORD": r"\w",
+    "CATEGORY_NOT_WORD": r"\W",
+    "CATEGORY_LINEBREAK": r"\n",
+    "CATEGORY_NOT_LINEBREAK": r"[^\n]",
+}
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+_SINGLE = (sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.ANY, sre_constants.IN)
+
+
+def _category(category):
+    pattern = re.compile(_CATEGORIES[str(category)])
+    return frozenset(char for char in UNIVERSE if pattern.match(char))
+
+
+def _class(items):
+    chars = set()
+    negate = False
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            chars.add(chr(av))
+        elif op is sre_constants.RANGE:
+            chars.update(chr(code) for code in range(av[0], min(av[1], 127) + 1))
+        elif op is sre_constants.CATEGORY:
+            chars.update(_category(av))
+    return UNIVERSE - chars if negate else frozenset(chars)
+
+
+def _body(op, av):
+    """Sub patterns of a node, as lists of (op, av)"""
+    if op in _REPEATS or op is getattr(sre_constants, "POSSESSIVE_REPEAT", None):
+        return [av[2]]
+    if op is sre_constants.SUBPATTERN:
+        return [av[-1]]
+    if op is sre_constants.BRANCH:
+        return av[1]
+    if op is getattr(sre_constants, "ATOMIC_GROUP", None):
+        return [av]
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return [av[1]]
+    return []
+
+
+def chars(op, av):
+    """Characters a node can consume"""
+    if op is sre_constants.LITERAL:
+        return frozenset(chr(av)) & UNIVERSE
+    if op is sre_constants.NOT_LITERAL:
+        return UNIVERSE - frozenset(chr(av))
+    if op is sre_constants.ANY:
+        return UNIVERSE - frozenset("\n")
+    if op is sre_constants.IN:
+        return _class(av)
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return frozenset()
+    found = frozenset()
+    for sub in _body(op, av):
+        for item in sub:
+            found |= chars(*item)
+    return found
+
+
+def min_width(op, av):
+    if op in _SINGLE:
+        return 1
+    if op in _REPEATS or op is getattr(sre_constants, "POSSESSIVE_REPEAT", None):
+        return av[0] * sum(min_width(*item) for item in av[2])
+    if op is sre_constants.BRANCH:
+        return min(sum(min_width(*item) for item in sub) for sub in av[1])
+    if op is sre_constants.SUBPATTERN or op is getattr(sre_constants, "ATOMIC_GROUP", None):
+        return sum(min_width(*item) for item in _body(op, av)[0])
+    return 0
+
+
+def unbounded(op, av):
+    """Whether a node is a quantifier that can backtrack over any length"""
+    return op in _REPEATS and av[1] == sre_constants.MAXREPEAT
+
+
+def flatten(items):
+    """Items of a sequence with the groups around them removed"""
+    flat = []
+    for op, av in items:
+        if op is sre_constants.SUBPATTERN:
+            flat.extend(flatten(av[-1]))
+        else:
+            flat.append((op, av))
+    return flat
+
+
+def _describe(found):
+    sample = "".join(sorted(found))
+    for name, pattern in (("whitespace", r"\s"), ("digits", r"\d"), ("word characters", r"\w")):
+        if re.match(r"^%s+$" % pattern, sample):
+            return name
+    picked = [char for char in PREFERRED if char in found] + sorted(found)
+    return "characters like %s" % ", ".join(repr(char) for char in list(dict.fromkeys(picked))[:3])
+
+
+def _walk(items):
+    """Yield every sequence of a parsed pattern, the pattern itself first"""
+    yield items
+    for op, av in items:
+        for sub in _body(op, av):
+            for sequence in _walk(sub):
+                yield sequence
+
+
+def edge(items, last=False):
+    """Characters a sequence can start with, or end with when `last`"""
+    found = frozenset()
+    for op, av in reversed(items) if last else items:
+        if op in _SINGLE:
+            found |= chars(op, av)
+        elif op is sre_constants.BRANCH:
+            for sub in av[1]:
+                found |= edge(list(sub), last)
+        else:
+            for sub in _body(op, av)[:1]:
+                found |= edge(list(sub), last)
+        if min_width(op, av):
+            break
+    return found
+
+
+def static_findings(parsed):
+    """(severity, message) pairs for nested and adjacent overlapping quantifiers.
+
+    A quantified group is ambiguous when an iteration can end with a
+    character the next one can start with, `(\\S+\\s*)+` splitting a word
+    over any number of iterations where every iteration of `(?:\\s+\\S+)*`
+    starts with the whitespace the previous one cannot end with, an error.
+    Two quantifiers are ambiguous when the first can end with a character
+    the second can start with, with nothing between them but characters the
+    first can match, a warning.
+    """
+    findings = []
+    for sequence in _walk(list(parsed)):
+        for op, av in sequence:
+            if unbounded(op, av) and any(unbounded(*item) for sub in _walk(list(av[2])) for item in sub):
+                if edge(list(av[2]), last=True) & edge(list(av[2])):
+                    findings.append(
+                        ("error", "nested unbounded quantifiers, a quantified group containing another quantifier")
+                    )
+        flat = flatten(sequence)
+        for index, (op, av) in enumerate(flat):
+            if not unbounded(op, av):
+                continue
+            ending = edge([(op, av)], last=True)
+            for later_op, later_av in flat[index + 1:]:
+                overlap = ending & edge([(later_op, later_av)])
+                if unbounded(later_op, later_av) and overlap:
+                    findings.append(("warning", "adjacent unbounded quantifiers overlapping on %s" % _describe(overlap)))
+                    break
+                # characters of the first quantifier in between keep the split ambiguous
+                if min_width(later_op, later_av) and not chars(later_op, later_av) <= chars(op, av):
+                    break
+    return list(dict.fromkeys(findings))
+
+
+def pick(found):
+    for char in PREFERRED:
+        if char in found:
+            return char
+    return min(found) if found else "a"
+
+
+def sample(items):
+    """A short string matching a sequence of items, best effort"""
+    text = ""
+    for op, av in items:
+        if op in _SINGLE:
+            text += pick(chars(op, av))
+        elif op in _REPEATS or op is getattr(sre_constants, "POSSESSIVE_REPEAT", None):
+            text += sample(av[2]) * min(av[0], 100)
+        elif op is sre_constants.BRANCH:
+            text += sample(av[1][0])
+        elif op is sre_constants.SUBPATTERN or op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            text += sample(_body(op, av)[0])
+    return text
+
+
+def adversarial(parsed):
+    """(prefix, pumped character, suffix) triples to scale, for each unbounded quantifier"""
+    flat = flatten(list(parsed))
+    quantifiers = [chars(op, av) for op, av in flat if unbounded(op, av)]
+    cases = []
+    for index, (op, av) in enumerate(flat):
+        if not unbounded(op, av):
+            continue
+        own = chars(op, av)
+        pumped = [pick(own)] + [pick(own & other) for other in quantifiers if own & other]
+        prefix = sample(flat[:index])
+        for char in dict.fromkeys(pumped):
+            cases.append((prefix, char, ""))
+            cases.append((prefix, char, sample(flat[index + 1:]) + TRAILER))
+    # a line of one repeated character, as truncated or garbled output can be
+    for char in dict.fromkeys(pick(found) for found in quantifiers):
+        cases.append(("", char, TRAILER))
+    return list(dict.fromkeys(cases))
+
+
+def _time(compiled, text):
+    """Seconds per match, the best of two timings of enough matches to last a millisecond"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _match in range(number):
+            compiled.match(text)
+        elapsed = time.perf_counter() - started
+        if elapsed >= 0.001:
+            break
+        number *= 4
+    if elapsed < 0.01:
+        # a slow pattern is slow on the first timing already, the second is for the fast ones
+        started = time.perf_counter()
+        for _match in range(number):
+            compiled.match(text)
+        elapsed = min(elapsed, time.perf_counter() - started)
+    return elapsed / number
+
+
+def fuzz(pattern, budget, max_size=16):
+    """Slowest case of a pattern, as a dict with its ms per KB, size, growth and input"""
+    compiled = re.compile(pattern)
+    slowest = None
+    for prefix, char, suffix in adversarial(sre_parse.parse(pattern)):
+        previous = None
+        size = 256
+        while size <= max_size * 1024:
+            text = prefix + char * max(size - len(prefix) - len(suffix), 1) + suffix
+            elapsed = _time(compiled, text)
+            per_kb = elapsed * 1000 / (len(text) / 1024.0)
+            case = {
+                "ms_per_kb": round(per_kb, 4),
+                "size": len(text),
+                "input": "%r + %r * n + %r" % (prefix, char, suffix),
+                # 1 for linear time, 2 for quadratic...
+                "growth": round(math.log(elapsed / previous, 4), 2) if previous and elapsed > 1e-4 else None,
+            }
+            if slowest is None or per_kb > slowest["ms_per_kb"]:
+                slowest = case
+            if per_kb > budget:
+                break
+            previous = elapsed
+            size *= 4
+    return slowest
+
+
+def iter_patterns(paths):
+    """Yield (template path, parser name, getval) for template files and directories"""
+    for path in paths:
+        if os.path.isdir(path):
+            nested = []
+            for root, _dirs, files in os.walk(path):
+                if os.path.basename(root) == "templates":
+                    nested.extend(os.path.join(root, name) for name in files if name.endswith(".yaml"))
+            for pattern in iter_patterns(sorted(nested)):
+                yield pattern
+            continue
+        with open(path) as handle:
+            parsers = yaml.safe_load(handle) or []
+        for parser in parsers:
+            if isinstance(parser, dict) and isinstance(parser.get("getval"), str):
+                yield path, parser.get("name"), parser["getval"]
+
+
+def lint(paths, fuzz_budget=None, max_size=16):
+    """Yield one result dict per pattern, with its static findings and, given `fuzz_budget`, slowest case"""
+    for path, name, pattern in iter_patterns(paths):
+        result = {"template": path, "name": name, "findings": [], "slowest": None}
+        try:
+            result["findings"] = static_findings(sre_parse.parse(pattern))
+            if fuzz_budget is not None:
+                result["slowest"] = fuzz(pattern, fuzz_budget, max_size)
+        except re.error as exc:
+            result["error"] = "Invalid pattern: %s" % exc
+        result["over_budget"] = bool(result["slowest"] and result["slowest"]["ms_per_kb"] > fuzz_budget)
+        yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the template regular expressions for catastrophic backtracking.")
+    parser.add_argument("paths", nargs="*", help="template files or directories searched for templates/ directories, the roles by default")
+    parser.add_argument("--fuzz", action="store_true", help="time the patterns against adversarial lines, for information")
+    parser.add_argument("--budget", type=float, default=1.0, help="milliseconds of matching per KB of line reported as slow with --fuzz")
+    parser.add_argument("--max-size", type=int, default=16, help="largest adversarial line with --fuzz, in KB")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for result in lint(args.paths or [os.path.normpath(ROLES_DIR)], args.budget if args.fuzz else None, args.max_size):
+        where = "%s: %s" % (result["template"], result["name"])
+        if "error" in result:
+            failed += 1
+            print("%s: error: %s" % (where, result["error"]))
+            continue
+        for severity, finding in result["findings"]:
+            print("%s: %s: %s" % (where, severity, finding))
+        slowest = result["slowest"]
+        if result["over_budget"]:
+            print("%s: info: %.2f ms per KB on a %d byte line (budget %s), growth %s, input %s" % (
+                where, slowest["ms_per_kb"], slowest["size"], args.budget, slowest["growth"], slowest["input"]))
+        failed += any(severity == "error" for severity, _finding in result["findings"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())